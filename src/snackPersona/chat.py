@@ -7,12 +7,56 @@ import sys
 import asyncio
 import os
 import random
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 from snackPersona.persona_store.store import PersonaStore
 from snackPersona.simulation.agent import SimulationAgent
+from snackPersona.llm.llm_client import LLMClient
 from snackPersona.llm.llm_factory import create_llm_client
 from snackPersona.utils.data_models import PersonaGenotype
 
+# (storage_dir, generation) -> (file mtime, population)
+_population_cache: Dict[Tuple[str, int], Tuple[float, List[PersonaGenotype]]] = {}
+
+
+@lru_cache(maxsize=4)
+def _get_llm_client(preset_name: str) -> LLMClient:
+    """Create (once per preset) the LLM client used for chatting."""
+    return create_llm_client(preset_name)
+
+
+def _load_population(storage_dir: str = "persona_data") -> List[PersonaGenotype]:
+    """
+    Load the latest generation from ``storage_dir`` (or the seeds).
+
+    Loaded generations are memoised and only re-read when the generation
+    file's mtime changes, so restarting the chat in the same process skips
+    the disk read.
+    """
+    store = PersonaStore(storage_dir=storage_dir)
+    gens = store.list_generations()
+
+    if not gens:
+        # Load seeds if no evolution data
+        print("No evolution data found. Loading seeds...")
+        from snackPersona.main import create_seed_population
+        return create_seed_population()
+
+    # Load from latest generation
+    latest_gen = gens[-1]
+    mtime = os.path.getmtime(store.generation_path(latest_gen))
+    key = (storage_dir, latest_gen)
+    cached = _population_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    print(f"Loading personas from Generation {latest_gen}...")
+    population = store.load_generation(latest_gen)
+    _population_cache[key] = (mtime, population)
+    return population
+
+
 async def async_chat():
     print("--- SnackPersona Interactive Chat ---")
     
@@ -22,23 +66,10 @@ async def async_chat():
         print("Error: GEMINI_API_KEY not found.")
         return
 
-    llm_client = create_llm_client("gemini-flash")
-    store = PersonaStore(storage_dir="persona_data")
-    
+    llm_client = _get_llm_client("gemini-flash")
+
     # 2. Select Persona
-    gens = store.list_generations()
-    population = []
-    
-    if gens:
-        # Load from latest generation
-        latest_gen = gens[-1]
-        print(f"Loading personas from Generation {latest_gen}...")
-        population = store.load_generation(latest_gen)
-    else:
-        # Load seeds if no evolution data
-        print("No evolution data found. Loading seeds...")
-        from snackPersona.main import create_seed_population
-        population = create_seed_population()
+    population = _load_population("persona_data")
 
     print("\nAvailable Personas:")
     for i, p in enumerate(population):
@@ -73,4 +104,9 @@ async def async_chat():
         print(f"\n{agent.genotype.name}: {response}")
 
 if __name__ == "__main__":
-    asyncio.run(async_chat())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(async_chat())
+    else:
+        uvloop.run(async_chat())
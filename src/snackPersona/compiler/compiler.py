@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from snackPersona.utils.data_models import PersonaGenotype, PersonaPhenotype
 
 def compile_persona(genotype: PersonaGenotype) -> PersonaPhenotype:
@@ -7,9 +9,23 @@ def compile_persona(genotype: PersonaGenotype) -> PersonaPhenotype:
     This function uses a flexible template to translate the genotype's fields
     into natural language instructions, supporting both fixed and dynamic attributes.
 
+    Results are cached on the genotype's field values, so agents built from the
+    same (or an identical) genotype share a single phenotype instance.
+
     :param genotype: The structured persona data.
     :return: The compiled persona with system_prompt and policy_instructions.
     """
+    return _compile_cached(genotype.name, genotype.bio)
+
+
+@lru_cache(maxsize=4096)
+def _compile_cached(name: str, bio: str) -> PersonaPhenotype:
+    """
+    Renders the phenotype for a given (name, bio) pair.
+
+    ``PersonaGenotype`` is a mutable pydantic model and therefore not hashable,
+    so the cache is keyed on its field values instead of the instance.
+    """
     
     # --- System Prompt Construction ---
     # This part defines the persona's identity and personality.
@@ -18,9 +34,9 @@ def compile_persona(genotype: PersonaGenotype) -> PersonaPhenotype:
 You are an AI agent on a social network. You must adopt the following persona and embody it consistently.
 
 **Your Persona:**
-My Name: {genotype.name}
+My Name: {name}
 **My Story:**
-{genotype.bio}
+{bio}
 
 **Your Mission & Rules:**
 
@@ -1,40 +1,102 @@
 """
 Evaluator for assessing the quality and style of the persona bio text itself.
 """
+import hashlib
 import json
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional
 from snackPersona.utils.data_models import PersonaGenotype
 from snackPersona.llm.llm_client import LLMClient
 from snackPersona.utils.logger import logger
 
+# Matches the expected one-field reply, e.g. {"score": 0.8}
+_SCORE_RE = re.compile(r'\{[^{}]*"score"\s*:\s*([0-9.eE+-]+)[^{}]*\}')
+# Matches the batched reply, e.g. {"scores": [0.4, 0.7]}
+_SCORES_RE = re.compile(r'"scores"\s*:\s*\[([^\[\]]*)\]')
+
+_SYSTEM_PROMPT = "You are a creative writing critic."
+
+_STYLE_GUIDE = """
+        **Target Style (Valid):** 
+        - First-person perspective ("I...")
+        - Tells a micro-story or slice of life.
+        - Feels like a real human introduction on a social profile.
+        - Includes specific, messy details (quirks, complaints, situation).
+        
+        **Avoid (Invalid):**
+        - Resume-speak or list format.
+        - Explicit labels like "Goals:", "Core Values:", "Personality:".
+        - Generic, robotic descriptions.
+"""
+
 
 class BioStyleEvaluator:
     """
     Evaluates the narrative quality of a persona's bio.
     Penalizes "resume-speak" (lists of attributes, goals: ..., values: ...)
     and rewards authentic, first-person storytelling.
+
+    Scores are cached per bio text (LRU, ``cache_size`` entries), so
+    unchanged personas carried across generations are not re-judged.
+    ``evaluate_bios`` scores up to ``batch_size`` uncached bios per LLM call.
     """
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: LLMClient, cache_size: int = 4096, batch_size: int = 32):
         self.llm_client = llm_client
+        self.cache_size = cache_size
+        self.batch_size = max(1, batch_size)
+        self._cache: "OrderedDict[bytes, float]" = OrderedDict()
+
+    @staticmethod
+    def _cache_key(bio: str) -> bytes:
+        return hashlib.blake2b(bio.encode("utf-8"), digest_size=12).digest()
 
     def evaluate_bio(self, genotype: PersonaGenotype) -> float:
         """
         Rate the bio on a scale of 0.0 to 1.0 for narrative authenticity.
         """
-        system_prompt = "You are a creative writing critic."
+        return self.evaluate_bios([genotype])[0]
+
+    def evaluate_bios(self, genotypes: List[PersonaGenotype]) -> List[float]:
+        """
+        Rate several bios, returning scores in input order.
+
+        Cached bios are answered directly; the rest (deduplicated by text)
+        are judged together, ``batch_size`` per LLM call.
+        """
+        keys = [self._cache_key(g.bio) for g in genotypes]
+        scores: Dict[bytes, float] = {}
+        pending: Dict[bytes, PersonaGenotype] = {}
+        for key, genotype in zip(keys, genotypes):
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                scores[key] = cached
+            elif key not in pending:
+                pending[key] = genotype
+
+        items = list(pending.items())
+        for i in range(0, len(items), self.batch_size):
+            batch = items[i: i + self.batch_size]
+            if len(batch) == 1:
+                results = [self._score_one(batch[0][1])]
+            else:
+                results = self._score_batch([g for _, g in batch])
+            for (key, _), score in zip(batch, results):
+                if score is None:
+                    continue
+                scores[key] = score
+                self._cache[key] = score
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        # Failures default to 0.5 (not cached, so a transient failure is retried)
+        return [scores.get(key, 0.5) for key in keys]
+
+    def _score_one(self, genotype: PersonaGenotype):
         user_prompt = f"""
         Evaluate the following persona bio for its narrative style.
-        
-        **Target Style (Valid):** 
-        - First-person perspective ("I...")
-        - Tells a micro-story or slice of life.
-        - Feels like a real human introduction on a social profile.
-        - Includes specific, messy details (quirks, complaints, situation).
-        
-        **Avoid (Invalid):**
-        - Resume-speak or list format.
-        - Explicit labels like "Goals:", "Core Values:", "Personality:".
-        - Generic, robotic descriptions.
-        
+        {_STYLE_GUIDE}
         Bio: "{genotype.bio}"
         
         Rate on a scale of 0.0 to 1.0 (1.0 = Perfect Story, 0.0 = Robotic List).
@@ -42,20 +104,59 @@ class BioStyleEvaluator:
         """
         
         try:
-            response = self.llm_client.generate_text(system_prompt, user_prompt, temperature=0.1)
-            score = self._parse_score(response)
-            return score
+            response = self.llm_client.generate_text(_SYSTEM_PROMPT, user_prompt, temperature=0.1)
+            return self._parse_score(response)
         except Exception as e:
             logger.warning(f"Bio evaluation failed for {genotype.name}: {e}")
-            return 0.5 # Default fallback
+            return None
+
+    def _score_batch(self, genotypes: List[PersonaGenotype]):
+        numbered = "\n".join(f'        {n}. "{g.bio}"' for n, g in enumerate(genotypes, 1))
+        user_prompt = f"""
+        Evaluate each of the following {len(genotypes)} persona bios for its narrative style.
+        {_STYLE_GUIDE}
+        Bios:
+{numbered}
+        
+        Rate each on a scale of 0.0 to 1.0 (1.0 = Perfect Story, 0.0 = Robotic List).
+        Return ONLY a JSON object with one score per bio, in order: {{"scores": [float, ...]}}
+        """
+
+        try:
+            response = self.llm_client.generate_text(_SYSTEM_PROMPT, user_prompt, temperature=0.1)
+            parsed = self._parse_scores(response)
+        except Exception as e:
+            logger.warning(f"Batched bio evaluation failed for {len(genotypes)} bios: {e}")
+            return [None] * len(genotypes)
+        if parsed is None or len(parsed) != len(genotypes):
+            logger.warning(f"Batched bio evaluation returned an unusable score list for {len(genotypes)} bios")
+            return [None] * len(genotypes)
+        return parsed
+
+    def _parse_scores(self, text: str):
+        m = _SCORES_RE.search(text)
+        if not m:
+            return None
+        try:
+            return [float(v) for v in m.group(1).split(",") if v.strip()]
+        except ValueError:
+            return None
 
-    def _parse_score(self, text: str) -> float:
+    def _parse_score(self, text: str) -> Optional[float]:
+        """Score from a one-bio reply, or ``None`` when there is none (e.g. an empty reply)."""
+        # Fast path: pull the number straight out of the JSON object
+        m = _SCORE_RE.search(text)
+        if m:
+            try:
+                return float(m.group(1))
+            except ValueError:
+                pass
         try:
             if "```json" in text:
                 text = text.split("```json")[1].split("```")[0]
             elif "```" in text:
                 text = text.split("```")[1].split("```")[0]
             data = json.loads(text.strip())
-            return float(data.get("score", 0.0))
-        except:
-            return 0.5
+            return float(data["score"])
+        except (json.JSONDecodeError, ValueError, TypeError, AttributeError, KeyError, IndexError):
+            return None
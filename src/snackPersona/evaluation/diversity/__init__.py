@@ -15,6 +15,7 @@ from snackPersona.evaluation.diversity.embedding import (
 )
 from snackPersona.evaluation.diversity.genotype import (
     calculate_genotype_distance,
+    calculate_genotype_distance_matrix,
 )
 
 
@@ -28,6 +29,7 @@ class DiversityEvaluator:
     calculate_embedding_diversity = staticmethod(calculate_embedding_diversity)
     calculate_population_diversity = staticmethod(calculate_population_diversity)
     calculate_genotype_distance = staticmethod(calculate_genotype_distance)
+    calculate_genotype_distance_matrix = staticmethod(calculate_genotype_distance_matrix)
 
     @staticmethod
     def calculate_overall_diversity(reactions: list) -> float:
@@ -1,27 +1,181 @@
-from typing import List, Dict
-from itertools import combinations
+import atexit
+from collections import OrderedDict
+from functools import lru_cache
+import math
+import os
+import threading
+from typing import List, Dict, Tuple
 import numpy as np
 
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
 # Lazy-load sentence-transformers to avoid import cost when not used
 _model = None
+# Serialises the first load: evaluations and prefilter checks call in from worker threads
+_model_lock = threading.Lock()
+
+
+# agent name -> (hash of its posts, mean embedding); only changed agents re-encode
+_agent_mean_cache: "OrderedDict[str, Tuple[int, np.ndarray]]" = OrderedDict()
+_AGENT_MEAN_CACHE_SIZE = 10_000
+
+_MODEL_NAME = "all-MiniLM-L6-v2"
+# int8-quantised ONNX export published alongside the MiniLM weights
+_QUANTIZED_ONNX_FILE = "onnx/model_quint8_avx2.onnx"
+# Bios and posts are short; capping the sequence length limits padding work
+_MAX_SEQ_LENGTH = 128
 
 
 def _get_model():
-    """Lazily load the sentence-transformers model on first use."""
+    """
+    Lazily load the sentence-transformers model on first use.
+
+    ``SNACK_MODEL`` overrides the model name.  PyTorch gets half the CPU
+    cores for intra-op work.  ``SNACK_FAST=1`` tries the int8-quantised
+    ONNX export first and ``SNACK_ONNX=1`` the FP32 ONNX Runtime backend
+    (both need ``optimum[onnxruntime]``); either falls back to PyTorch.
+    Thread-safe: concurrent first calls load the model once.
+    """
     global _model
     if _model is None:
-        from sentence_transformers import SentenceTransformer
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
+        with _model_lock:
+            if _model is None:
+                _model = _load_model()
     return _model
 
 
-def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
-    """Compute cosine similarity between two vectors."""
-    dot = np.dot(a, b)
-    norm = np.linalg.norm(a) * np.linalg.norm(b)
-    if norm == 0:
+def _load_model():
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+    try:
+        torch.set_num_interop_threads(2)
+    except RuntimeError:
+        # Only settable before the first parallel op in the process
+        pass
+
+    name = os.getenv("SNACK_MODEL") or _MODEL_NAME
+    attempts = []
+    if os.getenv("SNACK_FAST") == "1":
+        attempts.append({"backend": "onnx", "model_kwargs": {"file_name": _QUANTIZED_ONNX_FILE}})
+    if os.getenv("SNACK_ONNX") == "1":
+        attempts.append({"backend": "onnx"})
+
+    model = None
+    for kwargs in attempts:
+        try:
+            model = SentenceTransformer(name, **kwargs)
+            break
+        except Exception:
+            model = None
+    if model is None:
+        model = SentenceTransformer(name)
+    model.max_seq_length = _MAX_SEQ_LENGTH
+    return model
+
+
+# Multi-process encode pool, opt-in with SNACK_ENCODE_POOL=1; only batches of
+# at least _POOL_MIN_TEXTS are worth the inter-process transfer
+_pool = None
+_POOL_MIN_TEXTS = 1024
+
+
+def _stop_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _get_model().stop_multi_process_pool(_pool)
+        _pool = None
+
+
+def encode_texts(texts: List[str], batch_size: int = 64) -> np.ndarray:
+    """
+    Unit-norm embeddings for ``texts``.
+
+    Large batches go through a persistent sentence-transformers
+    multi-process pool when ``SNACK_ENCODE_POOL=1``, so the worker
+    processes (and their model copies) are started once per run instead of
+    per call; everything else uses the in-process model.
+    """
+    global _pool
+    model = _get_model()
+    if len(texts) >= _POOL_MIN_TEXTS and os.getenv("SNACK_ENCODE_POOL") == "1":
+        if _pool is None:
+            _pool = model.start_multi_process_pool()
+            atexit.register(_stop_pool)
+        return model.encode_multi_process(
+            texts, _pool, batch_size=batch_size, normalize_embeddings=True
+        )
+    return model.encode(
+        texts, convert_to_numpy=True, batch_size=batch_size, normalize_embeddings=True
+    )
+
+
+@lru_cache(maxsize=4096)
+def _encode_one(text: str) -> np.ndarray:
+    """
+    Unit-norm embedding of a single text, memoised per process so bios
+    seen again in later generations skip the forward pass.
+    """
+    vec = _get_model().encode([text], convert_to_numpy=True, normalize_embeddings=True)[0]
+    # Shared between callers through the cache
+    vec.setflags(write=False)
+    return vec
+
+
+def _quantize(x: np.ndarray) -> np.ndarray:
+    """Symmetric int8 quantisation (scale ``127 / max|x|``); cosine is scale-free."""
+    x = np.asarray(x, dtype=np.float32)
+    peak = float(np.abs(x).max()) if x.size else 0.0
+    if peak == 0.0:
+        return np.zeros(x.shape, dtype=np.int8)
+    return np.round(x * (127.0 / peak)).astype(np.int8)
+
+
+def cosine_similarity(a: np.ndarray, b: np.ndarray, *, normalized: bool = False) -> float:
+    """
+    Compute cosine similarity between two vectors.
+
+    ``normalized=True`` skips the norms for unit-norm inputs.  Zero vectors
+    return 0.0 before any further work.
+    """
+    if normalized:
+        return float(a @ b)
+    na2 = float(a @ a)
+    nb2 = float(b @ b)
+    if na2 == 0 or nb2 == 0:
         return 0.0
-    return float(dot / norm)
+    if simsimd is not None:
+        a32 = np.asarray(a, dtype=np.float32)
+        b32 = np.asarray(b, dtype=np.float32)
+        return 1.0 - float(simsimd.cosine(a32, b32))
+    return float(a @ b) / math.sqrt(na2 * nb2)
+
+
+def mean_pairwise_similarity(embeddings: np.ndarray, normalized: bool = False) -> float:
+    """
+    Mean cosine similarity over all unordered pairs of rows (n >= 2).
+
+    Pass ``normalized=True`` for rows that are already unit-norm (e.g.
+    ``encode(..., normalize_embeddings=True)``) to skip re-normalising.
+
+    Uses ``sum_{i != j} u_i . u_j = |sum_i u_i|^2 - sum_i |u_i|^2`` on the
+    unit rows, so it is O(n * d) and never builds the ``(n, n)`` matrix.
+    """
+    n = len(embeddings)
+    emb = np.asarray(embeddings, dtype=np.float64)
+    if normalized:
+        unit = emb
+    else:
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        unit = np.divide(emb, norms, out=np.zeros_like(emb), where=norms > 0)
+    total = unit.sum(axis=0)
+    # Off-diagonal sum counts every pair twice
+    off_diagonal = float(total @ total) - float(np.einsum("ij,ij->", unit, unit))
+    return off_diagonal / (n * (n - 1))
 
 
 def calculate_embedding_diversity(texts: List[str]) -> float:
@@ -38,18 +192,16 @@ def calculate_embedding_diversity(texts: List[str]) -> float:
     if len(texts) < 2:
         return 0.0
 
-    model = _get_model()
-    embeddings = model.encode(texts, convert_to_numpy=True)
-
-    similarities = []
-    for i, j in combinations(range(len(embeddings)), 2):
-        sim = cosine_similarity(embeddings[i], embeddings[j])
-        similarities.append(sim)
+    embeddings = encode_texts(texts)
 
-    if not similarities:
-        return 0.0
-
-    mean_similarity = sum(similarities) / len(similarities)
+    if simsimd is not None:
+        # int8 all-pairs cosine distance in one SIMD kernel
+        q = _quantize(embeddings)
+        n = len(q)
+        dist = np.asarray(simsimd.cdist(q, q, metric="cosine"), dtype=np.float64)
+        mean_similarity = 1.0 - float((dist.sum() - np.trace(dist)) / (n * (n - 1)))
+    else:
+        mean_similarity = mean_pairwise_similarity(embeddings, normalized=True)
     return max(0.0, min(1.0, 1.0 - mean_similarity))
 
 
@@ -68,25 +220,43 @@ def calculate_population_diversity(agent_posts: Dict[str, List[str]]) -> float:
     if len(agents) < 2:
         return 0.0
 
-    model = _get_model()
-
-    # One representative embedding per agent (mean of post embeddings)
-    agent_embeddings = {}
+    # Reuse cached means for agents whose posts are unchanged; flatten the
+    # rest so the model runs one batched encode
+    means: Dict[str, np.ndarray] = {}
+    stale: List[Tuple[str, int]] = []
+    flat_posts: List[str] = []
+    offsets = [0]
     for name, posts in agent_posts.items():
         posts = [p for p in posts if p.strip()]
         if not posts:
             continue
-        embs = model.encode(posts, convert_to_numpy=True)
-        agent_embeddings[name] = np.mean(embs, axis=0)
+        h = hash(tuple(posts))
+        cached = _agent_mean_cache.get(name)
+        if cached is not None and cached[0] == h:
+            _agent_mean_cache.move_to_end(name)
+            means[name] = cached[1]
+            continue
+        means[name] = None
+        stale.append((name, h))
+        flat_posts.extend(posts)
+        offsets.append(len(flat_posts))
 
-    if len(agent_embeddings) < 2:
+    # Fewer than two agents with posts
+    if len(means) < 2:
         return 0.0
 
-    embeddings_list = list(agent_embeddings.values())
-    similarities = []
-    for i, j in combinations(range(len(embeddings_list)), 2):
-        sim = cosine_similarity(embeddings_list[i], embeddings_list[j])
-        similarities.append(sim)
+    if flat_posts:
+        embs = encode_texts(flat_posts)
+        # One representative embedding per agent (mean of post embeddings)
+        bounds = np.asarray(offsets)
+        stale_means = np.add.reduceat(embs, bounds[:-1], axis=0) / np.diff(bounds)[:, None]
+        for (name, h), mean in zip(stale, stale_means):
+            means[name] = mean
+            _agent_mean_cache[name] = (h, mean)
+            _agent_mean_cache.move_to_end(name)
+        while len(_agent_mean_cache) > _AGENT_MEAN_CACHE_SIZE:
+            _agent_mean_cache.popitem(last=False)
 
-    mean_sim = sum(similarities) / len(similarities)
+    agent_means = np.stack(list(means.values()))
+    mean_sim = mean_pairwise_similarity(agent_means)
     return max(0.0, min(1.0, 1.0 - mean_sim))
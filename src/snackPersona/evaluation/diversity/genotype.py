@@ -3,7 +3,91 @@ Genotype distance for free-form description-based personas.
 
 Uses sentence embeddings to compute semantic distance between descriptions.
 """
-from snackPersona.evaluation.diversity.embedding import _get_model
+from typing import List
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+from snackPersona.evaluation.diversity.embedding import (
+    _encode_one,
+    cosine_similarity,
+    encode_texts,
+)
+
+
+def _char_match_loop(a: np.ndarray, b: np.ndarray) -> int:
+    """Number of positions where two code-point arrays agree (zip semantics)."""
+    n = min(a.size, b.size)
+    s = 0
+    for i in range(n):
+        if a[i] == b[i]:
+            s += 1
+    return s
+
+
+if njit is not None:
+    _char_match_jit = njit(cache=True)(_char_match_loop)
+else:
+    _char_match_jit = None
+
+
+def _code_points(text: str) -> np.ndarray:
+    # UTF-32 keeps one element per character, so multi-byte text compares
+    # character by character like zip() over the strings
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def _char_match_points(a: np.ndarray, b: np.ndarray) -> int:
+    if _char_match_jit is not None:
+        return int(_char_match_jit(a, b))
+    n = min(a.size, b.size)
+    return int(np.count_nonzero(a[:n] == b[:n]))
+
+
+def _string_distance(t1: str, t2: str, a: np.ndarray, b: np.ndarray) -> float:
+    """Character-level distance of two texts given their code-point arrays."""
+    if t1 == t2:
+        return 0.0
+    # Rough character-level similarity
+    common = _char_match_points(a, b)
+    max_len = max(a.size, b.size, 1)
+    return 1.0 - (common / max_len)
+
+
+# Max cells of the (block, n, max_len) comparison tensor per step
+_MATCH_BLOCK_CELLS = 1 << 24
+
+
+def _string_distance_matrix(texts: List[str]) -> np.ndarray:
+    """
+    ``_string_distance`` for all pairs at once.  Texts become rows of one
+    code-point matrix, padded with a per-row value above the Unicode range
+    so padding never matches anything; per-pair match counts are then a
+    broadcast equality test summed over positions, in row blocks.
+    """
+    n = len(texts)
+    points = [_code_points(t) for t in texts]
+    lengths = np.array([p.size for p in points], dtype=np.int64)
+    width = max(int(lengths.max(initial=0)), 1)
+    grid = np.repeat((0x110000 + np.arange(n, dtype=np.uint32))[:, None], width, axis=1)
+    for i, p in enumerate(points):
+        grid[i, :p.size] = p
+
+    common = np.empty((n, n), dtype=np.int64)
+    block = max(1, _MATCH_BLOCK_CELLS // max(n * width, 1))
+    for start in range(0, n, block):
+        rows = grid[start:start + block]
+        common[start:start + len(rows)] = (rows[:, None, :] == grid[None, :, :]).sum(axis=-1)
+
+    max_len = np.maximum(np.maximum.outer(lengths, lengths), 1)
+    distances = 1.0 - common / max_len
+    # Identical texts (including two empty ones) are at distance 0
+    distances[np.equal.outer(np.array(texts, dtype=object), np.array(texts, dtype=object))] = 0.0
+    return distances
 
 
 def calculate_genotype_distance(g1, g2) -> float:
@@ -18,20 +102,34 @@ def calculate_genotype_distance(g1, g2) -> float:
         0.0 (identical) to 1.0 (completely different).
     """
     try:
-        model = _get_model()
-        embeddings = model.encode([g1.bio, g2.bio])
-        # Cosine similarity → distance
-        from numpy import dot
-        from numpy.linalg import norm
-        cos_sim = dot(embeddings[0], embeddings[1]) / (
-            norm(embeddings[0]) * norm(embeddings[1]) + 1e-8
-        )
+        # Unit-norm embeddings, each bio encoded once per process
+        cos_sim = cosine_similarity(_encode_one(g1.bio), _encode_one(g2.bio), normalized=True)
         return float(max(0.0, min(1.0, 1.0 - cos_sim)))
     except Exception:
         # Fallback: simple string comparison
-        if g1.bio == g2.bio:
-            return 0.0
-        # Rough character-level similarity
-        common = sum(1 for a, b in zip(g1.bio, g2.bio) if a == b)
-        max_len = max(len(g1.bio), len(g2.bio), 1)
-        return 1.0 - (common / max_len)
+        return _string_distance(g1.bio, g2.bio, _code_points(g1.bio), _code_points(g2.bio))
+
+
+def calculate_genotype_distance_matrix(genotypes: List) -> np.ndarray:
+    """
+    Pairwise ``calculate_genotype_distance`` for a whole population.
+
+    Every bio is embedded once (one batched encode) and all cosine
+    distances come from a single matrix product, instead of re-encoding
+    two bios per pair.  Falls back to the pairwise string comparison if
+    the embedding model is unavailable (without retrying the model for
+    every pair).
+
+    Returns:
+        Symmetric ``(n, n)`` array with a zero diagonal.
+    """
+    n = len(genotypes)
+    try:
+        embeddings = encode_texts([g.bio for g in genotypes])
+        # Unit-norm rows: the Gram matrix is the cosine similarity
+        distances = np.clip(1.0 - embeddings @ embeddings.T, 0.0, 1.0).astype(np.float64)
+    except Exception:
+        # Model unavailable: compare characters directly, all pairs at once
+        distances = _string_distance_matrix([g.bio for g in genotypes])
+    np.fill_diagonal(distances, 0.0)
+    return distances
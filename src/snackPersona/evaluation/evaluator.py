@@ -1,11 +1,32 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict
-import json
+import numpy as np
 from snackPersona.utils.data_models import FitnessScores, PersonaGenotype
 from snackPersona.llm.llm_client import LLMClient
 from snackPersona.evaluation.diversity import DiversityEvaluator
 
 
+_EVAL_SYSTEM_PROMPT = (
+    "You are an expert judge of social media content. "
+    "Evaluate how realistic, engaging, and incisive a user's behavior is."
+)
+
+_EVAL_INSTRUCTIONS = """**Task:**
+Rate this user (named after the conversation below) on a 0.0 to 1.0 scale for these metrics:
+- post_quality: Interesting, funny, or thought-provoking?
+- reply_quality: Natural and conversational?
+- engagement: Participation level.
+- authenticity: Feels like a real person?
+- safety: Non-toxic (1.0 = safe).
+- incisiveness: "Moto-mo-ko-mo-nai". Did they cut to the chase and make a decisive, conversation-stopping statement? 
+  (High score for blunt/bold statements—whether brutally honest OR confidently false. Low for hedging/uncertainty.)
+- judiciousness: Did they speak only when necessary? 
+  (High score for staying silent on irrelevant topics or speaking with purpose. Low for spamming or mindless chatter.)
+
+Return JSON only: {"post_quality": float, "reply_quality": float, "engagement": float, "authenticity": float, "safety": float, "incisiveness": float, "judiciousness": float}
+"""
+
+
 class Evaluator(ABC):
     """Abstract base class for evaluating persona performance."""
     @abstractmethod
@@ -41,46 +62,23 @@ class LLMEvaluator(Evaluator):
         # If they posted 0 times when others posted, that might be judicious (or just inactive).
         # We'll let the LLM judge if the silence was "smart" based on the transcript context.
         
-        system_prompt = (
-            "You are an expert judge of social media content. "
-            "Evaluate how realistic, engaging, and incisive a user's behavior is."
+        posts_text = "\n".join(f"- {p.get('content', '')}" for p in posts) or "(no posts)"
+        replies_text = "\n".join(
+            f"- [to {r.get('target_author', '?')}] {r.get('content', '')}" for r in replies
+        ) or "(no replies)"
+
+        # Static instructions first, then the conversation shared by the whole
+        # group, then the per-user part: providers can cache the common prefix
+        user_prompt = (
+            f"{_EVAL_INSTRUCTIONS}\n"
+            f"**Full conversation context:**\n{transcript_text}\n\n"
+            f"**User being evaluated:** {genotype.name}\n\n"
+            f"**Their posts:**\n{posts_text}\n\n"
+            f"**Their replies:**\n{replies_text}\n"
         )
 
-        user_prompt = f"""**User being evaluated:** {genotype.name}
-
-**Their posts:**
-{chr(10).join(f'- {p.get("content", "")}' for p in posts) or '(no posts)'}
-
-**Their replies:**
-{chr(10).join(f'- [to {r.get("target_author", "?")}] {r.get("content", "")}' for r in replies) or '(no replies)'}
-
-**Full conversation context:**
-{transcript_text}
-
-**Task:**
-Rate this user on a 0.0 to 1.0 scale for these metrics:
-- post_quality: Interesting, funny, or thought-provoking?
-- reply_quality: Natural and conversational?
-- engagement: Participation level.
-- authenticity: Feels like a real person?
-- safety: Non-toxic (1.0 = safe).
-- incisiveness: "Moto-mo-ko-mo-nai". Did they cut to the chase and make a decisive, conversation-stopping statement? 
-  (High score for blunt/bold statements—whether brutally honest OR confidently false. Low for hedging/uncertainty.)
-- judiciousness: Did they speak only when necessary? 
-  (High score for staying silent on irrelevant topics or speaking with purpose. Low for spamming or mindless chatter.)
-
-Return JSON only: {{"post_quality": float, "reply_quality": float, "engagement": float, "authenticity": float, "safety": float, "incisiveness": float, "judiciousness": float}}
-"""
-
-        response = self.llm_client.generate_text(system_prompt, user_prompt, temperature=0.0)
-
         try:
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0]
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0]
-
-            scores_dict = json.loads(response.strip())
+            scores_dict = self.llm_client.generate_structured(_EVAL_SYSTEM_PROMPT, user_prompt, temperature=0.0)
 
             # Add diversity from embedding analysis
             diversity = 0.0
@@ -89,19 +87,14 @@ Return JSON only: {{"post_quality": float, "reply_quality": float, "engagement":
             
             # Global Research Diversity feedback
             if global_domain_counts and research_result and research_result.retrieved_urls:
-                from urllib.parse import urlparse
-                unique_domains = set()
-                for url in research_result.retrieved_urls:
-                    try:
-                        unique_domains.add(urlparse(url).netloc)
-                    except:
-                        pass
-                
+                unique_domains = set(research_result.url_domains())
                 if unique_domains:
                     # Rarity score: average(1 / sqrt(count + 1))
-                    import math
-                    rarity_scores = [1.0 / math.sqrt(global_domain_counts.get(d, 0) + 1) for d in unique_domains]
-                    research_diversity = sum(rarity_scores) / len(rarity_scores)
+                    counts = np.fromiter(
+                        (global_domain_counts.get(d, 0) for d in unique_domains),
+                        dtype=np.float64, count=len(unique_domains),
+                    )
+                    research_diversity = float(np.mean(1.0 / np.sqrt(counts + 1.0)))
                     # Blend research diversity into the overall diversity score (e.g., 30% weight)
                     diversity = (diversity * 0.7) + (research_diversity * 0.3)
 
@@ -109,5 +102,5 @@ Return JSON only: {{"post_quality": float, "reply_quality": float, "engagement":
 
             return FitnessScores(**scores_dict)
         except Exception as e:
-            print(f"Error parsing LLM evaluation: {e} | Response: {response}")
+            print(f"Error parsing LLM evaluation: {e}")
             return FitnessScores(engagement=0.1, safety=1.0)
@@ -2,14 +2,15 @@
 Adapter module for integrating snackPersona with snackPersona.traveler.
 Translates a PersonaGenotype into a TravelerGenome.
 """
-import json
+import hashlib
 import random
 import uuid
-from typing import Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional
 
 from snackPersona.utils.data_models import PersonaGenotype
 from snackPersona.traveler.utils.data_models import TravelerGenome, SourceBias
-from snackPersona.llm.llm_client import LLMClient
+from snackPersona.llm.llm_client import LLMClient, _parse_json_response
 from snackPersona.utils.logger import logger
 
 
@@ -17,26 +18,42 @@ class PersonaToTravelerAdapter:
     """
     Adapts a PersonaGenotype (Who) into a TravelerGenome (What/How to search).
     Uses an LLM to infer search preferences from the persona's bio.
+
+    The inferred preferences are cached per (name, bio) (LRU, ``cache_size``
+    entries), so personas carried unchanged into later generations are not
+    re-adapted; each call still builds a fresh genome (new id, new
+    ``query_diversity`` draw) from them.
     """
     
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: LLMClient, cache_size: int = 4096):
         self.llm_client = llm_client
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, dict]" = OrderedDict()
 
-    def adapt(self, persona: PersonaGenotype) -> TravelerGenome:
-        """
-        Generate a TravelerGenome based on the persona's bio.
-        """
-        logger.info(f"Adapting persona '{persona.name}' to TravelerGenome...")
-        
-        system_prompt = "You are an expert at mapping personality traits to information consumption habits."
-        user_prompt = f"""
-        Analyze the following persona bio and determine their information seeking behavior.
-        
-        Persona Name: {persona.name}
-        Bio: {persona.bio}
-        
-        Generate a JSON object representing their 'Traveler Genome' with these fields:
-        
+    @staticmethod
+    def _cache_key(persona: PersonaGenotype) -> bytes:
+        return hashlib.blake2b(
+            f"{persona.name}\0{persona.bio}".encode("utf-8"), digest_size=12
+        ).digest()
+
+    def _cached(self, key: bytes) -> Optional[TravelerGenome]:
+        data = self._cache.get(key)
+        if data is None:
+            return None
+        self._cache.move_to_end(key)
+        return self._build_genome(data)
+
+    def _build_and_remember(self, key: bytes, data: dict) -> TravelerGenome:
+        """Build a genome from LLM output; cache the output only if it is usable."""
+        genome = self._build_genome(data)
+        self._cache[key] = data
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return genome
+
+    _SYSTEM_PROMPT = "You are an expert at mapping personality traits to information consumption habits."
+
+    _GENOME_FIELDS = """
         1. "source_bias": A dictionary with keys ["academic", "news", "official", "blogs"].
            - Values between -1.0 (avoid) and 1.0 (prefer).
            - Example: A scientist might prefer "academic": 0.8, "blogs": -0.2.
@@ -50,44 +67,153 @@ class PersonaToTravelerAdapter:
         3. "search_depth": Integer 1 (quick scan) or 2 (deep dive).
         
         4. "novelty_weight": Float 0.0 to 1.0. (How much do they like new/unusual info?)
-        
-        Return ONLY valid JSON.
         """
+
+    def _user_prompt(self, persona: PersonaGenotype) -> str:
+        # Fixed instructions lead so the prompt prefix is identical across personas
+        return f"""
+        Analyze the persona bio at the end and determine their information seeking behavior.
+        Generate a JSON object representing their 'Traveler Genome' with these fields:
+        {self._GENOME_FIELDS}
+        Return ONLY valid JSON.
         
+        Persona Name: {persona.name}
+        Bio: {persona.bio}
+        """
+
+    def adapt(self, persona: PersonaGenotype) -> TravelerGenome:
+        """
+        Generate a TravelerGenome based on the persona's bio.
+        """
+        key = self._cache_key(persona)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        logger.info(f"Adapting persona '{persona.name}' to TravelerGenome...")
         try:
-            response = self.llm_client.generate_text(system_prompt, user_prompt, temperature=0.3)
-            data = self._parse_json(response)
-            
-            # Construct genome
-            bias_data = data.get("source_bias", {})
-            source_bias = SourceBias(
-                academic=float(bias_data.get("academic", 0.0)),
-                news=float(bias_data.get("news", 0.0)),
-                official=float(bias_data.get("official", 0.0)),
-                blogs=float(bias_data.get("blogs", 0.0))
-            )
-            
-            return TravelerGenome(
-                genome_id=str(uuid.uuid4()),
-                query_diversity=random.random(), # Stochastic per instance
-                query_template_id=data.get("query_templates", "template_v1_broad"),
-                language_mix=0.1, # Default mostly English/Primary language
-                source_bias=source_bias,
-                search_depth=int(data.get("search_depth", 1)),
-                novelty_weight=float(data.get("novelty_weight", 0.5))
+            data = self.llm_client.generate_structured(
+                self._SYSTEM_PROMPT, self._user_prompt(persona), temperature=0.3
             )
-            
+            return self._build_and_remember(key, data)
         except Exception as e:
             logger.error(f"Failed to adapt persona {persona.name}: {e}")
             # Fallback to random/default genome
             return self._create_fallback_genome()
 
-    def _parse_json(self, text: str) -> dict:
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
-        return json.loads(text.strip())
+    async def adapt_async(self, persona: PersonaGenotype) -> TravelerGenome:
+        """Async version of adapt."""
+        key = self._cache_key(persona)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        logger.info(f"Adapting persona '{persona.name}' to TravelerGenome...")
+        try:
+            data = await self.llm_client.generate_structured_async(
+                self._SYSTEM_PROMPT, self._user_prompt(persona), temperature=0.3
+            )
+            return self._build_and_remember(key, data)
+        except Exception as e:
+            logger.error(f"Failed to adapt persona {persona.name}: {e}")
+            return self._create_fallback_genome()
+
+    async def adapt_batch_async(self, personas: List[PersonaGenotype]) -> List[TravelerGenome]:
+        """
+        Generate TravelerGenomes for several personas with a single LLM call.
+
+        Cached personas are answered without the LLM; for the rest the model
+        returns a JSON array with one genome object per persona, each tagged
+        with the persona's number from the prompt.  A reply that does not
+        cover every number exactly once (or holds an unusable genome) is
+        discarded as a whole, before anything is cached, and those personas
+        are adapted individually in one ``generate_text_batch_async`` round.
+        """
+        keys = [self._cache_key(p) for p in personas]
+        genomes: List[Optional[TravelerGenome]] = [self._cached(k) for k in keys]
+        todo = [n for n, g in enumerate(genomes) if g is None]
+        if len(todo) <= 1:
+            for n in todo:
+                genomes[n] = await self.adapt_async(personas[n])
+            return genomes
+
+        logger.info(f"Adapting {len(todo)} personas to TravelerGenomes in one call...")
+        listing = "\n".join(
+            f"        {i}. Persona Name: {personas[n].name}\n           Bio: {personas[n].bio}"
+            for i, n in enumerate(todo, 1)
+        )
+        user_prompt = f"""
+        Analyze each of the following {len(todo)} persona bios and determine their information seeking behavior.
+        
+{listing}
+        
+        For EACH persona, generate a JSON object representing their 'Traveler Genome' with these fields:
+        {self._GENOME_FIELDS}
+        5. "persona": The persona's number from the list above (integer).
+
+        Return ONLY a valid JSON array with exactly {len(todo)} such objects, one per persona.
+        """
+
+        try:
+            response = await self.llm_client.generate_text_async(
+                self._SYSTEM_PROMPT, user_prompt, temperature=0.3
+            )
+            matched = self._match_batch(_parse_json_response(response), len(todo))
+            for n, data in zip(todo, matched):
+                genomes[n] = self._build_and_remember(keys[n], data)
+        except Exception as e:
+            logger.warning(f"Batched persona adaptation failed ({e}), adapting individually")
+
+        missing = [n for n in todo if genomes[n] is None]
+        if missing:
+            responses = await self.llm_client.generate_text_batch_async(
+                [(self._SYSTEM_PROMPT, self._user_prompt(personas[n])) for n in missing],
+                temperature=0.3,
+            )
+            for n, response in zip(missing, responses):
+                try:
+                    genomes[n] = self._build_and_remember(keys[n], _parse_json_response(response))
+                except Exception as e:
+                    logger.error(f"Failed to adapt persona {personas[n].name}: {e}")
+                    genomes[n] = self._create_fallback_genome()
+        return genomes
+
+    def _build_genome(self, data: dict) -> TravelerGenome:
+        bias_data = data.get("source_bias", {})
+        source_bias = SourceBias(
+            academic=float(bias_data.get("academic", 0.0)),
+            news=float(bias_data.get("news", 0.0)),
+            official=float(bias_data.get("official", 0.0)),
+            blogs=float(bias_data.get("blogs", 0.0))
+        )
+        
+        return TravelerGenome(
+            genome_id=str(uuid.uuid4()),
+            query_diversity=random.random(), # Stochastic per instance
+            query_template_id=data.get("query_templates", "template_v1_broad"),
+            language_mix=0.1, # Default mostly English/Primary language
+            source_bias=source_bias,
+            search_depth=int(data.get("search_depth", 1)),
+            novelty_weight=float(data.get("novelty_weight", 0.5))
+        )
+
+    def _match_batch(self, items, count: int) -> List[dict]:
+        """
+        Genome dicts of a batched reply, in prompt order (persona ``1..count``).
+
+        Raises ``ValueError`` unless the reply holds exactly one usable genome
+        per persona number, so a dropped or reordered object can never hand
+        one persona another's genome.
+        """
+        if not isinstance(items, list) or len(items) != count:
+            raise ValueError(f"expected {count} genomes, got {type(items).__name__} "
+                             f"of length {len(items) if isinstance(items, list) else '-'}")
+        by_number: Dict[int, dict] = {}
+        for data in items:
+            number = int(data["persona"])
+            if not 1 <= number <= count or number in by_number:
+                raise ValueError(f"unexpected or repeated persona number {number}")
+            self._build_genome(data)  # reject unusable fields before anything is cached
+            by_number[number] = data
+        return [by_number[i] for i in range(1, count + 1)]
 
     def _create_fallback_genome(self) -> TravelerGenome:
         return TravelerGenome(
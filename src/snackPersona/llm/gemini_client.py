@@ -5,7 +5,7 @@ Requires the ``GEMINI_API_KEY`` environment variable (or pass it directly).
 """
 
 import os
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from snackPersona.llm.llm_client import LLMClient
 from snackPersona.llm.rate_limiter import RateLimiter
@@ -112,3 +112,30 @@ class GeminiClient(LLMClient):
         except Exception as e:
             logger.error(f"Gemini API async error: {e}")
             return ""
+
+    async def generate_text_stream_async(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model_id: Optional[str] = None,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[str]:
+        model = model_id or self.default_model
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=model,
+                contents=user_prompt,
+                config=types.GenerateContentConfig(
+                    system_instruction=system_prompt,
+                    temperature=temperature,
+                ),
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            logger.error(f"Gemini API stream error: {e}")
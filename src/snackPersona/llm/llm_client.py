@@ -2,14 +2,27 @@
 Abstract LLM client and concrete backends (OpenAI, Bedrock).
 
 Every backend supports both synchronous ``generate_text`` and asynchronous
-``generate_text_async`` interfaces.  Rate limiting is handled by an optional
-``RateLimiter`` injected at construction time.
+``generate_text_async`` interfaces, plus ``generate_text_stream_async`` for
+incremental output (a single chunk unless the backend streams natively).  Rate limiting is handled by an optional
+``RateLimiter`` injected at construction time.  The OpenAI and Bedrock
+clients memoise low-temperature responses via ``ResponseCacheMixin``.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 import asyncio
+import atexit
+import copy
+import hashlib
+import json
 import os
+import re
+import sqlite3
+import threading
+import weakref
 
 from snackPersona.llm.rate_limiter import RateLimiter, NoOpRateLimiter
 from snackPersona.llm.logger import logger
@@ -23,8 +36,21 @@ except ImportError:
     OpenAI = None  # type: ignore[assignment,misc]
     AsyncOpenAI = None  # type: ignore[assignment,misc]
 
+try:
+    import httpx
+    from openai import DefaultAsyncHttpxClient
+except ImportError:
+    httpx = None  # type: ignore[assignment]
+    DefaultAsyncHttpxClient = None  # type: ignore[assignment,misc]
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None  # type: ignore[assignment]
+
 try:
     import boto3
+    from botocore.config import Config as BotoConfig
     from botocore.exceptions import ClientError
 except ImportError:
     boto3 = None  # type: ignore[assignment]
@@ -62,20 +88,238 @@ class LLMClient(ABC):
         """Asynchronous text generation."""
         ...
 
+    async def generate_text_stream_async(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model_id: Optional[str] = None,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[str]:
+        """
+        Asynchronous streaming generation, yielding text chunks.
+
+        The default implementation yields the full ``generate_text_async``
+        result as one chunk; backends with native streaming override it.
+        """
+        yield await self.generate_text_async(
+            system_prompt, user_prompt, model_id=model_id, temperature=temperature
+        )
 
+    async def generate_text_batch_async(
+        self,
+        prompts: List[Tuple[str, str]],
+        model_id: Optional[str] = None,
+        temperature: float = 0.7,
+    ) -> List[str]:
+        """
+        Generate one completion per ``(system_prompt, user_prompt)`` pair,
+        returned in input order.
+
+        The default implementation issues the calls concurrently; backends
+        that can serve several completions per request override it.
+        """
+        return list(await asyncio.gather(*[
+            self.generate_text_async(system, user, model_id=model_id, temperature=temperature)
+            for system, user in prompts
+        ]))
+
+    def generate_structured(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model_id: Optional[str] = None,
+        temperature: float = 0.7,
+    ) -> Any:
+        """
+        Generate a JSON response and return it parsed (dict / list).
+
+        Code fences around the JSON are stripped; raises ``ValueError`` when
+        the response is not valid JSON.
+        """
+        return _parse_json_response(self.generate_text(
+            system_prompt, user_prompt, model_id=model_id, temperature=temperature
+        ))
+
+    async def generate_structured_async(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model_id: Optional[str] = None,
+        temperature: float = 0.7,
+    ) -> Any:
+        """Asynchronous ``generate_structured``."""
+        return _parse_json_response(await self.generate_text_async(
+            system_prompt, user_prompt, model_id=model_id, temperature=temperature
+        ))
 
 
+def _parse_json_response(response: str) -> Any:
+    """Strip optional markdown code fences and parse the JSON payload."""
+    if "```json" in response:
+        response = response.split("```json")[1].split("```")[0]
+    elif "```" in response:
+        response = response.split("```")[1].split("```")[0]
+    try:
+        return json.loads(response.strip())
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Response is not valid JSON: {response[:200]!r}") from e
+
+
+# ========================================================================== #
+#  Response cache
+# ========================================================================== #
+
+def _digest_parts(*parts: str) -> str:
+    """
+    128-bit hex digest of ``parts`` (separator-delimited), fed to the hasher
+    piece by piece instead of joining the prompts into one string.  Uses
+    xxh3 when ``xxhash`` is installed (no security requirement here),
+    blake2b otherwise.
+    """
+    h = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+# Caches with an SQLite file, flushed at interpreter exit
+_persistent_caches: "weakref.WeakSet[ResponseCacheMixin]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_persistent_caches() -> None:
+    for cache in list(_persistent_caches):
+        cache.flush_response_cache()
+
+
+class ResponseCacheMixin:
+    """
+    Exact-match LRU cache for (system prompt, user prompt, model, temperature).
+
+    Only calls with ``temperature <= cache_max_temperature`` are cached, so
+    exploratory high-temperature generations (posts, mutations) stay
+    diverse while deterministic ones (evaluation, adaptation) recurring
+    across generations are answered from memory.  Empty responses (API
+    errors) are never cached.
+
+    With ``cache_path`` (or the ``SNACK_LLM_CACHE`` env var) set, entries are
+    also written to an SQLite file there, so they survive process restarts;
+    the in-memory LRU stays in front of it.  Writes are buffered and
+    committed ``_DB_FLUSH_EVERY`` at a time (and at exit, or on
+    ``flush_response_cache``), so a call never waits on a per-entry commit.
+    """
+
+    _DB_FLUSH_EVERY = 64
+
+    def _init_response_cache(
+        self, maxsize: int = 1024, max_temperature: float = 0.5, path: Optional[str] = None
+    ) -> None:
+        self.cache_maxsize = maxsize
+        self.cache_max_temperature = max_temperature
+        self._response_cache: "OrderedDict[str, str]" = OrderedDict()
+        # Bedrock's async path runs generate_text in worker threads
+        self._response_cache_lock = threading.Lock()
+
+        self._response_db: Optional[sqlite3.Connection] = None
+        # Entries written to the LRU but not yet committed to the file
+        self._response_db_pending: Dict[str, str] = {}
+        path = path or os.environ.get("SNACK_LLM_CACHE")
+        if path and maxsize > 0:
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # Shared across threads; every access holds _response_cache_lock
+            self._response_db = sqlite3.connect(path, check_same_thread=False)
+            self._response_db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._response_db.commit()
+            _persistent_caches.add(self)
+
+    def _response_cache_key(
+        self, system_prompt: str, user_prompt: str, model: str, temperature: float
+    ) -> Optional[str]:
+        """Cache key for a call, or None if the call shouldn't be cached."""
+        if self.cache_maxsize <= 0 or temperature > self.cache_max_temperature:
+            return None
+        return _digest_parts(system_prompt, user_prompt, model, f"{temperature:.2f}")
+
+    def _response_cache_get(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        with self._response_cache_lock:
+            value = self._response_cache.get(key)
+            if value is not None:
+                self._response_cache.move_to_end(key)
+            elif key in self._response_db_pending:
+                value = self._response_db_pending[key]
+                self._lru_insert(key, value)
+            elif self._response_db is not None:
+                row = self._response_db.execute(
+                    "SELECT value FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value = row[0]
+                    self._lru_insert(key, value)
+            return value
+
+    def _lru_insert(self, key: str, value: str) -> None:
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        self._response_cache[key] = value
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > self.cache_maxsize:
+            self._response_cache.popitem(last=False)
+
+    def _response_cache_put(self, key: Optional[str], value: str) -> None:
+        if key is None or not value:
+            return
+        with self._response_cache_lock:
+            self._lru_insert(key, value)
+            if self._response_db is not None:
+                self._response_db_pending[key] = value
+                if len(self._response_db_pending) >= self._DB_FLUSH_EVERY:
+                    self._flush_pending()
+
+    def _flush_pending(self) -> None:
+        """Commit buffered entries in one transaction (caller holds the lock)."""
+        if self._response_db is None or not self._response_db_pending:
+            return
+        self._response_db.executemany(
+            "INSERT OR REPLACE INTO responses (key, value) VALUES (?, ?)",
+            self._response_db_pending.items(),
+        )
+        self._response_db.commit()
+        self._response_db_pending.clear()
+
+    def flush_response_cache(self) -> None:
+        """Write any buffered entries to the SQLite file now."""
+        with self._response_cache_lock:
+            self._flush_pending()
+
+    def close_response_cache(self) -> None:
+        """Flush and close the SQLite file (the in-memory LRU keeps working)."""
+        with self._response_cache_lock:
+            self._flush_pending()
+            if self._response_db is not None:
+                self._response_db.close()
+                self._response_db = None
+        _persistent_caches.discard(self)
 
 
 # ========================================================================== #
 #  OpenAI
 # ========================================================================== #
 
-class OpenAIClient(LLMClient):
+class OpenAIClient(ResponseCacheMixin, LLMClient):
     """
     Client for OpenAI-compatible APIs (including vLLM / Ollama endpoints).
 
     Requires ``OPENAI_API_KEY`` env var (and optionally ``OPENAI_BASE_URL``).
+    Responses at ``temperature <= 0.5`` are cached (``cache_size`` entries,
+    0 disables; ``cache_path`` also persists them).  The sync and async SDK
+    clients are built on first use, so an async-only caller never opens a
+    sync connection pool; the async pool keeps up to ``max_connections``
+    sockets alive for reuse.
     """
 
     def __init__(
@@ -84,21 +328,37 @@ class OpenAIClient(LLMClient):
         base_url: Optional[str] = None,
         model: Optional[str] = None,
         rate_limiter: Optional[RateLimiter] = None,
+        cache_size: int = 1024,
+        max_connections: int = 64,
+        cache_path: Optional[str] = None,
     ):
         if OpenAI is None:
             raise ImportError("openai library not installed. Run: pip install openai")
 
         self.default_model = model or "gpt-4o"
         self.rate_limiter = rate_limiter or NoOpRateLimiter()
-
-        self._sync_client = OpenAI(
-            api_key=api_key or os.environ.get("OPENAI_API_KEY"),
-            base_url=base_url or os.environ.get("OPENAI_BASE_URL"),
-        )
-        self._async_client = AsyncOpenAI(
-            api_key=api_key or os.environ.get("OPENAI_API_KEY"),
-            base_url=base_url or os.environ.get("OPENAI_BASE_URL"),
-        )
+        self._init_response_cache(maxsize=cache_size, path=cache_path)
+
+        self._api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        self._base_url = base_url or os.environ.get("OPENAI_BASE_URL")
+        self._max_connections = max_connections
+
+    @cached_property
+    def _sync_client(self):
+        return OpenAI(api_key=self._api_key, base_url=self._base_url)
+
+    @cached_property
+    def _async_client(self):
+        kwargs = {}
+        if DefaultAsyncHttpxClient is not None:
+            # Keep connections (and their TLS sessions) alive across calls
+            kwargs["http_client"] = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=max(1, self._max_connections // 2),
+                )
+            )
+        return AsyncOpenAI(api_key=self._api_key, base_url=self._base_url, **kwargs)
 
     def generate_text(
         self,
@@ -108,6 +368,11 @@ class OpenAIClient(LLMClient):
         temperature: float = 0.7,
     ) -> str:
         model = model_id or self.default_model
+        key = self._response_cache_key(system_prompt, user_prompt, model, temperature)
+        cached = self._response_cache_get(key)
+        if cached is not None:
+            return cached
+
         self.rate_limiter.acquire_sync()
         try:
             response = self._sync_client.chat.completions.create(
@@ -118,10 +383,12 @@ class OpenAIClient(LLMClient):
                 ],
                 temperature=temperature,
             )
-            return response.choices[0].message.content or ""
+            text = response.choices[0].message.content or ""
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             return ""
+        self._response_cache_put(key, text)
+        return text
 
     async def generate_text_async(
         self,
@@ -131,6 +398,11 @@ class OpenAIClient(LLMClient):
         temperature: float = 0.7,
     ) -> str:
         model = model_id or self.default_model
+        key = self._response_cache_key(system_prompt, user_prompt, model, temperature)
+        cached = self._response_cache_get(key)
+        if cached is not None:
+            return cached
+
         await self.rate_limiter.acquire()
         try:
             response = await self._async_client.chat.completions.create(
@@ -141,19 +413,97 @@ class OpenAIClient(LLMClient):
                 ],
                 temperature=temperature,
             )
-            return response.choices[0].message.content or ""
+            text = response.choices[0].message.content or ""
         except Exception as e:
             logger.error(f"OpenAI API async error: {e}")
             return ""
+        self._response_cache_put(key, text)
+        return text
+
+    async def generate_text_stream_async(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model_id: Optional[str] = None,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[str]:
+        model = model_id or self.default_model
+        await self.rate_limiter.acquire()
+        try:
+            stream = await self._async_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=temperature,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"OpenAI API stream error: {e}")
+
+    async def generate_text_batch_async(
+        self,
+        prompts: List[Tuple[str, str]],
+        model_id: Optional[str] = None,
+        temperature: float = 0.7,
+    ) -> List[str]:
+        """
+        Batched generation: identical prompt pairs are served by a single
+        request with ``n`` choices; distinct pairs run concurrently.
+        """
+        model = model_id or self.default_model
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for i, pair in enumerate(prompts):
+            groups.setdefault(pair, []).append(i)
+
+        async def _group(pair: Tuple[str, str], n: int) -> List[str]:
+            system_prompt, user_prompt = pair
+            if n == 1:
+                return [await self.generate_text_async(
+                    system_prompt, user_prompt, model_id=model, temperature=temperature
+                )]
+            await self.rate_limiter.acquire()
+            try:
+                response = await self._async_client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    temperature=temperature,
+                    n=n,
+                )
+                texts = [choice.message.content or "" for choice in response.choices]
+            except Exception as e:
+                logger.error(f"OpenAI API batch error: {e}")
+                texts = []
+            return (texts + [""] * n)[:n]
+
+        group_results = await asyncio.gather(*[
+            _group(pair, len(indices)) for pair, indices in groups.items()
+        ])
+        results = [""] * len(prompts)
+        for indices, texts in zip(groups.values(), group_results):
+            for i, text in zip(indices, texts):
+                results[i] = text
+        return results
 
 
 # ========================================================================== #
 #  Amazon Bedrock
 # ========================================================================== #
 
-class BedrockClient(LLMClient):
+class BedrockClient(ResponseCacheMixin, LLMClient):
     """
     Client for Amazon Bedrock via the Converse API.
+
+    Responses at ``temperature <= 0.5`` are cached (``cache_size`` entries,
+    0 disables; ``cache_path`` also persists them).  boto3 is blocking, so
+    the async path runs calls on a dedicated pool of ``max_workers`` threads.
     """
 
     def __init__(
@@ -161,16 +511,31 @@ class BedrockClient(LLMClient):
         region_name: str = "us-east-1",
         model: Optional[str] = None,
         rate_limiter: Optional[RateLimiter] = None,
+        cache_size: int = 1024,
+        max_workers: int = 16,
+        cache_path: Optional[str] = None,
     ):
         if boto3 is None:
             raise ImportError("boto3 not installed. Run: pip install boto3")
 
+        # HTTP pool sized to the executor so worker threads never queue for a socket
         self.bedrock_runtime = boto3.client(
             service_name="bedrock-runtime",
             region_name=region_name,
+            config=BotoConfig(
+                max_pool_connections=max_workers,
+                retries={"mode": "adaptive"},
+            ),
         )
         self.default_model = model or "anthropic.claude-3-sonnet-20240229-v1:0"
         self.rate_limiter = rate_limiter or NoOpRateLimiter()
+        self._init_response_cache(maxsize=cache_size, path=cache_path)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bedrock")
+
+    def __del__(self):
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
 
     def generate_text(
         self,
@@ -180,6 +545,11 @@ class BedrockClient(LLMClient):
         temperature: float = 0.7,
     ) -> str:
         model = model_id or self.default_model
+        key = self._response_cache_key(system_prompt, user_prompt, model, temperature)
+        cached = self._response_cache_get(key)
+        if cached is not None:
+            return cached
+
         self.rate_limiter.acquire_sync()
         try:
             response = self.bedrock_runtime.converse(
@@ -190,10 +560,12 @@ class BedrockClient(LLMClient):
                 system=[{"text": system_prompt}],
                 inferenceConfig={"temperature": temperature},
             )
-            return response["output"]["message"]["content"][0]["text"]
+            text = response["output"]["message"]["content"][0]["text"]
         except Exception as e:
             logger.error(f"Bedrock API error: {e}")
             return ""
+        self._response_cache_put(key, text)
+        return text
 
     async def generate_text_async(
         self,
@@ -202,9 +574,9 @@ class BedrockClient(LLMClient):
         model_id: Optional[str] = None,
         temperature: float = 0.7,
     ) -> str:
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
-            None,
+            self._executor,
             lambda: self.generate_text(system_prompt, user_prompt, model_id, temperature),
         )
 
@@ -212,26 +584,73 @@ class BedrockClient(LLMClient):
 #  Mock Client (for testing)
 # ========================================================================== #
 
+# Prompt markers -> canned response, in priority order (first rule wins).
+# Each marker keeps the case sensitivity of the original substring checks.
+_MOCK_RULES = [
+    (r"(?i:diversity)|Rate this user",
+     '{"post_quality": 0.8, "reply_quality": 0.7, "engagement": 0.6, "authenticity": 0.9, "safety": 1.0, "incisiveness": 0.5, "judiciousness": 0.4}'),
+    (r"trending discussion topics",
+     '["AI in Education", "Vegan Diet", "Mars Colonization"]'),
+    (r"nickname",
+     'MockPersona'),
+    (r"Traveler Genome",
+     '{"source_bias": {"academic": 0.5, "news": 0.2, "official": -0.1, "blogs": 0.8}, "query_templates": "template_v1_broad", "search_depth": 1, "novelty_weight": 0.7}'),
+    (r"planning a new post|(?i:brainstorm)",
+     '["Angle 1: AI is great", "Angle 2: AI is scary"]'),
+]
+# One alternation scanned once per prompt; group k <-> rule k
+_MOCK_RULE_RE = re.compile("|".join(f"({pattern})" for pattern, _ in _MOCK_RULES))
+_MOCK_RESPONSES = tuple(response for _, response in _MOCK_RULES)
+
+
+def _preparse(response: str) -> Any:
+    try:
+        return json.loads(response)
+    except json.JSONDecodeError:
+        return None
+
+
+# Parsed once at import so generate_structured skips the JSON round-trip
+_MOCK_PARSED = tuple(_preparse(response) for response in _MOCK_RESPONSES)
+_MOCK_JSON_RE = re.compile("json", re.IGNORECASE)
+_MOCK_DEFAULT_RESPONSE = "This is a mock response from the AI."
+
+
 class MockLLMClient(LLMClient):
     """
     Mock client that returns static or randomized responses.
     Useful for testing the evolution loop without spending API credits.
     """
+    @staticmethod
+    def _match_rule(system_prompt: str, user_prompt: str) -> Optional[int]:
+        """Index of the first ``_MOCK_RULES`` entry matching a JSON request."""
+        if _MOCK_JSON_RE.search(user_prompt) or _MOCK_JSON_RE.search(system_prompt):
+            best = len(_MOCK_RESPONSES)
+            for match in _MOCK_RULE_RE.finditer(user_prompt):
+                best = min(best, match.lastindex - 1)
+                if best == 0:
+                    break
+            if best < len(_MOCK_RESPONSES):
+                return best
+        return None
+
     def generate_text(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
         # Return a JSON-looking response if requested
-        if "JSON" in user_prompt.upper() or "JSON" in system_prompt.upper():
-            if "diversity" in user_prompt.lower() or "Rate this user" in user_prompt:
-                 return '{"post_quality": 0.8, "reply_quality": 0.7, "engagement": 0.6, "authenticity": 0.9, "safety": 1.0, "incisiveness": 0.5, "judiciousness": 0.4}'
-            if "trending discussion topics" in user_prompt:
-                 return '["AI in Education", "Vegan Diet", "Mars Colonization"]'
-            if "nickname" in user_prompt:
-                 return 'MockPersona'
-            if "Traveler Genome" in user_prompt:
-                 return '{"source_bias": {"academic": 0.5, "news": 0.2, "official": -0.1, "blogs": 0.8}, "query_templates": "template_v1_broad", "search_depth": 1, "novelty_weight": 0.7}'
-            if "planning a new post" in user_prompt or "brainstorm" in user_prompt.lower():
-                 return '["Angle 1: AI is great", "Angle 2: AI is scary"]'
+        best = self._match_rule(system_prompt, user_prompt)
+        if best is not None:
+            return _MOCK_RESPONSES[best]
         
-        return "This is a mock response from the AI."
+        return _MOCK_DEFAULT_RESPONSE
+
+    def generate_structured(self, system_prompt: str, user_prompt: str, **kwargs) -> Any:
+        best = self._match_rule(system_prompt, user_prompt)
+        if best is None or _MOCK_PARSED[best] is None:
+            raise ValueError("Mock response is not valid JSON")
+        # Callers may mutate the result; hand out a copy of the shared constant
+        return copy.deepcopy(_MOCK_PARSED[best])
+
+    async def generate_structured_async(self, system_prompt: str, user_prompt: str, **kwargs) -> Any:
+        return self.generate_structured(system_prompt, user_prompt)
 
     async def generate_text_async(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
-        return self.generate_text(system_prompt, user_prompt, **kwargs)
+        return self.generate_text(system_prompt, user_prompt)
@@ -91,7 +91,7 @@ class RateLimiter:
                 if wait <= 0:
                     self._consume(estimated_tokens)
                     return
-            logger.debug(f"[RateLimiter] Waiting {wait:.2f}s (sync)")
+            logger.debug("[RateLimiter] Waiting %.2fs (sync)", wait)
             time.sleep(min(wait, 5.0))
 
     async def acquire(self, estimated_tokens: int = 500) -> None:
@@ -103,7 +103,7 @@ class RateLimiter:
                 if wait <= 0:
                     self._consume(estimated_tokens)
                     return
-            logger.debug(f"[RateLimiter] Waiting {wait:.2f}s (async)")
+            logger.debug("[RateLimiter] Waiting %.2fs (async)", wait)
             await asyncio.sleep(min(wait, 5.0))
 
     def report_actual_tokens(self, actual_tokens: int, estimated: int = 500) -> None:
@@ -262,7 +262,13 @@ async def async_main():
         
 def main():
     """Sync entry point."""
-    asyncio.run(async_main())
+    # Faster event loop when available (optional dependency)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(async_main())
+    else:
+        uvloop.run(async_main())
 
 
 if __name__ == "__main__":
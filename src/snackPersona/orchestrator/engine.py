@@ -7,23 +7,32 @@ Supports both synchronous and asynchronous execution.
 """
 
 import asyncio
+import heapq
 import json
 import random
+import re
+import sys
 import uuid
 from datetime import datetime
-from typing import List, Optional, Dict
+from operator import attrgetter
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
 
 from snackPersona.utils.data_models import PersonaGenotype, Individual, MediaItem
 from snackPersona.simulation.agent import SimulationAgent
 from snackPersona.simulation.environment import SimulationEnvironment
+from snackPersona.simulation.semantic_cache import AffinityPrefilter
 from snackPersona.evaluation.evaluator import Evaluator
 from snackPersona.evaluation.bio_evaluator import BioStyleEvaluator
 from snackPersona.evaluation.diversity import DiversityEvaluator
+from snackPersona.evaluation.diversity.embedding import _encode_one
 from snackPersona.orchestrator.operators import MutationOperator, CrossoverOperator
 from snackPersona.persona_store.dynamo_store import DynamoDBStore
 from snackPersona.llm.llm_client import LLMClient
 from snackPersona.compiler.compiler import compile_persona
 from snackPersona.utils.media_dataset import MediaDataset
+from snackPersona.runtime.async_runner import AsyncEvolutionRunner
 from snackPersona.utils.logger import logger, EvolutionLogger
 
 # Traveler Integration
@@ -32,7 +41,6 @@ from snackPersona.traveler.executor.traveler import Traveler
 
 # Repository Integration - Removed SQL
 # from snackWeb.backend.db.repository import record_url_visit, get_domain_visit_counts
-from urllib.parse import urlparse
 
 
 # Default config — overridden by JSON config if provided
@@ -55,6 +63,10 @@ DEFAULT_CONFIG = {
         "group_size": 4,
         "reply_rounds": 3,
         "mutation_rate": 0.2,
+        "max_concurrent_llm": 8,
+        # e.g. {"low": 0.15, "high": 0.7} to settle clear-cut engage decisions
+        # from bio/post embedding similarity without an LLM call
+        "affinity_prefilter": None,
     },
 }
 
@@ -67,6 +79,49 @@ _FALLBACK_TOPICS = [
     "Entrepreneurship", "Digital Privacy", "Urban Living",
 ]
 
+# Double-quoted JSON string literal (escapes included); linear scan, no backtracking
+_QUOTED_STRING_RE = re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)"')
+
+
+def _parse_string_list(text: str, limit: int) -> List[str]:
+    """
+    Parse an LLM reply that should be a JSON array of strings.  A reply
+    that isn't valid JSON (trailing chatter, a missing bracket, ...) still
+    yields its quoted strings instead of failing the whole call.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+    try:
+        items = json.loads(text)
+    except json.JSONDecodeError:
+        items = []
+        for raw in _QUOTED_STRING_RE.findall(text):
+            try:
+                items.append(json.loads(f'"{raw}"'))
+            except json.JSONDecodeError:
+                items.append(raw)
+    if not isinstance(items, list):
+        return []
+    return [str(t) for t in items[:limit]]
+
+
+def _distinct_indices(rng: np.random.Generator, n: int, shape: Tuple[int, ...], k: int) -> np.ndarray:
+    """
+    ``shape + (k,)`` array where each length-k row holds k distinct indices
+    drawn uniformly from ``range(n)`` (``k <= n``).  The j-th draw picks from
+    the ``n - j`` values still free and is shifted past the ones already
+    taken, so the cost is O(k^2) per row whatever ``n`` is.
+    """
+    out = np.empty(shape + (k,), dtype=np.int64)
+    for j in range(k):
+        draw = rng.integers(0, n - j, size=shape)
+        taken = np.sort(out[..., :j], axis=-1)
+        for t in range(j):
+            draw += draw >= taken[..., t]
+        out[..., j] = draw
+    return out
+
 
 class EvolutionEngine:
     """
@@ -118,6 +173,16 @@ class EvolutionEngine:
         # Adapter
         self.adapter = PersonaToTravelerAdapter(llm_client)
 
+        # Bounds concurrent LLM-heavy tasks (group episodes, offspring creation)
+        self.runner = AsyncEvolutionRunner(self.sim_config.get("max_concurrent_llm", 8))
+
+        # Optional embedding gate in front of engage decisions; shared across
+        # groups and generations, reusing the process-wide bio embedding cache
+        prefilter_cfg = self.sim_config.get("affinity_prefilter")
+        self.affinity_prefilter = (
+            AffinityPrefilter(embed_fn=_encode_one, **prefilter_cfg) if prefilter_cfg else None
+        )
+
     def initialize_population(self, seed_genotypes: List[PersonaGenotype]):
         """
         Initializes the population from seed genotypes.
@@ -153,36 +218,32 @@ class EvolutionEngine:
             + w.get('judiciousness', 0.10) * s.judiciousness
         )
 
-    def _sharing_function(self, distance: float) -> float:
-        """Fitness sharing function. Returns 1 when d=0, 0 when d>=sigma."""
-        if distance >= self.niche_sigma:
-            return 0.0
-        return 1.0 - (distance / self.niche_sigma) ** self.niche_alpha
+    def _sharing_matrix(self, distances: np.ndarray) -> np.ndarray:
+        """
+        Fitness sharing function applied elementwise to a distance matrix:
+        ``1 - (d / sigma) ** alpha`` below sigma (1 at d=0), 0 from sigma on.
+        """
+        within = distances < self.niche_sigma
+        ratio = np.where(within, distances / self.niche_sigma, 0.0)
+        return np.where(within, 1.0 - ratio ** self.niche_alpha, 0.0)
 
     def _apply_fitness_sharing(self):
         """Niching via fitness sharing — penalises clusters of similar genotypes."""
-        n = len(self.population)
-
-        # Precompute pairwise genotype distances
-        distances: Dict[tuple, float] = {}
-        for i in range(n):
-            for j in range(i + 1, n):
-                d = DiversityEvaluator.calculate_genotype_distance(
-                    self.population[i].genotype,
-                    self.population[j].genotype,
-                )
-                distances[(i, j)] = d
-                distances[(j, i)] = d
+        if not self.population:
+            return
+
+        # Precompute pairwise genotype distances (one batched embedding pass)
+        distances = DiversityEvaluator.calculate_genotype_distance_matrix(
+            [ind.genotype for ind in self.population]
+        )
 
-        for i in range(n):
-            raw = self._raw_fitness(self.population[i])
-            niche_count = 1.0  # self
-            for j in range(n):
-                if i == j:
-                    continue
-                niche_count += self._sharing_function(distances.get((i, j), 1.0))
+        # Niche count = 1 (self) + sharing with every other individual
+        sharing = self._sharing_matrix(distances)
+        np.fill_diagonal(sharing, 0.0)
+        niche_counts = 1.0 + sharing.sum(axis=1)
 
-            self.population[i].shared_fitness = raw / niche_count
+        for ind, niche_count in zip(self.population, niche_counts):
+            ind.shared_fitness = self._raw_fitness(ind) / float(niche_count)
 
     # ------------------------------------------------------------------ #
     #  Main loop — async
@@ -225,7 +286,7 @@ class EvolutionEngine:
                 break
 
             # 4. Selection & Reproduction
-            next_generation = self._produce_next_generation()
+            next_generation = await self._produce_next_generation_async()
             self.population = next_generation
 
     def run_evolution_loop(self):
@@ -252,14 +313,10 @@ class EvolutionEngine:
                 user_prompt=user_prompt,
                 temperature=0.9,
             )
-            # Strip markdown fences if present
-            text = response.strip()
-            if text.startswith("```"):
-                text = text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-            topics = json.loads(text)
-            if isinstance(topics, list) and len(topics) > 0:
+            topics = _parse_string_list(response, count)
+            if topics:
                 logger.info(f"Generated topics: {topics}")
-                return [str(t) for t in topics]
+                return topics
         except Exception as e:
             logger.warning(f"LLM topic generation failed ({e}), using fallback topics")
         return list(_FALLBACK_TOPICS)
@@ -280,37 +337,52 @@ class EvolutionEngine:
 
         all_agent_posts: Dict[str, List[str]] = {}
         all_transcripts: List[List[dict]] = []
+        eval_jobs = []
 
+        # Bio quality doesn't depend on the episodes: score the whole population in batched calls
+        bio_scores = self.bio_evaluator.evaluate_bios([ind.genotype for ind in self.population])
+
+        # 1. Adapt Genotype -> TravelerGenome for the whole population in one batched call
+        traveler_genomes = await self.adapter.adapt_batch_async(
+            [ind.genotype for ind in self.population]
+        )
+
+        # Set up every group first (agents, topic, media item)
+        groups = []
         for i in range(0, len(indices), group_size):
             group_indices = indices[i: i + group_size]
             group_individuals = [self.population[idx] for idx in group_indices]
 
             sim_agents = []
-            for ind in group_individuals:
-                # 1. Adapt Genotype -> TravelerGenome
-                traveler_genome = self.adapter.adapt(ind.genotype)
-                
+            for idx, ind in zip(group_indices, group_individuals):
                 # 2. Create Traveler
                 # Pass global_domain_counts to influence diversity
-                traveler = Traveler(traveler_genome, global_domain_counts=global_domain_counts)
+                traveler = Traveler(traveler_genomes[idx], global_domain_counts=global_domain_counts)
                 
                 # 3. Create Agent with Traveler
                 agent = SimulationAgent(ind.genotype, self.llm_client, traveler=traveler)
                 sim_agents.append(agent)
-            env = SimulationEnvironment(sim_agents)
+            env = SimulationEnvironment(sim_agents, affinity_prefilter=self.affinity_prefilter)
 
             topic = random.choice(episode_topics)
-            transcript = await env.run_episode_async(rounds=reply_rounds, topic=topic)
 
             # Optional media episode
+            selected_media = None
             if self.media_dataset and len(self.media_dataset) > 0:
                 media_items = self.media_dataset.get_all_media_items()
                 selected_media = random.choice(media_items)
-                media_transcript = await env.run_media_episode_async(
-                    selected_media, rounds=1
-                )
-                transcript.extend(media_transcript)
 
+            groups.append((i, group_indices, group_individuals, sim_agents, env, topic, selected_media))
+
+        # Groups are independent, so their (LLM-bound) episodes run concurrently
+        group_transcripts = await self.runner.run_many(
+            self._run_group_episodes_async(env, topic, selected_media, reply_rounds)
+            for _, _, _, _, env, topic, selected_media in groups
+        )
+
+        for (i, group_indices, group_individuals, sim_agents, env, topic, _), transcript in zip(
+            groups, group_transcripts
+        ):
             # Clear feed between groups (bug fix)
             env.clear_feed()
 
@@ -320,8 +392,12 @@ class EvolutionEngine:
             # DB Persistence (DynamoDB)
             self._save_transcript_to_db(transcript, topic)
 
-            # Log timeline events for Web UI
+            # Log timeline events for Web UI (and index non-pass content by
+            # author on the same pass, instead of rescanning per individual)
+            posts_by_author: Dict[str, List[str]] = {}
             for event in transcript:
+                if event.get('type') != 'pass':
+                    posts_by_author.setdefault(event.get('author'), []).append(event.get('content', ''))
                 self.evo_logger.log_timeline_event(
                     event_type=event.get('type', 'UNKNOWN').upper(),
                     agent_name=event.get('author', 'System'),
@@ -330,34 +406,49 @@ class EvolutionEngine:
                     metadata={"topic": topic, "group_id": i}
                 )
 
-            # Evaluate
-            for ind in group_individuals:
+            # Queue evaluations; they run together once every group is logged
+            agents_by_name = {}
+            for a in sim_agents:
+                agents_by_name.setdefault(a.genotype.name, a)
+            for idx, ind in zip(group_indices, group_individuals):
                 # Find matching agent for research results
-                agent = next((a for a in sim_agents if a.genotype.name == ind.genotype.name), None)
+                agent = agents_by_name.get(ind.genotype.name)
                 research_res = agent.last_research_result if agent else None
+                eval_jobs.append((idx, ind, transcript, research_res))
 
-                scores = self.evaluator.evaluate(
-                    ind.genotype, 
-                    transcript,
-                    global_domain_counts=global_domain_counts,
-                    research_result=research_res
-                )
-                
-                # Evaluate bio quality separately
-                scores.bio_quality = self.bio_evaluator.evaluate_bio(ind.genotype)
-                
-                ind.scores = scores
+                all_agent_posts[ind.genotype.name] = posts_by_author.get(ind.genotype.name, [])
 
-                my_posts = [
-                    e.get('content', '')
-                    for e in transcript
-                    if e.get('author') == ind.genotype.name and e.get('type') != 'pass'
-                ]
-                all_agent_posts[ind.genotype.name] = my_posts
+        # One (blocking) judge call per individual, independent of each other:
+        # run them on worker threads under the runner's bound instead of one by one
+        all_scores = await asyncio.gather(*[
+            self.runner.run_in_thread(
+                self.evaluator.evaluate, ind.genotype, transcript, global_domain_counts, research_res
+            )
+            for _, ind, transcript, research_res in eval_jobs
+        ])
+        for (idx, ind, _, _), scores in zip(eval_jobs, all_scores):
+            scores.bio_quality = bio_scores[idx]
+            ind.scores = scores
 
         pop_diversity = DiversityEvaluator.calculate_population_diversity(all_agent_posts)
         return pop_diversity, all_transcripts
 
+    async def _run_group_episodes_async(
+        self,
+        env: SimulationEnvironment,
+        topic: str,
+        media_item: Optional[MediaItem],
+        reply_rounds: int,
+    ) -> List[Dict]:
+        """Runs one group's topic episode (plus the media episode, if any)."""
+        transcript = await env.run_episode_async(rounds=reply_rounds, topic=topic)
+        if media_item is not None:
+            media_transcript = await env.run_media_episode_async(
+                media_item, rounds=1
+            )
+            transcript.extend(media_transcript)
+        return transcript
+
     def _save_transcript_to_db(self, transcript: List[Dict], topic: str):
         """Saves transcript events (Posts/Replies) to DynamoDB."""
         # This is a rudimentary conversion.
@@ -424,44 +515,67 @@ class EvolutionEngine:
     #  Reproduction
     # ------------------------------------------------------------------ #
 
-    def _produce_next_generation(self) -> List[Individual]:
-        """Selects parents and creates offspring using shared_fitness."""
+    def _plan_offspring(self):
+        """
+        Selects the elites and, for every remaining slot, a parent pair via
+        tournament selection on shared_fitness plus whether to mutate.
+        """
         mutation_rate = self.sim_config.get("mutation_rate", 0.2)
 
-        sorted_pop = sorted(
-            self.population,
-            key=lambda ind: ind.shared_fitness,
-            reverse=True,
-        )
-
-        # Elitism
-        next_gen = [
+        # Elitism: only the top elite_count are needed, not a full sort
+        elites = [
             Individual(genotype=ind.genotype, phenotype=ind.phenotype)
-            for ind in sorted_pop[:self.elite_count]
+            for ind in heapq.nlargest(
+                self.elite_count, self.population, key=attrgetter("shared_fitness")
+            )
         ]
 
-        # Fill via tournament selection on shared_fitness
-        while len(next_gen) < self.population_size:
-            p1 = max(
-                random.sample(self.population, min(3, len(self.population))),
-                key=lambda i: i.shared_fitness,
-            ).genotype
-            p2 = max(
-                random.sample(self.population, min(3, len(self.population))),
-                key=lambda i: i.shared_fitness,
-            ).genotype
+        # Fill via tournament selection on shared_fitness: all tournaments
+        # and mutation coin flips are drawn in one batch.  The generator is
+        # seeded from `random`, so seeding that still fixes the plan.
+        population = self.population
+        n_children = self.population_size - len(elites)
+        if n_children <= 0:
+            return elites, []
+        n = len(population)
+        rng = np.random.default_rng(random.getrandbits(64))
+        fitness = np.fromiter((ind.shared_fitness for ind in population), dtype=np.float64, count=n)
+        # 3 distinct contestants per tournament (2 per child)
+        contestants = _distinct_indices(rng, n, (n_children, 2), min(3, n))
+        best = fitness[contestants].argmax(axis=-1)
+        parents = np.take_along_axis(contestants, best[..., None], axis=-1)[..., 0]
+        mutate = rng.random(n_children) < mutation_rate
+
+        plan = [
+            (population[i1].genotype, population[i2].genotype, m)
+            for (i1, i2), m in zip(parents.tolist(), mutate.tolist())
+        ]
+        return elites, plan
 
-            child_genotype = self.crossover_op.crossover(p1, p2)
+    def _breed_child(self, p1: PersonaGenotype, p2: PersonaGenotype, mutate: bool) -> Individual:
+        """Crossover (+ optional mutation) and nickname for one child."""
+        child_genotype = self.crossover_op.crossover(p1, p2)
 
-            if random.random() < mutation_rate:
-                child_genotype = self.mutation_op.mutate(child_genotype)
+        if mutate:
+            child_genotype = self.mutation_op.mutate(child_genotype)
 
-            # Generate a nickname based on the child's attributes
-            child_genotype = self._generate_nickname(child_genotype)
+        # Generate a nickname based on the child's attributes
+        child_genotype = self._generate_nickname(child_genotype)
 
-            next_gen.append(
-                Individual(genotype=child_genotype, phenotype=compile_persona(child_genotype))
-            )
+        return Individual(genotype=child_genotype, phenotype=compile_persona(child_genotype))
+
+    async def _produce_next_generation_async(self) -> List[Individual]:
+        """
+        Selects parents and creates offspring using shared_fitness.  Children
+        are independent, so their (blocking) operator LLM calls run on
+        worker threads, bounded by the runner.
+        """
+        elites, plan = self._plan_offspring()
+        children = await asyncio.gather(*[
+            self.runner.run_in_thread(self._breed_child, p1, p2, mutate)
+            for p1, p2, mutate in plan
+        ])
+        next_gen = elites + list(children)
 
         logger.info(f"Next generation: {len(next_gen)} individuals produced")
         return next_gen
@@ -484,7 +598,8 @@ class EvolutionEngine:
             nickname = response.strip().split()[0]  # Take first word only
             if nickname and len(nickname) <= 20:
                 genotype = genotype.model_copy(deep=True)
-                genotype.name = nickname
+                # Plain assignment skips the model's interning validator
+                genotype.name = sys.intern(nickname)
         except Exception as e:
             logger.debug(f"Nickname generation failed: {e}")
         return genotype
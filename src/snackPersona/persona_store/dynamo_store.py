@@ -1,32 +1,210 @@
+import gzip
+import hashlib
 import json
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict
-from decimal import Decimal
+from decimal import Context, Decimal
 
 from snackPersona.utils.data_models import PersonaGenotype
-from snackPersona.utils.dynamo_client import get_table
+import boto3
+from boto3.dynamodb.types import Binary
+
+from snackPersona.utils.dynamo_client import (
+    get_dynamodb_resource,
+    get_s3_client,
+    get_table,
+    with_retries,
+)
 from botocore.exceptions import ClientError
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+# Validates a whole archive straight from JSON inside pydantic-core
+_POPULATION_ADAPTER = TypeAdapter(List[PersonaGenotype])
+
+# DynamoDB BatchWriteItem accepts at most 25 items per request
+_BATCH_SIZE = 25
+_MAX_WRITE_WORKERS = 8
+
+
+def _dumps(obj) -> str:
+    """JSON-encode ``obj`` (orjson when installed, else the stdlib)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _dumps_bytes(obj) -> bytes:
+    """JSON-encode ``obj`` to UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _compress(raw: bytes):
+    """Compress archive JSON; returns (payload, codec)."""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(raw), 'zstd+json'
+    return gzip.compress(raw), 'gzip+json'
+
+
+def _decompress(payload: bytes, codec: str) -> bytes:
+    if codec == 'zstd+json':
+        if zstandard is None:
+            raise ImportError("zstandard is required to read this archive. Run: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if codec == 'gzip+json':
+        return gzip.decompress(payload)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+# 10 significant digits: plenty for stats, and well inside DynamoDB's 38-digit limit
+_DECIMAL_CTX = Context(prec=10)
+
+# STATS item attribute -> key in the engine's stats dict
+_STATS_DECIMAL_FIELDS = {
+    'population_diversity': 'diversity',
+    'fitness_mean': 'fitness_mean',
+}
+
+
+def _to_decimal(value) -> Decimal:
+    """
+    Float -> Decimal for DynamoDB number attributes, rounded in the fixed
+    context straight from the float (``Decimal(float)`` alone would keep the
+    full binary expansion, which DynamoDB rejects).
+    """
+    return _DECIMAL_CTX.create_decimal_from_float(float(value))
+
+
+def _to_decimal_dict(stats: Dict) -> Dict[str, Decimal]:
+    """Decimal attributes for a STATS item (missing stats default to 0)."""
+    return {
+        attr: _to_decimal(stats.get(key, 0.0))
+        for attr, key in _STATS_DECIMAL_FIELDS.items()
+    }
+
+
+def _profile_hash(d: Dict) -> str:
+    """Stable digest of the profile fields written for a persona."""
+    return hashlib.blake2b(d['bio'].encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _persona_item(d: Dict, profile_hash: str) -> Dict:
+    """Profile item from a dumped PersonaGenotype dict."""
+    name = d['name']
+    # PK=PERSONA, SK=PERSONA#<Name>
+    # GSI1PK=PERSONA, GSI1SK=<Name>
+    return {
+        'PK': f"PERSONA#{name}",
+        'SK': f"PERSONA#{name}",
+        'GSI1PK': 'PERSONA',
+        'GSI1SK': name,
+        'id': name,
+        'name': name,
+        'bio': d['bio'],
+        'is_active': True,
+        'profile_hash': profile_hash
+    }
+
+
+@with_retries
+def _write_items(table, items: List[Dict]) -> None:
+    with table.batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+
+
+# boto3 resources/sessions aren't thread-safe, so each writer thread keeps
+# its own session and table handles; the pool (and so the threads) lives
+# for the whole process, and sessions are built once per thread.
+_write_local = threading.local()
+_write_pool: Optional[ThreadPoolExecutor] = None
+_write_pool_lock = threading.Lock()
+
+
+def _get_write_pool() -> ThreadPoolExecutor:
+    global _write_pool
+    if _write_pool is None:
+        with _write_pool_lock:
+            if _write_pool is None:
+                _write_pool = ThreadPoolExecutor(
+                    max_workers=_MAX_WRITE_WORKERS, thread_name_prefix="dynamo-write"
+                )
+    return _write_pool
+
+
+def _thread_table(table_name: str):
+    """This thread's handle on ``table_name`` (session created on first use)."""
+    tables = getattr(_write_local, "tables", None)
+    if tables is None:
+        tables = _write_local.tables = {}
+        _write_local.resource = get_dynamodb_resource(boto3.session.Session())
+    table = tables.get(table_name)
+    if table is None:
+        table = tables[table_name] = _write_local.resource.Table(table_name)
+    return table
+
+
+def _write_chunk(table_name: str, items: List[Dict]) -> None:
+    _write_items(_thread_table(table_name), items)
+
+
 class DynamoDBStore:
-    def __init__(self, table_name=None):
-        self.table = get_table()
+    """
+    Generation archive, stats and persona profiles in DynamoDB.
+
+    When an S3 bucket is configured (``archive_bucket`` or the
+    ``ARCHIVE_BUCKET`` env var), generation archives are written to S3 as
+    gzipped JSON and the DynamoDB ARCHIVE item only keeps a pointer, which
+    keeps large populations clear of the 400 KB item limit.
+    """
+
+    def __init__(self, table_name=None, archive_bucket: Optional[str] = None):
+        self.table = get_table(table_name)
         # Mock storage_dir for compatibility if needed, but we don't use it.
         self.storage_dir = "dynamodb"
+        self.archive_bucket = archive_bucket or os.getenv("ARCHIVE_BUCKET")
+        self._s3 = get_s3_client() if self.archive_bucket else None
+        # persona name -> profile hash last written by this store
+        self._profile_hashes: Dict[str, str] = {}
 
     def list_generations(self) -> List[int]:
         """Return a sorted list of available generation IDs from DynamoDB."""
         try:
-            # Query GSI1 where GSI1PK="STATS" (sorted by SK or GSI1SK)
-            response = self.table.query(
+            # Query GSI1 where GSI1PK="STATS". GSI1SK is the zero-padded generation
+            # and each generation has exactly one STATS item, so results arrive
+            # sorted and unique; only the generation attribute is fetched.
+            query_kwargs = dict(
                 IndexName='GSI1',
                 KeyConditionExpression='GSI1PK = :pk',
                 ExpressionAttributeValues={':pk': 'STATS'},
+                ProjectionExpression='#gen',
+                ExpressionAttributeNames={'#gen': 'generation'},
                 ScanIndexForward=True
             )
-            gens = [int(item['generation']) for item in response.get('Items', [])]
-            return sorted(list(set(gens)))
+            gens: List[int] = []
+            while True:
+                response = with_retries(self.table.query)(**query_kwargs)
+                gens.extend(int(item['generation']) for item in response.get('Items', []))
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    return gens
+                query_kwargs['ExclusiveStartKey'] = last_key
         except ClientError as e:
             logger.error(f"Failed to list generations: {e}")
             return []
@@ -38,61 +216,111 @@ class DynamoDBStore:
         - Persists Stats (for backend)
         - Persists Personas (for backend/frontend profile view)
         """
+        # Dump each persona once; the archive and the profile items share the dicts
+        dumps = [p.model_dump(mode='json') for p in population]
         try:
-            with self.table.batch_writer() as batch:
-                # 1. Save Archive
-                archive_data = [p.model_dump() for p in population]
-                batch.put_item(Item={
-                    'PK': 'ARCHIVE',
-                    'SK': f"GEN#{generation_id}",
-                    'data': json.dumps(archive_data),
-                    'generation': generation_id
+            # 1. Save Archive (bulk bytes go to S3 when configured)
+            archive_item = self._archive_item(generation_id, dumps)
+
+            header = [archive_item]
+
+            # 2. Save Stats
+            if stats:
+                header.append({
+                    'PK': f"STATS#{generation_id}",
+                    'SK': f"STATS#{generation_id}",
+                    'GSI1PK': 'STATS',
+                    'GSI1SK': str(generation_id).zfill(6),
+                    'generation': generation_id,
+                    **_to_decimal_dict(stats),
+                    'raw_stats': _dumps(stats)
                 })
+            _write_items(self.table, header)
 
-                # 2. Save Stats
-                if stats:
-                    batch.put_item(Item={
-                        'PK': f"STATS#{generation_id}",
-                        'SK': f"STATS#{generation_id}",
-                        'GSI1PK': 'STATS',
-                        'GSI1SK': str(generation_id).zfill(6),
-                        'generation': generation_id,
-                        'population_diversity': Decimal(str(stats.get('diversity', 0.0))),
-                        'fitness_mean': Decimal(str(stats.get('fitness_mean', 0.0))),
-                        'raw_stats': json.dumps(stats)
-                    })
-
-                # 3. Save Personas (Profiles)
-                for p in population:
-                    # PK=PERSONA, SK=PERSONA#<Name>
-                    # GSI1PK=PERSONA, GSI1SK=<Name>
-                    item = {
-                        'PK': f"PERSONA#{p.name}",
-                        'SK': f"PERSONA#{p.name}",
-                        'GSI1PK': 'PERSONA',
-                        'GSI1SK': p.name,
-                        'id': p.name,
-                        'name': p.name,
-                        'bio': p.bio,
-                        'is_active': True
-                    }
-                    batch.put_item(Item=item)
+            # 3. Save Personas (Profiles) whose profile changed since our last
+            # write, one 25-item batch per worker thread
+            hashes = {d['name']: _profile_hash(d) for d in dumps}
+            items = [
+                _persona_item(d, hashes[d['name']])
+                for d in dumps
+                if self._profile_hashes.get(d['name']) != hashes[d['name']]
+            ]
+            chunks = [items[i:i + _BATCH_SIZE] for i in range(0, len(items), _BATCH_SIZE)]
+            if len(chunks) <= 1:
+                for chunk in chunks:
+                    _write_items(self.table, chunk)
+            else:
+                pool = _get_write_pool()
+                for future in [pool.submit(_write_chunk, self.table.name, chunk) for chunk in chunks]:
+                    future.result()
+            for item in items:
+                self._profile_hashes[item['name']] = item['profile_hash']
             
             logger.info(f"Saved generation {generation_id} to DynamoDB")
             
         except ClientError as e:
             logger.error(f"Failed to save generation {generation_id}: {e}")
 
+    def _archive_item(self, generation_id: int, archive_data: List[Dict]) -> Dict:
+        """ARCHIVE item for a generation: inline compressed JSON, or an S3 pointer."""
+        item = {
+            'PK': 'ARCHIVE',
+            'SK': f"GEN#{generation_id}",
+            'generation': generation_id
+        }
+        raw = _dumps_bytes(archive_data)
+        if self._s3 is None:
+            # Inline, compressed binary payload (a fraction of the JSON text's WCUs)
+            payload, codec = _compress(raw)
+            item['data'] = Binary(payload)
+            item['codec'] = codec
+            return item
+
+        body = gzip.compress(raw)
+        key = f"archive/gen{generation_id}.json.gz"
+        self._s3.put_object(
+            Bucket=self.archive_bucket,
+            Key=key,
+            Body=body,
+            ContentType='application/json',
+            ContentEncoding='gzip',
+        )
+        item.update({
+            's3_bucket': self.archive_bucket,
+            's3_key': key,
+            'sha256': hashlib.sha256(raw).hexdigest(),
+            'size': len(body),
+        })
+        return item
+
+    def _read_archive(self, item: Dict) -> Optional[bytes]:
+        """Raw archive JSON for an ARCHIVE item (fetched from S3 if offloaded)."""
+        if 'data' in item:
+            data = item['data']
+            if 'codec' not in item:
+                return data  # legacy inline JSON text
+            payload = data.value if isinstance(data, Binary) else bytes(data)
+            return _decompress(payload, item['codec'])
+        if 's3_key' not in item:
+            return None
+        s3 = self._s3 or get_s3_client()
+        response = s3.get_object(Bucket=item.get('s3_bucket', self.archive_bucket), Key=item['s3_key'])
+        raw = gzip.decompress(response['Body'].read())
+        if 'sha256' in item and hashlib.sha256(raw).hexdigest() != item['sha256']:
+            logger.error(f"Archive checksum mismatch for {item['s3_key']}")
+            return None
+        return raw
+
     def load_generation(self, generation_id: int) -> List[PersonaGenotype]:
         """Load a list of PersonaGenotypes from DynamoDB archive."""
         try:
-            response = self.table.get_item(
+            response = with_retries(self.table.get_item)(
                 Key={'PK': 'ARCHIVE', 'SK': f"GEN#{generation_id}"}
             )
             item = response.get('Item')
-            if item and 'data' in item:
-                data = json.loads(item['data'])
-                return [PersonaGenotype(**p) for p in data]
+            raw = self._read_archive(item) if item else None
+            if raw is not None:
+                return _POPULATION_ADAPTER.validate_json(raw)
         except ClientError as e:
             logger.error(f"Failed to load generation {generation_id}: {e}")
         return []
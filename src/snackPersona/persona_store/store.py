@@ -8,10 +8,14 @@ import json
 import os
 
 from filelock import FileLock
+from pydantic import TypeAdapter
 
 from snackPersona.utils.data_models import PersonaGenotype
 from snackPersona.utils.logger import logger
 
+# Validates a whole generation file straight from JSON inside pydantic-core
+_POPULATION_ADAPTER = TypeAdapter(List[PersonaGenotype])
+
 
 class PersonaStore:
     """
@@ -28,6 +32,10 @@ class PersonaStore:
     def _filepath(self, generation_id: int) -> str:
         return os.path.join(self.storage_dir, f"gen_{generation_id}.json")
 
+    def generation_path(self, generation_id: int) -> str:
+        """Path of the JSON file holding ``generation_id`` (it may not exist yet)."""
+        return self._filepath(generation_id)
+
     def _lockpath(self, generation_id: int) -> str:
         return self._filepath(generation_id) + ".lock"
 
@@ -54,10 +62,10 @@ class PersonaStore:
         lock = FileLock(self._lockpath(generation_id), timeout=30)
 
         with lock:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                raw = f.read()
 
-        return [PersonaGenotype(**item) for item in data]
+        return _POPULATION_ADAPTER.validate_json(raw)
 
     def list_generations(self) -> List[int]:
         """Return a sorted list of available generation IDs."""
@@ -0,0 +1,47 @@
+"""
+Bounded concurrency for the LLM-heavy phases of the evolution loop.
+
+``AsyncEvolutionRunner`` overlaps independent tasks (group episodes,
+offspring creation, ...) with ``asyncio.gather`` while an
+``asyncio.Semaphore`` caps how many are in flight, so the LLM backend's
+rate limits are respected.  Blocking (sync) LLM work can be pushed onto
+worker threads through the same gate with ``run_in_thread``.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+
+class AsyncEvolutionRunner:
+    """
+    Runs coroutines concurrently, at most ``max_concurrent`` at a time.
+
+    The semaphore is created lazily for the running event loop, so one
+    runner can be reused across separate ``asyncio.run`` calls.
+    """
+
+    def __init__(self, max_concurrent: int = 8):
+        self.max_concurrent = max(1, max_concurrent)
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_concurrent)
+            self._loop = loop
+        return self._sem
+
+    async def guarded(self, coro: Awaitable[Any]) -> Any:
+        """Await ``coro`` once a concurrency slot is free."""
+        async with self._semaphore():
+            return await coro
+
+    async def run_many(self, coros: Iterable[Awaitable[Any]]) -> List[Any]:
+        """Run all coroutines (bounded) and return their results in order."""
+        return list(await asyncio.gather(*[self.guarded(c) for c in coros]))
+
+    async def run_in_thread(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking callable on a worker thread, under the same bound."""
+        async with self._semaphore():
+            return await asyncio.to_thread(fn, *args)
@@ -1,8 +1,12 @@
 """
 SimulationAgent — wraps a persona genotype + LLM client for SNS simulation.
 """
+import io
 import random
-from typing import Optional
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 from snackPersona.utils.data_models import PersonaGenotype, MediaItem
 from snackPersona.llm.llm_client import LLMClient
 from snackPersona.compiler.compiler import compile_persona
@@ -12,26 +16,143 @@ logger = logging.getLogger("snackPersona")
 from snackPersona.traveler.executor.traveler import Traveler
 from snackPersona.traveler.utils.data_models import ExecutionResult
 
+# Most recent assistant turns kept per agent; older ones are dropped
+_MEMORY_MAXLEN = 64
+
+# ---------------------------------------------------------------------- #
+#  Prompt templates
+#  Static text is built once at import; call sites only fill the fields.
+# ---------------------------------------------------------------------- #
+
+_REPLY_BRAINSTORM_PROMPT = (
+    "{author} posted: \"{post}\"\n\n"
+    "Brainstorm 3 distinct strategies for replying.\n"
+    "Don't be afraid to be blunt ('moto-mo-ko-mo-nai') if the post is nonsense.\n"
+    "Strategies could trigger: 'Wholeheartedly agree', 'Challenge premise', 'State uncomfortable truth'.\n"
+    "Return ONLY a JSON list of strings."
+)
+
+_REPLY_BRAINSTORM_PROMPT_ASYNC = (
+    "{author} posted: \"{post}\"\n\n"
+    "Brainstorm 3 distinct strategies for replying (e.g. 'Wholeheartedly agree', 'Challenge the premise', 'Make a joke').\n"
+    "Return ONLY a JSON list of strings."
+)
+
+_REPLY_WRITE_PROMPT = (
+    "Target post: \"{post}\"\n"
+    "You considered these reply strategies:\n{strategies}\n\n"
+    "Select the best one for your character.\n"
+    "Write the final reply text. Output ONLY the reply."
+)
+
+_ENGAGE_PROMPT = (
+    "{author} posted: \"{post}\"\n\n"
+    "Would you reply to this post? "
+    "Answer only 'yes' or 'no'."
+)
+
+_ENGAGE_AND_REPLY_PROMPT = (
+    "{author} posted: \"{post}\"\n\n"
+    "Would you reply to this post? "
+    "If not, answer with exactly PASS and nothing else.\n"
+    "If you would, pick the reply strategy that best fits your character "
+    "and write the final reply text. Output ONLY the reply."
+)
+
+# Fused prompt minus the PASS option, for when engagement is already decided
+_DIRECT_REPLY_PROMPT = (
+    "{author} posted: \"{post}\"\n\n"
+    "Pick the reply strategy that best fits your character "
+    "and write the final reply text. Output ONLY the reply."
+)
+
+# The PASS answer: the whole (stripped) response is PASS, optionally followed by
+# punctuation, so replies such as "Pass the popcorn..." still count as engagement
+_PASS_RE = re.compile(r"PASS[^\w\s]*")
+
+_MEDIA_REACTION_PROMPT = (
+    "You just read this article:\n"
+    "Title: {title}\n"
+    "Content: {content}\n\n"
+    "Write your reaction as a post. Be incisive. If the article is fluff, say so.\n"
+    "If it's great, explain why with facts."
+)
+
+_MEDIA_REACTION_PROMPT_ASYNC = (
+    "You just read this article:\n"
+    "Title: {title}\n"
+    "Content: {content}\n\n"
+    "Write your reaction as a post."
+)
+
+
+_RESEARCH_CONTEXT_PROMPT = (
+    "\n\nYou have just researched this topic and found these headlines:\n"
+    "{headlines}\n"
+    "Use this information to support your post (or debunk it)."
+)
+
+
+@lru_cache(maxsize=1024)
+def _research_pack(headlines: Tuple[str, ...]) -> str:
+    """Prompt block for a (sorted) headline set, built once per distinct set."""
+    return _RESEARCH_CONTEXT_PROMPT.format(headlines="\n".join(f"- {h}" for h in headlines))
+
+
+def _research_context(result: Optional[ExecutionResult]) -> str:
+    """
+    Research block for the post prompt from a traveler result's top 3
+    headlines.  Sorted, so the same findings always produce identical
+    prompt text whatever order the crawl returned them in.
+    """
+    if not result or not result.headlines:
+        return ""
+    return _research_pack(tuple(sorted(result.headlines[:3])))
+
+
+def _strip_code_fence(text: str) -> str:
+    """
+    Return the payload of the last ```json fenced block in ``text``
+    (or the whole text when unfenced), stripped of whitespace.
+
+    Uses index scans instead of chained ``split`` calls so no intermediate
+    lists are built for every brainstorm response.
+    """
+    if "```" not in text:
+        return text.strip()
+    start = text.rfind("```json")
+    start = 0 if start == -1 else start + 7
+    end = text.find("```", start)
+    if end == -1:
+        end = len(text)
+    return text[start:end].strip()
+
 
 class SimulationAgent:
     """An agent that participates in simulated SNS episodes."""
 
+    __slots__ = (
+        "genotype",
+        "llm_client",
+        "traveler",
+        "phenotype",
+        "_system_prompt",
+        "memory",
+        "last_research_result",
+    )
+
     def __init__(self, genotype: PersonaGenotype, llm_client: LLMClient, traveler: Optional[Traveler] = None):
         self.genotype = genotype
         self.llm_client = llm_client
         self.traveler = traveler
         self.phenotype = compile_persona(genotype)
         self._system_prompt = self.phenotype.system_prompt
-        self.memory: list = []
+        self.memory: deque = deque(maxlen=_MEMORY_MAXLEN)
         self.last_research_result: Optional[ExecutionResult] = None
 
     def reset_memory(self):
         """Clear the agent's short-term memory."""
-        self.memory = []
-
-    # ------------------------------------------------------------------ #
-    #  Synchronous methods
-    # ------------------------------------------------------------------ #
+        self.memory.clear()
 
     # ------------------------------------------------------------------ #
     #  Synchronous methods
@@ -56,9 +177,7 @@ class SimulationAgent:
                 temperature=0.9
             )
             # Simple parsing cleanup
-            if "```" in ideas_json:
-                ideas_json = ideas_json.split("```json")[-1].split("```")[0]
-            ideas_str = ideas_json.strip()
+            ideas_str = _strip_code_fence(ideas_json)
             # If not valid JSON-like, fall back to simple text
             if not ideas_str.startswith("["):
                 logger.warning(f"Brainstorming failed JSON parsing: {ideas_str[:50]}")
@@ -68,7 +187,7 @@ class SimulationAgent:
             ideas_str = "General post idea"
 
         if "PASS" in ideas_str:
-            logger.debug(f"[POST] {self.genotype.name} decided to PASS on topic: {topic}")
+            logger.debug("[POST] %s decided to PASS on topic: %s", self.genotype.name, topic)
             return None
 
         # Step 1.5: Research (Traveler Integration)
@@ -89,13 +208,7 @@ class SimulationAgent:
                 result = self.traveler.execute() 
                 self.last_research_result = result
                 
-                if result and result.headlines:
-                    headlines_str = "\n".join([f"- {h}" for h in result.headlines[:3]])
-                    research_context = (
-                        f"\n\nYou have just researched this topic and found these headlines:\n"
-                        f"{headlines_str}\n"
-                        f"Use this information to support your post (or debunk it)."
-                    )
+                research_context = _research_context(result)
             except Exception as e:
                 logger.warning(f"Research failed: {e}")
 
@@ -114,18 +227,14 @@ class SimulationAgent:
         )
 
         self.memory.append({"role": "assistant", "content": response})
-        logger.debug(f"[POST] {self.genotype.name}: {response[:60]}...")
+        logger.debug("[POST] %s: %.60s...", self.genotype.name, response)
         return response
 
     def generate_reply(self, post_content: str, author_name: str) -> str:
         """Generate a reply to another agent's post."""
         # Step 1: Brainstorm strategies
-        brainstorm_prompt = (
-            f"{author_name} posted: \"{post_content}\"\n\n"
-            f"Brainstorm 3 distinct strategies for replying.\n"
-            f"Don't be afraid to be blunt ('moto-mo-ko-mo-nai') if the post is nonsense.\n"
-            f"Strategies could trigger: 'Wholeheartedly agree', 'Challenge premise', 'State uncomfortable truth'.\n"
-            f"Return ONLY a JSON list of strings."
+        brainstorm_prompt = _REPLY_BRAINSTORM_PROMPT.format(
+            author=author_name, post=post_content
         )
         try:
             strategies_json = self.llm_client.generate_text(
@@ -133,36 +242,27 @@ class SimulationAgent:
                 user_prompt=brainstorm_prompt,
                 temperature=0.9
             )
-            if "```" in strategies_json:
-                strategies_json = strategies_json.split("```json")[-1].split("```")[0]
-            strategies_str = strategies_json.strip()
+            strategies_str = _strip_code_fence(strategies_json)
             if not strategies_str.startswith("["):
                  strategies_str = "Reply naturally"
         except Exception:
              strategies_str = "Reply naturally"
 
         # Step 2: Select and Write
-        user_prompt = (
-            f"Target post: \"{post_content}\"\n"
-            f"You considered these reply strategies:\n{strategies_str}\n\n"
-            f"Select the best one for your character.\n"
-            f"Write the final reply text. Output ONLY the reply."
+        user_prompt = _REPLY_WRITE_PROMPT.format(
+            post=post_content, strategies=strategies_str
         )
         response = self.llm_client.generate_text(
             system_prompt=self._system_prompt,
             user_prompt=user_prompt,
         )
         self.memory.append({"role": "assistant", "content": response})
-        logger.debug(f"[REPLY] {self.genotype.name} -> {author_name}: {response[:60]}...")
+        logger.debug("[REPLY] %s -> %s: %.60s...", self.genotype.name, author_name, response)
         return response
 
     def should_engage(self, post_content: str, author_name: str) -> bool:
         """Decide whether this persona would reply to a given post."""
-        user_prompt = (
-            f"{author_name} posted: \"{post_content}\"\n\n"
-            f"Would you reply to this post? "
-            f"Answer only 'yes' or 'no'."
-        )
+        user_prompt = _ENGAGE_PROMPT.format(author=author_name, post=post_content)
         response = self.llm_client.generate_text(
             system_prompt=self._system_prompt,
             user_prompt=user_prompt,
@@ -170,26 +270,22 @@ class SimulationAgent:
         )
         decision = "yes" in response.lower()
         logger.debug(
-            f"[DECIDE] {self.genotype.name} on {author_name}'s post: "
-            f"{'ENGAGE' if decision else 'PASS'}"
+            "[DECIDE] %s on %s's post: %s",
+            self.genotype.name, author_name, "ENGAGE" if decision else "PASS",
         )
         return decision
 
     def generate_media_reaction(self, media_item: MediaItem) -> str:
         """Generate a reaction to a media article."""
-        user_prompt = (
-            f"You just read this article:\n"
-            f"Title: {media_item.title}\n"
-            f"Content: {media_item.content[:500]}\n\n"
-            f"Write your reaction as a post. Be incisive. If the article is fluff, say so.\n"
-            f"If it's great, explain why with facts."
+        user_prompt = _MEDIA_REACTION_PROMPT.format(
+            title=media_item.title, content=media_item.content[:500]
         )
         response = self.llm_client.generate_text(
             system_prompt=self._system_prompt,
             user_prompt=user_prompt,
         )
         self.memory.append({"role": "assistant", "content": response})
-        logger.debug(f"[MEDIA] {self.genotype.name} on '{media_item.title}': {response[:60]}...")
+        logger.debug("[MEDIA] %s on '%s': %.60s...", self.genotype.name, media_item.title, response)
         return response
 
     # ------------------------------------------------------------------ #
@@ -211,9 +307,7 @@ class SimulationAgent:
                 user_prompt=brainstorm_prompt,
                 temperature=0.9
             )
-            if "```" in ideas_json:
-                ideas_json = ideas_json.split("```json")[-1].split("```")[0]
-            ideas_str = ideas_json.strip()
+            ideas_str = _strip_code_fence(ideas_json)
             if not ideas_str.startswith("["):
                 logger.warning(f"Brainstorming failed JSON parsing: {ideas_str[:50]}")
                 ideas_str = "General post idea"
@@ -238,13 +332,7 @@ class SimulationAgent:
                 result = await asyncio.to_thread(self.traveler.execute)
                 self.last_research_result = result
                 
-                if result and result.headlines:
-                    headlines_str = "\n".join([f"- {h}" for h in result.headlines[:3]])
-                    research_context = (
-                        f"\n\nYou have just researched this topic and found these headlines:\n"
-                        f"{headlines_str}\n"
-                        f"Use this information to support your post (or debunk it)."
-                    )
+                research_context = _research_context(result)
             except Exception as e:
                 logger.warning(f"Async research failed: {e}")
 
@@ -262,16 +350,13 @@ class SimulationAgent:
             user_prompt=user_prompt,
         )
         self.memory.append({"role": "assistant", "content": response})
-        logger.debug(f"[POST] {self.genotype.name}: {response[:60]}...")
+        logger.debug("[POST] %s: %.60s...", self.genotype.name, response)
         return response
 
-    async def generate_reply_async(self, post_content: str, author_name: str) -> str:
-        """Async version of generate_reply with brainstorming."""
-        # Step 1: Brainstorm strategies
-        brainstorm_prompt = (
-            f"{author_name} posted: \"{post_content}\"\n\n"
-            f"Brainstorm 3 distinct strategies for replying (e.g. 'Wholeheartedly agree', 'Challenge the premise', 'Make a joke').\n"
-            f"Return ONLY a JSON list of strings."
+    async def _brainstorm_reply_async(self, post_content: str, author_name: str) -> str:
+        """Brainstorm reply strategies (step 1 of the async reply flow)."""
+        brainstorm_prompt = _REPLY_BRAINSTORM_PROMPT_ASYNC.format(
+            author=author_name, post=post_content
         )
         try:
             strategies_json = await self.llm_client.generate_text_async(
@@ -279,36 +364,48 @@ class SimulationAgent:
                 user_prompt=brainstorm_prompt,
                 temperature=0.9
             )
-            if "```" in strategies_json:
-                strategies_json = strategies_json.split("```json")[-1].split("```")[0]
-            strategies_str = strategies_json.strip()
+            strategies_str = _strip_code_fence(strategies_json)
             if not strategies_str.startswith("["):
                  strategies_str = "Reply naturally"
         except Exception:
              strategies_str = "Reply naturally"
+        return strategies_str
+
+    async def generate_reply_async(self, post_content: str, author_name: str) -> str:
+        """Async version of generate_reply with brainstorming."""
+        # Step 1: Brainstorm strategies
+        strategies_str = await self._brainstorm_reply_async(post_content, author_name)
 
         # Step 2: Select and Write
-        user_prompt = (
-            f"Target post: \"{post_content}\"\n"
-            f"You considered these reply strategies:\n{strategies_str}\n\n"
-            f"Select the best one for your character.\n"
-            f"Write the final reply text. Output ONLY the reply."
+        user_prompt = _REPLY_WRITE_PROMPT.format(
+            post=post_content, strategies=strategies_str
         )
         response = await self.llm_client.generate_text_async(
             system_prompt=self._system_prompt,
             user_prompt=user_prompt,
         )
         self.memory.append({"role": "assistant", "content": response})
-        logger.debug(f"[REPLY] {self.genotype.name} -> {author_name}: {response[:60]}...")
+        logger.debug("[REPLY] %s -> %s: %.60s...", self.genotype.name, author_name, response)
+        return response
+
+    async def generate_direct_reply_async(self, post_content: str, author_name: str) -> str:
+        """
+        Write a reply in one LLM call, for when engagement was already
+        decided without the model (prefilter or semantic cache).  Same
+        prompt as ``engage_and_maybe_reply_async`` without the PASS option.
+        """
+        user_prompt = _DIRECT_REPLY_PROMPT.format(author=author_name, post=post_content)
+        response = await self.llm_client.generate_text_async(
+            system_prompt=self._system_prompt,
+            user_prompt=user_prompt,
+        )
+        self.memory.append({"role": "assistant", "content": response})
+        logger.debug("[REPLY] %s -> %s: %.60s...", self.genotype.name, author_name, response)
         return response
 
     async def should_engage_async(self, post_content: str, author_name: str) -> bool:
         """Async version of should_engage."""
-        user_prompt = (
-            f"{author_name} posted: \"{post_content}\"\n\n"
-            f"Would you reply to this post? "
-            f"Answer only 'yes' or 'no'."
-        )
+        user_prompt = _ENGAGE_PROMPT.format(author=author_name, post=post_content)
         response = await self.llm_client.generate_text_async(
             system_prompt=self._system_prompt,
             user_prompt=user_prompt,
@@ -316,23 +413,50 @@ class SimulationAgent:
         )
         decision = "yes" in response.lower()
         logger.debug(
-            f"[DECIDE] {self.genotype.name} on {author_name}'s post: "
-            f"{'ENGAGE' if decision else 'PASS'}"
+            "[DECIDE] %s on %s's post: %s",
+            self.genotype.name, author_name, "ENGAGE" if decision else "PASS",
         )
         return decision
 
+    async def engage_and_maybe_reply_async(self, post_content: str, author_name: str) -> Dict:
+        """
+        Decide whether to engage and, if so, write the reply — in a single
+        LLM round trip instead of ``should_engage_async`` + ``generate_reply_async``.
+
+        The model answers exactly ``PASS`` to decline; anything else is the
+        reply.
+
+        Returns ``{"engaged": bool, "reply": Optional[str]}``.
+        """
+        user_prompt = _ENGAGE_AND_REPLY_PROMPT.format(author=author_name, post=post_content)
+        buf = io.StringIO()
+        async for chunk in self.llm_client.generate_text_stream_async(
+            system_prompt=self._system_prompt,
+            user_prompt=user_prompt,
+        ):
+            buf.write(chunk)
+        response = buf.getvalue().strip()
+        engaged = bool(response) and not _PASS_RE.fullmatch(response)
+        logger.debug(
+            "[DECIDE] %s on %s's post: %s",
+            self.genotype.name, author_name, "ENGAGE" if engaged else "PASS",
+        )
+        if not engaged:
+            return {"engaged": False, "reply": None}
+
+        self.memory.append({"role": "assistant", "content": response})
+        logger.debug("[REPLY] %s -> %s: %.60s...", self.genotype.name, author_name, response)
+        return {"engaged": True, "reply": response}
+
     async def generate_media_reaction_async(self, media_item: MediaItem) -> str:
         """Async version of generate_media_reaction."""
-        user_prompt = (
-            f"You just read this article:\n"
-            f"Title: {media_item.title}\n"
-            f"Content: {media_item.content[:500]}\n\n"
-            f"Write your reaction as a post."
+        user_prompt = _MEDIA_REACTION_PROMPT_ASYNC.format(
+            title=media_item.title, content=media_item.content[:500]
         )
         response = await self.llm_client.generate_text_async(
             system_prompt=self._system_prompt,
             user_prompt=user_prompt,
         )
         self.memory.append({"role": "assistant", "content": response})
-        logger.debug(f"[MEDIA] {self.genotype.name} on '{media_item.title}': {response[:60]}...")
+        logger.debug("[MEDIA] %s on '%s': %.60s...", self.genotype.name, media_item.title, response)
         return response
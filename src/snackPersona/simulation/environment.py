@@ -6,22 +6,386 @@ Supports both synchronous and asynchronous execution of episodes.
 """
 
 import asyncio
+import hashlib
+import os
 import random
-from typing import List, Dict
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterator, List, Dict, Optional, Tuple
 
 from snackPersona.simulation.agent import SimulationAgent
+from snackPersona.simulation.semantic_cache import AffinityPrefilter, SemanticEngageCache
 from snackPersona.utils.data_models import MediaItem
 from snackPersona.utils.logger import logger
 
+# Max agent coroutines in flight at once (override via env var)
+_DEFAULT_CONCURRENCY = int(os.environ.get("SIMULATION_CONCURRENCY", "8"))
+
+_HAS_TASKGROUP = hasattr(asyncio, "TaskGroup")  # Python 3.11+
+
+
+async def _run_coros_bounded(coros: List[Awaitable[Any]], limit: int) -> List[Any]:
+    """
+    Run coroutines with at most ``limit`` in flight, starting a new one as
+    soon as any finishes.  Results are returned in input order, like
+    ``asyncio.gather``.  If a coroutine fails, the rest are cancelled and
+    its exception is raised as-is, whichever path ran.
+    """
+    n = len(coros)
+    limit = max(1, limit)
+
+    # Everything fits under the limit: schedule all at once
+    if n <= limit:
+        if _HAS_TASKGROUP:
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [tg.create_task(c) for c in coros]
+            except BaseExceptionGroup as eg:
+                # TaskGroup wraps failures; re-raise the first one as the other branches do
+                raise eg.exceptions[0]
+            return [t.result() for t in tasks]
+        return list(await asyncio.gather(*coros))
+
+    results: List[Any] = [None] * n
+
+    async def _indexed(idx: int, coro: Awaitable[Any]):
+        return idx, await coro
+
+    pending: set = set()
+    i = 0
+    try:
+        while pending or i < n:
+            while len(pending) < limit and i < n:
+                pending.add(asyncio.ensure_future(_indexed(i, coros[i])))
+                i += 1
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                idx, result = task.result()
+                results[idx] = result
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        # Close coroutines that were never scheduled
+        for coro in coros[i:]:
+            coro.close()
+        raise
+    return results
+
+
+class FeedBuffer:
+    """
+    Fixed-capacity ring buffer holding the most recent feed events.
+
+    Backed by lists with a wraparound head index, so appends and random
+    indexing (``random.choice``) are both O(1), unlike ``collections.deque``
+    whose middle indexing is O(n).  Iteration yields oldest to newest.
+
+    Event authors are also kept in a parallel, slot-aligned list together
+    with per-author counts, so author filtering (``sample_not_by``) compares
+    plain strings instead of looking up ``event['author']``.
+    """
+
+    __slots__ = ("maxlen", "_items", "_authors", "_author_counts", "_head")
+
+    def __init__(self, maxlen: int):
+        self.maxlen = max(1, maxlen)
+        self._items: List[Dict] = []
+        self._authors: List[str] = []
+        # author -> number of their events currently in the buffer
+        self._author_counts: Counter = Counter()
+        self._head = 0  # slot of the oldest event once the buffer is full
+
+    def append(self, event: Dict) -> Optional[Dict]:
+        """Add an event; returns the evicted oldest event when full, else None."""
+        author = event['author']
+        counts = self._author_counts
+        counts[author] += 1
+
+        items = self._items
+        if len(items) < self.maxlen:
+            items.append(event)
+            self._authors.append(author)
+            return None
+
+        head = self._head
+        evicted = items[head]
+        old = self._authors[head]
+        if counts[old] == 1:
+            del counts[old]
+        else:
+            counts[old] -= 1
+        items[head] = event
+        self._authors[head] = author
+        self._head = (head + 1) % self.maxlen
+        return evicted
+
+    def count_by(self, author: str) -> int:
+        """Number of buffered events by ``author``."""
+        return self._author_counts[author]
+
+    def sample_not_by(self, author: str, rng: random.Random) -> Dict:
+        """
+        Uniformly pick an event not authored by ``author`` (or any event if
+        they authored them all).  Uses rejection sampling over slots, so no
+        candidate list is built; expected draws are ``F / (F - own)``.
+        """
+        items, authors = self._items, self._authors
+        n = len(items)
+        randbelow = rng.randrange
+        if self._author_counts[author] >= n:
+            return items[randbelow(n)]
+        while True:
+            j = randbelow(n)
+            if authors[j] != author:
+                return items[j]
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._authors.clear()
+        self._author_counts.clear()
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int) -> Dict:
+        n = len(self._items)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("feed index out of range")
+        return self._items[(self._head + index) % n]
+
+    def __iter__(self) -> Iterator[Dict]:
+        items, head = self._items, self._head
+        yield from items[head:]
+        yield from items[:head]
+
+
+class DecisionCache:
+    """
+    Async-aware LRU cache for per-agent LLM outcomes (engage-and-reply).
+
+    Concurrent requests for the same key share a single in-flight task, so
+    duplicate LLM calls collapse into one (stampede protection).  Failed or
+    cancelled computations are not cached.
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    @staticmethod
+    def content_key(agent: SimulationAgent, content: Optional[str]) -> Tuple[str, str]:
+        """Key for (persona, normalised target content)."""
+        normalised = (content or "").strip().lower()
+        digest = hashlib.blake2b(normalised.encode("utf-8"), digest_size=16).hexdigest()
+        return agent.genotype.name, digest
+
+    async def get_or_compute(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key``, computing it via ``factory`` on a miss."""
+        if key in self._data:
+            self._data.move_to_end(key)
+            return self._data[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._finish(k, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._data[key] = task.result()
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+async def _post_one(agent: SimulationAgent, topic: str) -> Dict:
+    """Phase-1 post event for ``agent``."""
+    post = await agent.generate_post_async(topic=topic)
+    return {"type": "post", "author": agent.genotype.name, "content": post}
+
+
+async def _react_one(agent: SimulationAgent, media_item: MediaItem) -> Dict:
+    """Phase-1 media reaction event for ``agent``."""
+    reaction = await agent.generate_media_reaction_async(media_item)
+    return {
+        "type": "media_reaction",
+        "author": agent.genotype.name,
+        "content": reaction,
+        "media_id": media_item.id,
+        "media_title": media_item.title,
+    }
+
+
+async def _engage_one(
+    agent: SimulationAgent,
+    target_post: Dict,
+    decision_cache: DecisionCache,
+    engage_target: Callable[[SimulationAgent, Dict], Awaitable[Optional[str]]],
+) -> Dict:
+    """Reply or pass event for ``agent`` engaging with ``target_post``."""
+    reply = await decision_cache.get_or_compute(
+        DecisionCache.content_key(agent, target_post['content']),
+        lambda: engage_target(agent, target_post),
+    )
+
+    if reply is None:
+        return {
+            "type": "pass",
+            "author": agent.genotype.name,
+            "target_author": target_post['author'],
+        }
+    return {
+        "type": "reply",
+        "author": agent.genotype.name,
+        "target_author": target_post['author'],
+        "content": reply,
+        "reply_to": target_post['content'],
+    }
+
 
 class SimulationEnvironment:
     """
     Manages a group of agents and simulates interactions between them.
+
+    ``max_concurrency`` bounds how many agents may be awaiting the LLM at
+    once (defaults to the ``SIMULATION_CONCURRENCY`` env var, else 8).
+    Engagement decisions and replies are memoised per (persona, target
+    content) in ``decision_cache``; pass a shared instance to reuse them
+    across environments.  An optional ``semantic_cache`` additionally reuses
+    decisions for reworded posts that embed close to ones already judged,
+    and an optional ``affinity_prefilter`` settles clear-cut bio/post
+    (mis)matches without asking the LLM.
+    Shuffling and target selection use a per-environment RNG, so passing
+    ``seed`` makes the agent order and target picks reproducible; without
+    one it is seeded from the global ``random`` state, so ``random.seed``
+    still reproduces a run.
+    The feed keeps only the ``max_feed_size`` most recent events (default
+    ``4 * len(agents)``); older ones are evicted as new posts arrive.
     """
 
-    def __init__(self, agents: List[SimulationAgent]):
+    def __init__(
+        self,
+        agents: List[SimulationAgent],
+        max_concurrency: Optional[int] = None,
+        decision_cache: Optional[DecisionCache] = None,
+        semantic_cache: Optional[SemanticEngageCache] = None,
+        affinity_prefilter: Optional[AffinityPrefilter] = None,
+        seed: Optional[int] = None,
+        max_feed_size: Optional[int] = None,
+    ):
         self.agents = agents
-        self.feed: List[Dict] = []
+        self._rng = random.Random(random.getrandbits(64) if seed is None else seed)
+        # Agent index permutation, reshuffled in place every round
+        self._perm: List[int] = list(range(len(agents)))
+        self.feed = FeedBuffer(max_feed_size or 4 * len(agents))
+        self.max_concurrency = max_concurrency or _DEFAULT_CONCURRENCY
+        self.decision_cache = decision_cache if decision_cache is not None else DecisionCache()
+        self.semantic_cache = semantic_cache
+        self.affinity_prefilter = affinity_prefilter
+
+    def _append_to_feed(self, event: Dict) -> None:
+        """Add an event to the shared feed (evicting the oldest when full)."""
+        self.feed.append(event)
+
+    def _pick_target(self, name: str) -> Dict:
+        """Uniformly pick a feed post not authored by ``name`` (or any post if they authored them all)."""
+        return self.feed.sample_not_by(name, self._rng)
+
+    async def _engage_target(self, agent: SimulationAgent, target_post: Dict) -> Optional[str]:
+        """
+        Return the agent's reply to ``target_post``, or None if it passes.
+
+        The affinity prefilter or a semantic-cache hit decides engagement
+        without the LLM; otherwise a single fused engage-and-reply call is made.
+        Either way a reply costs one LLM call.
+        """
+        content = target_post['content'] or ""
+        author = target_post['author']
+
+        # Embedding may run the model, so it goes to a worker thread; once both
+        # vectors are memoised the check is a dot product and stays inline
+        prefilter = self.affinity_prefilter
+        if prefilter is not None:
+            bio = agent.genotype.bio
+            if prefilter.is_warm(bio, content):
+                verdict = prefilter.verdict(bio, content)
+            else:
+                verdict = await asyncio.to_thread(prefilter.verdict, bio, content)
+            if verdict is False:
+                return None
+            if verdict:
+                return await agent.generate_direct_reply_async(content, author)
+
+        vec = None
+        if self.semantic_cache is not None:
+            if self.semantic_cache.is_embedded(content):
+                vec = self.semantic_cache.embed(content)
+            else:
+                vec = await asyncio.to_thread(self.semantic_cache.embed, content)
+            cached = self.semantic_cache.lookup(agent.genotype.name, vec)
+            if cached is False:
+                return None
+            if cached:
+                return await agent.generate_direct_reply_async(content, author)
+
+        result = await agent.engage_and_maybe_reply_async(content, author)
+        if vec is not None:
+            self.semantic_cache.add(agent.genotype.name, vec, result["engaged"])
+        return result["reply"]
+
+    async def _engagement_round(self) -> List[Dict]:
+        """
+        One engagement round shared by post and media episodes: each agent
+        (in shuffled order) picks a feed post and replies or passes.
+        Replies join the feed; all of the round's events are returned so the
+        caller can extend its transcript in one step.
+        """
+        agents = self.agents
+        perm = self._perm
+        if len(perm) != len(agents):
+            perm[:] = range(len(agents))
+        self._rng.shuffle(perm)
+
+        # Targets are drawn up front (the feed doesn't change mid-round);
+        # each agent's engagement decision + reply can then run concurrently
+        pick_target = self._pick_target
+        decision_cache = self.decision_cache
+        engage_target = self._engage_target
+        coros = []
+        for i in perm:
+            agent = agents[i]
+            target_post = pick_target(agent.genotype.name)
+            coros.append(_engage_one(agent, target_post, decision_cache, engage_target))
+
+        round_results = await _run_coros_bounded(coros, self.max_concurrency)
+
+        append = self._append_to_feed
+        for event in round_results:
+            if event['type'] != 'pass':
+                append(event)
+        return round_results
+
+    @staticmethod
+    def _had_replies(round_events: List[Dict]) -> bool:
+        """
+        True if the round produced at least one reply.  A round where every
+        agent passed adds nothing new to the feed, so later rounds would
+        mostly re-judge the same posts and the episode stops there.
+        """
+        return any(event['type'] == 'reply' for event in round_events)
 
     # ================================================================== #
     #  Async episodes
@@ -36,23 +400,20 @@ class SimulationEnvironment:
         Flow:
           1. All agents post concurrently
           2. For each round, each agent decides whether to engage
-             and generates a reply if so (concurrent per round)
+             and generates a reply if so (concurrent per round);
+             stops early once a round produces no replies
         """
-        transcript: List[Dict] = []
-
         # Phase 1: All agents post concurrently
         logger.info(f"[Episode] Phase 1: {len(self.agents)} agents posting on '{topic}'")
 
-        async def _post(agent: SimulationAgent) -> Dict:
-            post = await agent.generate_post_async(topic=topic)
-            return {"type": "post", "author": agent.genotype.name, "content": post}
-
-        post_events = await asyncio.gather(*[_post(a) for a in self.agents])
+        post_events = await _run_coros_bounded(
+            [_post_one(a, topic) for a in self.agents], self.max_concurrency
+        )
 
+        transcript: List[Dict] = list(post_events)
         for event in post_events:
-            self.feed.append(event)
-            transcript.append(event)
-            logger.debug(f"  {event['author']} posted ({len(event['content'])} chars)")
+            self._append_to_feed(event)
+            logger.debug("  %s posted (%d chars)", event['author'], len(event['content'] or ""))
 
         # Phase 2: Engagement rounds
         for round_num in range(rounds):
@@ -61,51 +422,11 @@ class SimulationEnvironment:
 
             logger.info(f"[Episode] Phase 2, Round {round_num + 1}/{rounds}")
 
-            shuffled_agents = self.agents.copy()
-            random.shuffle(shuffled_agents)
-
-            # Each agent's engagement decision + reply can run concurrently
-            async def _engage(agent: SimulationAgent) -> List[Dict]:
-                events: List[Dict] = []
-                candidates = [p for p in self.feed if p['author'] != agent.genotype.name]
-                if not candidates:
-                    candidates = list(self.feed)
-                target_post = random.choice(candidates)
-
-                engaged = await agent.should_engage_async(
-                    target_post['content'], target_post['author']
-                )
-
-                if not engaged:
-                    events.append({
-                        "type": "pass",
-                        "author": agent.genotype.name,
-                        "target_author": target_post['author'],
-                    })
-                    return events
-
-                reply = await agent.generate_reply_async(
-                    target_post['content'], target_post['author']
-                )
-                event = {
-                    "type": "reply",
-                    "author": agent.genotype.name,
-                    "target_author": target_post['author'],
-                    "content": reply,
-                    "reply_to": target_post['content'],
-                }
-                events.append(event)
-                return events
-
-            round_results = await asyncio.gather(
-                *[_engage(a) for a in shuffled_agents]
-            )
-
-            for agent_events in round_results:
-                for event in agent_events:
-                    transcript.append(event)
-                    if event['type'] != 'pass':
-                        self.feed.append(event)
+            round_events = await self._engagement_round()
+            transcript.extend(round_events)
+            if not self._had_replies(round_events):
+                logger.info("[Episode] Every agent passed; ending engagement early")
+                break
 
         return transcript
 
@@ -116,26 +437,16 @@ class SimulationEnvironment:
         Async episode where agents react to a media item, then engage
         with each other's reactions.
         """
-        transcript: List[Dict] = []
-
         # Phase 1: All agents react concurrently
         logger.info(f"[MediaEp] All agents reacting to '{media_item.title}'")
 
-        async def _react(agent: SimulationAgent) -> Dict:
-            reaction = await agent.generate_media_reaction_async(media_item)
-            return {
-                "type": "media_reaction",
-                "author": agent.genotype.name,
-                "content": reaction,
-                "media_id": media_item.id,
-                "media_title": media_item.title,
-            }
-
-        reaction_events = await asyncio.gather(*[_react(a) for a in self.agents])
+        reaction_events = await _run_coros_bounded(
+            [_react_one(a, media_item) for a in self.agents], self.max_concurrency
+        )
 
+        transcript: List[Dict] = list(reaction_events)
         for event in reaction_events:
-            self.feed.append(event)
-            transcript.append(event)
+            self._append_to_feed(event)
 
         # Phase 2: Persona-driven engagement on reactions
         for round_num in range(rounds):
@@ -144,50 +455,11 @@ class SimulationEnvironment:
 
             logger.info(f"[MediaEp] Discussion round {round_num + 1}/{rounds}")
 
-            shuffled_agents = self.agents.copy()
-            random.shuffle(shuffled_agents)
-
-            async def _engage_media(agent: SimulationAgent) -> List[Dict]:
-                events: List[Dict] = []
-                candidates = [p for p in self.feed if p['author'] != agent.genotype.name]
-                if not candidates:
-                    candidates = list(self.feed)
-                target_post = random.choice(candidates)
-
-                engaged = await agent.should_engage_async(
-                    target_post['content'], target_post['author']
-                )
-
-                if not engaged:
-                    events.append({
-                        "type": "pass",
-                        "author": agent.genotype.name,
-                        "target_author": target_post['author'],
-                    })
-                    return events
-
-                reply = await agent.generate_reply_async(
-                    target_post['content'], target_post['author']
-                )
-                event = {
-                    "type": "reply",
-                    "author": agent.genotype.name,
-                    "target_author": target_post['author'],
-                    "content": reply,
-                    "reply_to": target_post['content'],
-                }
-                events.append(event)
-                return events
-
-            round_results = await asyncio.gather(
-                *[_engage_media(a) for a in shuffled_agents]
-            )
-
-            for agent_events in round_results:
-                for event in agent_events:
-                    transcript.append(event)
-                    if event['type'] != 'pass':
-                        self.feed.append(event)
+            round_events = await self._engagement_round()
+            transcript.extend(round_events)
+            if not self._had_replies(round_events):
+                logger.info("[MediaEp] Every agent passed; ending discussion early")
+                break
 
         return transcript
 
@@ -205,6 +477,6 @@ class SimulationEnvironment:
 
     def clear_feed(self):
         """Reset the shared feed and all agent memories."""
-        self.feed = []
+        self.feed.clear()
         for agent in self.agents:
             agent.reset_memory()
@@ -0,0 +1,206 @@
+"""
+Embedding-based shortcuts for engagement decisions.
+
+- ``SemanticEngageCache`` reuses a persona's earlier engage verdict when a new
+  target post is semantically equivalent (cosine similarity above a
+  threshold) to one it has already judged, so reworded posts skip the LLM.
+- ``AffinityPrefilter`` compares a persona's bio with the post and decides
+  clear-cut cases (very low / very high similarity) without the LLM.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+def _default_embed(text: str) -> np.ndarray:
+    """Embed text with the shared sentence-transformers model (process-wide memo)."""
+    from snackPersona.evaluation.diversity.embedding import _encode_one
+    return _encode_one(text)
+
+
+class _UnitEmbedder:
+    """
+    Memoised ``text -> unit-norm vector`` wrapper around an embed function.
+    The memo is an LRU of at most ``max_entries`` texts, so an embedder
+    shared across generations doesn't grow with the length of the run.
+    Thread-safe: checks run on worker threads via ``asyncio.to_thread``.
+    """
+
+    def __init__(self, embed_fn: Optional[Callable[[str], np.ndarray]] = None,
+                 max_entries: int = 16384):
+        self._embed_fn = embed_fn or _default_embed
+        self.max_entries = max_entries
+        # content digest -> unit-norm embedding, least recently used first
+        self._memo: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # Guards _memo; the embed call itself runs outside it
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def has(self, text: str) -> bool:
+        """True if ``text`` is already embedded (calling is then a dict lookup)."""
+        return self._digest(text) in self._memo
+
+    def __call__(self, text: str) -> np.ndarray:
+        digest = self._digest(text)
+        memo = self._memo
+        with self._lock:
+            vec = memo.get(digest)
+            if vec is not None:
+                memo.move_to_end(digest)
+                return vec
+        vec = np.asarray(self._embed_fn(text), dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec = vec / norm
+        with self._lock:
+            memo[digest] = vec
+            memo.move_to_end(digest)
+            while len(memo) > self.max_entries:
+                memo.popitem(last=False)
+        return vec
+
+
+class _VectorRing:
+    """
+    Bounded float32 row store with a label per row.  Grows by doubling up
+    to ``capacity`` rows, then overwrites the oldest row, so an insert is a
+    row write rather than a rebuild of the whole matrix.
+    """
+
+    __slots__ = ("capacity", "rows", "labels", "size", "head")
+
+    def __init__(self, capacity: int, dim: int):
+        self.capacity = capacity
+        initial = max(1, min(16, capacity))
+        self.rows = np.empty((initial, dim), dtype=np.float32)
+        self.labels = np.empty(initial, dtype=bool)
+        self.size = 0
+        self.head = 0  # oldest row, overwritten next once full
+
+    def append(self, vec: np.ndarray, label: bool) -> None:
+        if self.capacity <= 0:
+            return
+        if self.size < self.capacity:
+            if self.size == len(self.rows):
+                grown = min(2 * self.size, self.capacity)
+                rows = np.empty((grown, self.rows.shape[1]), dtype=np.float32)
+                rows[:self.size] = self.rows
+                labels = np.empty(grown, dtype=bool)
+                labels[:self.size] = self.labels
+                self.rows, self.labels = rows, labels
+            slot = self.size
+            self.size += 1
+        else:
+            slot = self.head
+            self.head = (slot + 1) % self.capacity
+        self.rows[slot] = vec
+        self.labels[slot] = label
+
+    def best(self, vec: np.ndarray):
+        """(row, cosine) of the most similar stored vector, or (None, 0.0)."""
+        if not self.size:
+            return None, 0.0
+        sims = self.rows[:self.size] @ vec
+        idx = int(np.argmax(sims))
+        return idx, float(sims[idx])
+
+
+class SemanticEngageCache:
+    """
+    Per-persona store of (post embedding, engage decision) pairs.
+
+    Parameters
+    ----------
+    threshold : float
+        Minimum cosine similarity for a stored decision to be reused.
+    max_entries_per_persona : int
+        Oldest entries are dropped beyond this size.
+    embed_fn : callable, optional
+        ``text -> vector``; defaults to the MiniLM model used for diversity.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries_per_persona: int = 512,
+        embed_fn: Optional[Callable[[str], np.ndarray]] = None,
+    ):
+        self.threshold = threshold
+        self.max_entries_per_persona = max_entries_per_persona
+        self._embedder = _UnitEmbedder(embed_fn)
+
+        # persona -> its embeddings and decisions, updated in place per insert
+        self._rings: Dict[str, _VectorRing] = {}
+
+    def embed(self, content: str) -> np.ndarray:
+        """Return the unit-norm embedding of ``content`` (memoised by content hash)."""
+        return self._embedder(content)
+
+    def is_embedded(self, content: str) -> bool:
+        """True if ``embed(content)`` would not run the model."""
+        return self._embedder.has(content)
+
+    def _best_match(self, persona: str, vec: np.ndarray):
+        ring = self._rings.get(persona)
+        if ring is None:
+            return None, 0.0
+        return ring.best(vec)
+
+    def lookup(self, persona: str, vec: np.ndarray) -> Optional[bool]:
+        """Return a reusable decision for ``persona``, or None on a miss."""
+        idx, sim = self._best_match(persona, vec)
+        if idx is None or sim < self.threshold:
+            return None
+        return bool(self._rings[persona].labels[idx])
+
+    def add(self, persona: str, vec: np.ndarray, decision: bool) -> None:
+        """Record a decision unless a near-duplicate is already stored."""
+        _, sim = self._best_match(persona, vec)
+        if sim >= self.threshold:
+            return
+        ring = self._rings.get(persona)
+        if ring is None:
+            ring = self._rings[persona] = _VectorRing(self.max_entries_per_persona, vec.shape[0])
+        ring.append(vec, decision)
+
+
+class AffinityPrefilter:
+    """
+    Cheap persona/post affinity gate in front of the engagement LLM call.
+
+    Cosine similarity between the persona bio and the post decides the
+    clear-cut cases: below ``low`` the persona passes, above ``high`` it
+    replies without asking; anything in between returns None and the LLM
+    decides.  Pass ``embed_fn=semantic_cache.embed`` to share embeddings
+    with a ``SemanticEngageCache``.
+    """
+
+    def __init__(
+        self,
+        low: float = 0.15,
+        high: float = 0.7,
+        embed_fn: Optional[Callable[[str], np.ndarray]] = None,
+    ):
+        self.low = low
+        self.high = high
+        self._embedder = _UnitEmbedder(embed_fn)
+
+    def is_warm(self, bio: str, content: str) -> bool:
+        """True if both embeddings are memoised, so ``verdict`` is just a dot product."""
+        return self._embedder.has(bio) and self._embedder.has(content)
+
+    def verdict(self, bio: str, content: str) -> Optional[bool]:
+        """False = skip, True = engage, None = undecided."""
+        sim = float(self._embedder(bio) @ self._embedder(content))
+        if sim < self.low:
+            return False
+        if sim > self.high:
+            return True
+        return None
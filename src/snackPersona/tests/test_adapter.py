@@ -0,0 +1,129 @@
+import asyncio
+import json
+import unittest
+from typing import List
+
+from snackPersona.integration.adapter import PersonaToTravelerAdapter
+from snackPersona.llm.llm_client import LLMClient
+from snackPersona.utils.data_models import PersonaGenotype
+
+GENOME = {
+    "source_bias": {"academic": 0.8, "news": 0.1, "official": 0.2, "blogs": -0.2},
+    "query_templates": "template_v2_specific",
+    "search_depth": 2,
+    "novelty_weight": 0.7,
+}
+
+
+class GenomeClient(LLMClient):
+    """Answers batch prompts with a JSON array and single prompts with one genome; records prompts."""
+
+    def __init__(self, response: str = None):
+        self.response = response
+        self.prompts: List[str] = []
+
+    def _answer(self, user_prompt):
+        self.prompts.append(user_prompt)
+        if self.response is not None:
+            return self.response
+        if "JSON array" in user_prompt:
+            count = user_prompt.count("Persona Name:")
+            return json.dumps([dict(GENOME, persona=i) for i in range(1, count + 1)])
+        return json.dumps(GENOME)
+
+    def generate_text(self, system_prompt, user_prompt, model_id=None, temperature=0.7):
+        return self._answer(user_prompt)
+
+    async def generate_text_async(self, system_prompt, user_prompt, model_id=None, temperature=0.7):
+        return self._answer(user_prompt)
+
+
+def persona(name: str, bio: str = "I read papers.") -> PersonaGenotype:
+    return PersonaGenotype(name=name, bio=bio)
+
+
+class TestAdapterCache(unittest.TestCase):
+
+    def test_unchanged_persona_is_not_readapted(self):
+        client = GenomeClient()
+        adapter = PersonaToTravelerAdapter(client)
+        first = adapter.adapt(persona("Ada"))
+        second = adapter.adapt(persona("Ada"))
+        self.assertEqual(len(client.prompts), 1)
+        self.assertNotEqual(first.genome_id, second.genome_id)
+        self.assertEqual(second.query_template_id, "template_v2_specific")
+        self.assertEqual(second.search_depth, 2)
+
+    def test_changed_bio_is_readapted(self):
+        client = GenomeClient()
+        adapter = PersonaToTravelerAdapter(client)
+        adapter.adapt(persona("Ada"))
+        adapter.adapt(persona("Ada", bio="I write compilers."))
+        self.assertEqual(len(client.prompts), 2)
+
+    def test_unusable_output_is_not_cached(self):
+        client = GenomeClient(response="not json")
+        adapter = PersonaToTravelerAdapter(client)
+        fallback = adapter.adapt(persona("Ada"))
+        self.assertEqual(fallback.query_template_id, "template_v1_broad")
+        adapter.adapt(persona("Ada"))
+        self.assertEqual(len(client.prompts), 2)
+
+    def test_cache_is_bounded(self):
+        client = GenomeClient()
+        adapter = PersonaToTravelerAdapter(client, cache_size=2)
+        for name in ("A", "B", "C"):
+            adapter.adapt(persona(name))
+        adapter.adapt(persona("A"))
+        self.assertEqual(len(client.prompts), 4)
+        self.assertLessEqual(len(adapter._cache), 2)
+
+
+class TestAdaptBatch(unittest.TestCase):
+
+    def test_batch_lists_only_uncached_personas(self):
+        client = GenomeClient()
+        adapter = PersonaToTravelerAdapter(client)
+        adapter.adapt(persona("Ada"))
+        genomes = asyncio.run(adapter.adapt_batch_async(
+            [persona("Ada"), persona("Bob"), persona("Cy")]
+        ))
+        self.assertEqual(len(genomes), 3)
+        self.assertEqual(len(client.prompts), 2)
+        batch_prompt = client.prompts[-1]
+        self.assertNotIn("Ada", batch_prompt)
+        self.assertIn("Bob", batch_prompt)
+        self.assertIn("Cy", batch_prompt)
+
+    def test_fully_cached_batch_makes_no_call(self):
+        client = GenomeClient()
+        adapter = PersonaToTravelerAdapter(client)
+        people = [persona("Ada"), persona("Bob")]
+        asyncio.run(adapter.adapt_batch_async(people))
+        calls = len(client.prompts)
+        genomes = asyncio.run(adapter.adapt_batch_async(people))
+        self.assertEqual(len(client.prompts), calls)
+        self.assertTrue(all(g.search_depth == 2 for g in genomes))
+
+    def test_reordered_reply_is_matched_by_persona_number(self):
+        reply = [dict(GENOME, persona=2, search_depth=1), dict(GENOME, persona=1, search_depth=2)]
+        client = GenomeClient(response=json.dumps(reply))
+        adapter = PersonaToTravelerAdapter(client)
+        ada, bob = asyncio.run(adapter.adapt_batch_async([persona("Ada"), persona("Bob")]))
+        self.assertEqual((ada.search_depth, bob.search_depth), (2, 1))
+        self.assertEqual(len(client.prompts), 1)
+
+    def test_short_reply_is_discarded_before_caching(self):
+        reply = [dict(GENOME, persona=1), dict(GENOME, persona=3)]
+        client = GenomeClient(response=json.dumps(reply))
+        adapter = PersonaToTravelerAdapter(client)
+        asyncio.run(adapter.adapt_batch_async([persona("Ada"), persona("Bob"), persona("Cy")]))
+        # The whole batch falls back to one prompt per persona
+        self.assertEqual(len(client.prompts), 4)
+        self.assertTrue(all("JSON array" not in p for p in client.prompts[1:]))
+        # The per-persona replies are lists here, so nothing usable was cached
+        self.assertEqual(len(adapter._cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+from typing import List
+
+from snackPersona.llm.llm_client import LLMClient
+from snackPersona.simulation.agent import SimulationAgent, _research_context
+from snackPersona.traveler.utils.data_models import ExecutionResult
+from snackPersona.utils.data_models import PersonaGenotype
+
+
+class ScriptedClient(LLMClient):
+    """Returns a fixed response, streamed in ``chunk_size`` pieces; records each call's prompt."""
+
+    def __init__(self, response: str, chunk_size: int = 3):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.prompts: List[str] = []
+        self.chunks_sent = 0
+
+    def generate_text(self, system_prompt, user_prompt, model_id=None, temperature=0.7):
+        self.prompts.append(user_prompt)
+        return self.response
+
+    async def generate_text_async(self, system_prompt, user_prompt, model_id=None, temperature=0.7):
+        self.prompts.append(user_prompt)
+        return self.response
+
+    async def generate_text_stream_async(self, system_prompt, user_prompt, model_id=None, temperature=0.7):
+        self.prompts.append(user_prompt)
+        for i in range(0, len(self.response), self.chunk_size):
+            self.chunks_sent += 1
+            yield self.response[i:i + self.chunk_size]
+
+
+def make_agent(client: LLMClient) -> SimulationAgent:
+    return SimulationAgent(PersonaGenotype(name="Ada", bio="I write compilers."), client)
+
+
+class TestEngageAndMaybeReply(unittest.TestCase):
+
+    def _run(self, response: str):
+        client = ScriptedClient(response)
+        agent = make_agent(client)
+        result = asyncio.run(agent.engage_and_maybe_reply_async("hello", "Bob"))
+        return client, agent, result
+
+    def test_pass_is_a_pass(self):
+        for answer in ("PASS", "  PASS", "PASS.", "PASS!\n"):
+            with self.subTest(answer=answer):
+                _, agent, result = self._run(answer)
+                self.assertEqual(result, {"engaged": False, "reply": None})
+                self.assertEqual(len(agent.memory), 0)
+
+    def test_replies_starting_with_pass_prefix_are_kept(self):
+        for reply in ("Passionate take, and I agree.", "Passed this along to my team!", "Passing thought: no.",
+                      "Pass the popcorn, this thread is wild.", "PASS on the hype, but the data is solid.", "pass"):
+            with self.subTest(reply=reply):
+                _, agent, result = self._run(reply)
+                self.assertTrue(result["engaged"])
+                self.assertEqual(result["reply"], reply)
+                self.assertEqual(agent.memory[-1]["content"], reply)
+
+
+def research_result(headlines: List[str]) -> ExecutionResult:
+    return ExecutionResult(genome_id="g", retrieved_urls=[], generated_queries=[], log="",
+                           headlines=headlines, api_calls=0, execution_time=0.0)
+
+
+class TestResearchContext(unittest.TestCase):
+
+    def test_no_research_adds_nothing(self):
+        self.assertEqual(_research_context(None), "")
+        self.assertEqual(_research_context(research_result([])), "")
+
+    def test_top_three_headlines_in_stable_order(self):
+        a = _research_context(research_result(["Mars", "AI", "Jazz", "Ignored"]))
+        b = _research_context(research_result(["Jazz", "Mars", "AI"]))
+        self.assertEqual(a, b)
+        self.assertIn("- AI\n- Jazz\n- Mars", a)
+        self.assertNotIn("Ignored", a)
+
+
+if __name__ == '__main__':
+    unittest.main()
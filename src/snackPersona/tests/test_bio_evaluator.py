@@ -0,0 +1,78 @@
+import unittest
+
+from snackPersona.evaluation.bio_evaluator import BioStyleEvaluator
+from snackPersona.tests.test_agent import ScriptedClient
+from snackPersona.utils.data_models import PersonaGenotype
+
+
+def genotype(i, bio=None):
+    return PersonaGenotype(name=f"p{i}", bio=bio or f"I am persona number {i}.")
+
+
+class TestParseScore(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = BioStyleEvaluator(ScriptedClient(""))
+
+    def test_plain_and_fenced_json(self):
+        self.assertEqual(self.evaluator._parse_score('{"score": 0.8}'), 0.8)
+        self.assertEqual(self.evaluator._parse_score('Sure!\n```json\n{"score": 0.25}\n```'), 0.25)
+        self.assertEqual(self.evaluator._parse_score('{"reason": "vivid", "score": 1e-1}'), 0.1)
+
+    def test_unparsable_reply_has_no_score(self):
+        for reply in ("I'd say fairly good", '["score", 0.3]', '{"verdict": "good"}', ""):
+            with self.subTest(reply=reply):
+                self.assertIsNone(self.evaluator._parse_score(reply))
+
+    def test_parse_scores(self):
+        self.assertEqual(self.evaluator._parse_scores('{"scores": [0.4, 0.7, 1]}'), [0.4, 0.7, 1.0])
+        self.assertIsNone(self.evaluator._parse_scores('{"scores": [0.4, "high"]}'))
+        self.assertIsNone(self.evaluator._parse_scores("no scores"))
+
+
+class TestEvaluateBios(unittest.TestCase):
+
+    def test_uncached_bios_share_one_call_and_duplicates_are_judged_once(self):
+        client = ScriptedClient('{"scores": [0.9, 0.2, 0.6]}')
+        evaluator = BioStyleEvaluator(client)
+        population = [genotype(0), genotype(1), genotype(2), genotype(3, bio="I am persona number 0.")]
+        self.assertEqual(evaluator.evaluate_bios(population), [0.9, 0.2, 0.6, 0.9])
+        self.assertEqual(len(client.prompts), 1)
+
+        # Everything is cached now: no further calls
+        self.assertEqual(evaluator.evaluate_bios(population[:3]), [0.9, 0.2, 0.6])
+        self.assertEqual(len(client.prompts), 1)
+
+    def test_batch_size_splits_calls(self):
+        client = ScriptedClient('{"scores": [0.3, 0.4]}')
+        evaluator = BioStyleEvaluator(client, batch_size=2)
+        self.assertEqual(evaluator.evaluate_bios([genotype(i) for i in range(4)]), [0.3, 0.4, 0.3, 0.4])
+        self.assertEqual(len(client.prompts), 2)
+
+    def test_unusable_batch_reply_is_neutral_and_retried(self):
+        client = ScriptedClient('{"scores": [0.3]}')  # wrong length for two bios
+        evaluator = BioStyleEvaluator(client)
+        population = [genotype(0), genotype(1)]
+        self.assertEqual(evaluator.evaluate_bios(population), [0.5, 0.5])
+        evaluator.evaluate_bios(population)
+        self.assertEqual(len(client.prompts), 2)
+
+    def test_empty_reply_is_neutral_and_not_cached(self):
+        # Clients return an empty string when the API call fails
+        client = ScriptedClient("")
+        evaluator = BioStyleEvaluator(client)
+        self.assertEqual(evaluator.evaluate_bio(genotype(0)), 0.5)
+        self.assertEqual(len(evaluator._cache), 0)
+        client.response = '{"score": 0.9}'
+        self.assertEqual(evaluator.evaluate_bio(genotype(0)), 0.9)
+        self.assertEqual(len(client.prompts), 2)
+
+    def test_single_bio_uses_the_one_bio_prompt(self):
+        client = ScriptedClient('{"score": 0.7}')
+        evaluator = BioStyleEvaluator(client)
+        self.assertEqual(evaluator.evaluate_bio(genotype(0)), 0.7)
+        self.assertIn('{"score": float}', client.prompts[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
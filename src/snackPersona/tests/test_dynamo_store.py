@@ -0,0 +1,43 @@
+import json
+import unittest
+from decimal import Decimal
+
+from snackPersona.persona_store.dynamo_store import (
+    _compress,
+    _decompress,
+    _dumps_bytes,
+    _to_decimal,
+    _to_decimal_dict,
+)
+
+
+class TestArchiveCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        archive = [{"name": "Ada", "bio": "I write compilers. " * 50}]
+        raw = _dumps_bytes(archive)
+        payload, codec = _compress(raw)
+        self.assertLess(len(payload), len(raw))
+        self.assertEqual(json.loads(_decompress(payload, codec)), archive)
+
+    def test_unknown_codec_is_rejected(self):
+        with self.assertRaises(ValueError):
+            _decompress(b"", "lz4+json")
+
+
+class TestDecimalConversion(unittest.TestCase):
+
+    def test_rounds_to_ten_significant_digits(self):
+        self.assertEqual(_to_decimal(0.1), Decimal("0.1000000000"))
+        self.assertEqual(_to_decimal(1 / 3), Decimal("0.3333333333"))
+        self.assertEqual(_to_decimal(2), Decimal("2"))
+
+    def test_stats_dict_maps_fields_and_defaults_missing(self):
+        out = _to_decimal_dict({"diversity": 0.25})
+        self.assertEqual(set(out), {"population_diversity", "fitness_mean"})
+        self.assertEqual(out["population_diversity"], Decimal("0.25"))
+        self.assertEqual(out["fitness_mean"], Decimal("0"))
+
+
+if __name__ == '__main__':
+    unittest.main()
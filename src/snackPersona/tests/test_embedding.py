@@ -0,0 +1,41 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from snackPersona.evaluation.diversity import embedding
+
+
+class TestModelLoading(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = embedding._model
+        embedding._model = None
+
+    def tearDown(self):
+        embedding._model = self._saved
+
+    def test_concurrent_first_calls_load_once(self):
+        """Worker threads racing on the first call must share a single load."""
+        calls = []
+
+        def slow_load():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        results = []
+        with mock.patch.object(embedding, "_load_model", side_effect=slow_load):
+            threads = [threading.Thread(target=lambda: results.append(embedding._get_model()))
+                       for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(r) for r in results}), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
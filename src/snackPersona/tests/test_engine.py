@@ -0,0 +1,101 @@
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from snackPersona.compiler.compiler import compile_persona
+from snackPersona.evaluation.evaluator import LLMEvaluator
+from snackPersona.llm.llm_client import MockLLMClient
+from snackPersona.orchestrator.engine import EvolutionEngine, _distinct_indices, _parse_string_list
+from snackPersona.orchestrator.operators import LLMCrossover, LLMMutator
+from snackPersona.utils.data_models import Individual, PersonaGenotype
+
+
+class NullStore:
+    """Store stand-in that keeps nothing."""
+
+    def __init__(self, storage_dir: str):
+        self.storage_dir = storage_dir
+        self.table = None
+
+    def save_generation(self, *args, **kwargs):
+        pass
+
+    def save_transcripts(self, *args, **kwargs):
+        pass
+
+
+class TestDistinctIndices(unittest.TestCase):
+
+    def test_rows_are_distinct_and_in_range(self):
+        rng = np.random.default_rng(0)
+        for n in (1, 2, 3, 7, 10_000):
+            k = min(3, n)
+            with self.subTest(n=n):
+                draws = _distinct_indices(rng, n, (500, 2), k)
+                self.assertEqual(draws.shape, (500, 2, k))
+                self.assertGreaterEqual(draws.min(), 0)
+                self.assertLess(draws.max(), n)
+                for row in draws.reshape(-1, k).tolist():
+                    self.assertEqual(len(set(row)), k)
+
+
+class TestPlanOffspring(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        llm = MockLLMClient()
+        self.engine = EvolutionEngine(
+            llm, NullStore(self._tmp.name), LLMEvaluator(llm),
+            LLMMutator(llm), LLMCrossover(llm),
+            population_size=12, generations=1, elite_count=2,
+        )
+        population = []
+        for i in range(12):
+            genotype = PersonaGenotype(name=f"p{i}", bio=f"I am persona {i}.")
+            population.append(Individual(genotype=genotype, phenotype=compile_persona(genotype),
+                                         shared_fitness=float(i)))
+        self.engine.population = population
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_plan_shape_and_selection_pressure(self):
+        random.seed(1)
+        elites, plan = self.engine._plan_offspring()
+        self.assertEqual([e.genotype.name for e in elites], ["p11", "p10"])
+        self.assertEqual(len(plan), 10)
+        parents = {p.name for p1, p2, _ in plan for p in (p1, p2)}
+        # Three distinct contestants: the two weakest can never win a tournament
+        self.assertFalse(parents & {"p0", "p1"})
+
+    def test_plan_is_reproducible_from_random_seed(self):
+        random.seed(7)
+        _, first = self.engine._plan_offspring()
+        random.seed(7)
+        _, second = self.engine._plan_offspring()
+        summary = lambda plan: [(a.name, b.name, m) for a, b, m in plan]
+        self.assertEqual(summary(first), summary(second))
+
+
+class TestParseStringList(unittest.TestCase):
+
+    def test_json_array(self):
+        self.assertEqual(_parse_string_list('["AI", "Mars"]', 5), ["AI", "Mars"])
+        self.assertEqual(_parse_string_list('["a", "b", "c"]', 2), ["a", "b"])
+
+    def test_code_fence(self):
+        self.assertEqual(_parse_string_list('```json\n["AI", "Mars"]\n```', 5), ["AI", "Mars"])
+
+    def test_salvages_quoted_strings_from_broken_json(self):
+        text = 'Here you go: ["AI in \\"Education\\"", "Vegan Diet", "Mars" and more'
+        self.assertEqual(_parse_string_list(text, 5), ['AI in "Education"', "Vegan Diet", "Mars"])
+
+    def test_non_list_and_empty(self):
+        self.assertEqual(_parse_string_list('{"topic": "AI"}', 5), [])
+        self.assertEqual(_parse_string_list("no topics here", 5), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
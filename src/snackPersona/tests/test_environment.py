@@ -0,0 +1,232 @@
+import asyncio
+import random
+import unittest
+
+import numpy as np
+
+from snackPersona.simulation.environment import (
+    DecisionCache,
+    FeedBuffer,
+    SimulationEnvironment,
+    _run_coros_bounded,
+)
+from snackPersona.simulation.semantic_cache import AffinityPrefilter, SemanticEngageCache
+from snackPersona.tests.test_agent import ScriptedClient, make_agent
+
+
+def table_embed(table):
+    """embed_fn looking texts up in ``table`` (unknown texts get a fixed vector)."""
+    def embed(text: str) -> np.ndarray:
+        return np.asarray(table.get(text, [0.0, 0.0, 1.0]), dtype=np.float32)
+    return embed
+
+
+BIO = "I write compilers."
+
+
+class TestEngageTarget(unittest.TestCase):
+
+    def _engage(self, env, agent, content="a post"):
+        post = {"author": "Bob", "content": content}
+        return asyncio.run(env._engage_target(agent, post))
+
+    def test_prefilter_match_replies_in_one_call(self):
+        client = ScriptedClient("Totally agree.")
+        agent = make_agent(client)
+        prefilter = AffinityPrefilter(embed_fn=table_embed({BIO: [1, 0, 0], "a post": [1, 0, 0]}))
+        env = SimulationEnvironment([agent], affinity_prefilter=prefilter)
+        self.assertEqual(self._engage(env, agent), "Totally agree.")
+        self.assertEqual(len(client.prompts), 1)
+        self.assertNotIn("PASS", client.prompts[0])
+
+    def test_prefilter_mismatch_skips_the_llm(self):
+        client = ScriptedClient("unused")
+        agent = make_agent(client)
+        prefilter = AffinityPrefilter(embed_fn=table_embed({BIO: [1, 0, 0], "a post": [0, 1, 0]}))
+        env = SimulationEnvironment([agent], affinity_prefilter=prefilter)
+        self.assertIsNone(self._engage(env, agent))
+        self.assertEqual(client.prompts, [])
+
+    def test_semantic_cache_hit_replies_in_one_call(self):
+        client = ScriptedClient("Sure thing.")
+        agent = make_agent(client)
+        cache = SemanticEngageCache(embed_fn=table_embed({}))
+        cache.add(agent.genotype.name, cache.embed("an earlier post"), True)
+        env = SimulationEnvironment([agent], semantic_cache=cache)
+        self.assertEqual(self._engage(env, agent), "Sure thing.")
+        self.assertEqual(len(client.prompts), 1)
+        self.assertNotIn("PASS", client.prompts[0])
+
+    def test_undecided_uses_fused_call_and_records_it(self):
+        client = ScriptedClient("PASS")
+        agent = make_agent(client)
+        cache = SemanticEngageCache(embed_fn=table_embed({}))
+        env = SimulationEnvironment([agent], semantic_cache=cache)
+        self.assertIsNone(self._engage(env, agent))
+        self.assertEqual(len(client.prompts), 1)
+        self.assertIn("PASS", client.prompts[0])
+        # The verdict is now reusable for a reworded (same-embedding) post
+        self.assertIs(cache.lookup(agent.genotype.name, cache.embed("reworded")), False)
+
+
+class TestEnvironmentRng(unittest.TestCase):
+
+    def _draws(self, **kwargs):
+        env = SimulationEnvironment([make_agent(ScriptedClient(""))], **kwargs)
+        return [env._rng.random() for _ in range(3)]
+
+    def test_global_seed_reproduces_the_default_rng(self):
+        random.seed(42)
+        first = self._draws()
+        random.seed(42)
+        self.assertEqual(self._draws(), first)
+
+    def test_explicit_seed_wins(self):
+        random.seed(1)
+        a = self._draws(seed=7)
+        random.seed(2)
+        self.assertEqual(self._draws(seed=7), a)
+
+
+class TestRunCorosBounded(unittest.TestCase):
+
+    def test_results_keep_input_order_and_respect_limit(self):
+        in_flight = [0, 0]  # current, peak
+
+        async def job(i):
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+            await asyncio.sleep(0.001 * ((7 * i) % 5))
+            in_flight[0] -= 1
+            return i
+
+        for n, limit in ((3, 8), (20, 4)):
+            with self.subTest(n=n, limit=limit):
+                in_flight[:] = [0, 0]
+                results = asyncio.run(_run_coros_bounded([job(i) for i in range(n)], limit))
+                self.assertEqual(results, list(range(n)))
+                self.assertLessEqual(in_flight[1], limit)
+
+    def test_failure_raises_the_original_exception(self):
+        async def ok():
+            await asyncio.sleep(0.01)
+
+        async def boom():
+            raise ValueError("boom")
+
+        # n <= limit (TaskGroup path) and n > limit (wait path) must agree
+        for n, limit in ((3, 8), (6, 2)):
+            with self.subTest(n=n, limit=limit):
+                coros = [ok() for _ in range(n - 1)] + [boom()]
+                with self.assertRaises(ValueError):
+                    asyncio.run(_run_coros_bounded(coros, limit))
+
+
+class TestDecisionCache(unittest.TestCase):
+
+    def test_concurrent_requests_share_one_computation(self):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "reply"
+
+        async def main():
+            cache = DecisionCache()
+            return await asyncio.gather(*[cache.get_or_compute("k", compute) for _ in range(5)]), cache
+
+        results, cache = asyncio.run(main())
+        self.assertEqual(results, ["reply"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_failures_are_not_cached(self):
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("transient")
+            return None
+
+        async def main():
+            cache = DecisionCache()
+            with self.assertRaises(RuntimeError):
+                await cache.get_or_compute("k", flaky)
+            # A None outcome (the agent passed) is a real result and is cached
+            first = await cache.get_or_compute("k", flaky)
+            second = await cache.get_or_compute("k", flaky)
+            return first, second
+
+        self.assertEqual(asyncio.run(main()), (None, None))
+        self.assertEqual(len(attempts), 2)
+
+    def test_lru_eviction(self):
+        async def value(v):
+            return v
+
+        async def main():
+            cache = DecisionCache(maxsize=2)
+            await cache.get_or_compute("a", lambda: value(1))
+            await cache.get_or_compute("b", lambda: value(2))
+            await cache.get_or_compute("a", lambda: value(-1))  # hit; "b" becomes oldest
+            await cache.get_or_compute("c", lambda: value(3))
+            kept = await cache.get_or_compute("a", lambda: value(-1))
+            evicted = await cache.get_or_compute("b", lambda: value(20))
+            return kept, evicted
+
+        self.assertEqual(asyncio.run(main()), (1, 20))
+
+    def test_content_key_normalises_whitespace_and_case(self):
+        agent = make_agent(ScriptedClient(""))
+        self.assertEqual(DecisionCache.content_key(agent, "  Hello World "),
+                         DecisionCache.content_key(agent, "hello world"))
+        self.assertNotEqual(DecisionCache.content_key(agent, "hello"),
+                            DecisionCache.content_key(agent, "hello!"))
+
+
+class TestFeedBuffer(unittest.TestCase):
+
+    @staticmethod
+    def event(author, n):
+        return {"author": author, "content": f"{author}-{n}"}
+
+    def test_keeps_most_recent_in_order(self):
+        feed = FeedBuffer(3)
+        evicted = [feed.append(self.event("a", i)) for i in range(5)]
+        self.assertEqual(evicted[:3], [None, None, None])
+        self.assertEqual([e["content"] for e in evicted[3:]], ["a-0", "a-1"])
+        self.assertEqual([e["content"] for e in feed], ["a-2", "a-3", "a-4"])
+        self.assertEqual(feed[0]["content"], "a-2")
+        self.assertEqual(feed[-1]["content"], "a-4")
+        with self.assertRaises(IndexError):
+            feed[3]
+
+    def test_author_counts_follow_evictions(self):
+        feed = FeedBuffer(2)
+        feed.append(self.event("a", 0))
+        feed.append(self.event("b", 0))
+        feed.append(self.event("b", 1))  # evicts a-0
+        self.assertEqual(feed.count_by("a"), 0)
+        self.assertEqual(feed.count_by("b"), 2)
+        feed.clear()
+        self.assertEqual(len(feed), 0)
+        self.assertEqual(feed.count_by("b"), 0)
+
+    def test_sample_not_by_skips_own_posts(self):
+        feed = FeedBuffer(10)
+        for i in range(6):
+            feed.append(self.event("me", i))
+        feed.append(self.event("other", 0))
+        rng = random.Random(0)
+        picks = {feed.sample_not_by("me", rng)["author"] for _ in range(50)}
+        self.assertEqual(picks, {"other"})
+        # Only own posts left: any post is returned rather than looping forever
+        solo = FeedBuffer(2)
+        solo.append(self.event("me", 0))
+        self.assertEqual(solo.sample_not_by("me", rng)["author"], "me")
+
+
+if __name__ == '__main__':
+    unittest.main()
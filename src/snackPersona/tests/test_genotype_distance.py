@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from snackPersona.evaluation.diversity import genotype
+from snackPersona.evaluation.diversity.genotype import (
+    _code_points,
+    _string_distance,
+    _string_distance_matrix,
+)
+
+
+def reference_distance(t1: str, t2: str) -> float:
+    """The original character-match distance, written with zip."""
+    if t1 == t2:
+        return 0.0
+    common = sum(1 for a, b in zip(t1, t2) if a == b)
+    return 1.0 - common / max(len(t1), len(t2), 1)
+
+
+TEXTS = [
+    "",
+    "I love jazz.",
+    "I love jazz!",
+    "I hate jazz.",
+    "ジャズが好きです",
+    "ジャズが嫌いです",
+    "short",
+    "a much longer bio than the others, with plenty of characters",
+]
+
+
+class TestStringDistance(unittest.TestCase):
+
+    def test_matches_zip_reference(self):
+        for t1 in TEXTS:
+            for t2 in TEXTS:
+                with self.subTest(t1=t1, t2=t2):
+                    self.assertAlmostEqual(
+                        _string_distance(t1, t2, _code_points(t1), _code_points(t2)),
+                        reference_distance(t1, t2),
+                    )
+
+
+class TestStringDistanceMatrix(unittest.TestCase):
+
+    def _reference(self, texts):
+        return np.array([[reference_distance(a, b) for b in texts] for a in texts])
+
+    def test_matches_pairwise_reference(self):
+        texts = TEXTS + ["I love jazz.", ""]  # duplicates, including two empty bios
+        np.testing.assert_allclose(_string_distance_matrix(texts), self._reference(texts))
+
+    def test_row_blocks_agree_with_one_pass(self):
+        texts = TEXTS * 3
+        with mock.patch.object(genotype, "_MATCH_BLOCK_CELLS", 1):
+            blocked = _string_distance_matrix(texts)
+        np.testing.assert_allclose(blocked, _string_distance_matrix(texts))
+
+    def test_empty_population(self):
+        self.assertEqual(_string_distance_matrix([]).shape, (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from snackPersona.llm.llm_client import ResponseCacheMixin
+
+
+class CacheOnly(ResponseCacheMixin):
+    """Bare response cache, as a client would set it up."""
+
+    def __init__(self, **kwargs):
+        self._init_response_cache(**kwargs)
+
+
+@mock.patch.dict(os.environ, {"SNACK_LLM_CACHE": ""})
+class TestResponseCache(unittest.TestCase):
+
+    def test_low_temperature_calls_round_trip(self):
+        cache = CacheOnly()
+        key = cache._response_cache_key("sys", "user", "m", 0.2)
+        self.assertIsNone(cache._response_cache_get(key))
+        cache._response_cache_put(key, "answer")
+        self.assertEqual(cache._response_cache_get(key), "answer")
+        # Any change to the call is a different key
+        self.assertNotEqual(key, cache._response_cache_key("sys", "user", "m", 0.3))
+        self.assertNotEqual(key, cache._response_cache_key("sys", "user2", "m", 0.2))
+
+    def test_high_temperature_and_disabled_cache_skip(self):
+        self.assertIsNone(CacheOnly()._response_cache_key("s", "u", "m", 0.9))
+        self.assertIsNone(CacheOnly(maxsize=0)._response_cache_key("s", "u", "m", 0.0))
+
+    def test_empty_responses_are_not_cached(self):
+        cache = CacheOnly()
+        key = cache._response_cache_key("s", "u", "m", 0.0)
+        cache._response_cache_put(key, "")
+        self.assertIsNone(cache._response_cache_get(key))
+
+    def test_lru_eviction(self):
+        cache = CacheOnly(maxsize=2)
+        keys = [cache._response_cache_key("s", str(i), "m", 0.0) for i in range(3)]
+        cache._response_cache_put(keys[0], "0")
+        cache._response_cache_put(keys[1], "1")
+        cache._response_cache_get(keys[0])  # refresh 0; 1 is now oldest
+        cache._response_cache_put(keys[2], "2")
+        self.assertEqual(cache._response_cache_get(keys[0]), "0")
+        self.assertIsNone(cache._response_cache_get(keys[1]))
+
+
+@mock.patch.dict(os.environ, {"SNACK_LLM_CACHE": ""})
+class TestPersistentResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "nested", "llm.sqlite")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _close(self, cache):
+        cache.close_response_cache()
+
+    def test_entries_survive_a_new_instance(self):
+        first = CacheOnly(path=self.path)
+        key = first._response_cache_key("s", "u", "m", 0.0)
+        first._response_cache_put(key, "stored")
+        self._close(first)
+
+        second = CacheOnly(path=self.path)
+        self.assertEqual(second._response_cache_get(key), "stored")
+        # The hit was promoted into the in-memory LRU
+        self.assertIn(key, second._response_cache)
+        self._close(second)
+
+    def test_lru_eviction_keeps_the_disk_copy(self):
+        cache = CacheOnly(maxsize=1, path=self.path)
+        k1 = cache._response_cache_key("s", "1", "m", 0.0)
+        k2 = cache._response_cache_key("s", "2", "m", 0.0)
+        cache._response_cache_put(k1, "one")
+        cache._response_cache_put(k2, "two")
+        self.assertNotIn(k1, cache._response_cache)
+        self.assertEqual(cache._response_cache_get(k1), "one")
+        self._close(cache)
+
+    def test_writes_are_committed_in_batches(self):
+        cache = CacheOnly(maxsize=1, path=self.path)
+        keys = [cache._response_cache_key("s", str(i), "m", 0.0) for i in range(3)]
+        for i, key in enumerate(keys):
+            cache._response_cache_put(key, str(i))
+
+        reader = CacheOnly(path=self.path)
+        self.assertIsNone(reader._response_cache_get(keys[0]))
+        # Buffered entries evicted from the LRU are still served
+        self.assertEqual(cache._response_cache_get(keys[0]), "0")
+
+        cache.flush_response_cache()
+        self.assertEqual(reader._response_cache_get(keys[0]), "0")
+        self._close(reader)
+        self._close(cache)
+
+    def test_buffer_flushes_itself_when_full(self):
+        cache = CacheOnly(path=self.path)
+        for i in range(cache._DB_FLUSH_EVERY):
+            cache._response_cache_put(cache._response_cache_key("s", str(i), "m", 0.0), str(i))
+        self.assertEqual(cache._response_db_pending, {})
+        count = cache._response_db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        self.assertEqual(count, cache._DB_FLUSH_EVERY)
+        self._close(cache)
+
+    def test_env_var_enables_persistence(self):
+        with mock.patch.dict(os.environ, {"SNACK_LLM_CACHE": self.path}):
+            cache = CacheOnly()
+        self.assertIsNotNone(cache._response_db)
+        self.assertTrue(os.path.exists(self.path))
+        self._close(cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from snackPersona.utils.data_models import MediaItem
+from snackPersona.utils.media_dataset import MediaDataset
+
+
+def make_item(media_id: str, title: str = "t") -> MediaItem:
+    return MediaItem(id=media_id, title=title, content="c")
+
+
+class TestMediaDataset(unittest.TestCase):
+
+    def test_lookup_after_add(self):
+        ds = MediaDataset()
+        ds.add_media_item(make_item("a"))
+        ds.add_media_items([make_item("b"), make_item("a", title="dup")])
+        self.assertEqual(ds.get_media_item("b").id, "b")
+        # The first item with an id wins
+        self.assertEqual(ds.get_media_item("a").title, "t")
+        self.assertIsNone(ds.get_media_item("missing"))
+
+    def test_assigning_same_length_list_reindexes(self):
+        """Replacing the items with a list of the same length must not serve stale lookups."""
+        ds = MediaDataset()
+        ds.add_media_items([make_item("a"), make_item("b")])
+        ds.media_items = [make_item("x"), make_item("y")]
+        self.assertIsNone(ds.get_media_item("a"))
+        self.assertEqual(ds.get_media_item("y").id, "y")
+
+    def test_load_from_file_reindexes(self):
+        ds = MediaDataset()
+        ds.add_media_item(make_item("old"))
+        other = MediaDataset()
+        other.add_media_item(make_item("new"))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "media.json")
+            other.save_to_file(path)
+            ds.load_from_file(path)
+        self.assertIsNone(ds.get_media_item("old"))
+        self.assertEqual(ds.get_media_item("new").id, "new")
+
+
+if __name__ == '__main__':
+    unittest.main()
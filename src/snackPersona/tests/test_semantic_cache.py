@@ -0,0 +1,113 @@
+import threading
+import unittest
+
+import numpy as np
+
+from snackPersona.simulation.semantic_cache import SemanticEngageCache, _UnitEmbedder, _VectorRing
+
+
+class CountingEmbed:
+    """Deterministic fake embedder that records which texts it encoded."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text: str) -> np.ndarray:
+        self.calls.append(text)
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return rng.standard_normal(8)
+
+
+class TestUnitEmbedder(unittest.TestCase):
+
+    def test_vectors_are_unit_norm_and_memoised(self):
+        embed = CountingEmbed()
+        embedder = _UnitEmbedder(embed)
+        v1 = embedder("hello")
+        v2 = embedder("hello")
+        self.assertAlmostEqual(float(np.linalg.norm(v1)), 1.0, places=5)
+        self.assertIs(v1, v2)
+        self.assertEqual(embed.calls, ["hello"])
+        self.assertTrue(embedder.has("hello"))
+
+    def test_memo_is_bounded_lru(self):
+        embed = CountingEmbed()
+        embedder = _UnitEmbedder(embed, max_entries=2)
+        embedder("a")
+        embedder("b")
+        embedder("a")  # refresh "a"; "b" is now least recently used
+        embedder("c")
+        self.assertEqual(len(embedder._memo), 2)
+        self.assertTrue(embedder.has("a"))
+        self.assertFalse(embedder.has("b"))
+        self.assertTrue(embedder.has("c"))
+
+    def test_concurrent_calls_keep_the_memo_consistent(self):
+        embedder = _UnitEmbedder(lambda text: np.ones(4, dtype=np.float32), max_entries=8)
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(500):
+                    embedder(str((offset + i) % 40))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n * 7,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(embedder._memo), 8)
+
+
+def unit(*components) -> np.ndarray:
+    v = np.asarray(components, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+class TestSemanticEngageCache(unittest.TestCase):
+
+    def test_near_duplicate_reuses_decision(self):
+        cache = SemanticEngageCache(threshold=0.9)
+        cache.add("ada", unit(1, 0, 0), True)
+        self.assertIs(cache.lookup("ada", unit(1, 0.1, 0)), True)
+        # Below the threshold, or another persona: no reuse
+        self.assertIsNone(cache.lookup("ada", unit(1, 1, 0)))
+        self.assertIsNone(cache.lookup("bob", unit(1, 0, 0)))
+
+    def test_near_duplicates_are_not_stored_twice(self):
+        cache = SemanticEngageCache(threshold=0.9)
+        cache.add("ada", unit(1, 0, 0), False)
+        cache.add("ada", unit(1, 0.05, 0), True)
+        self.assertEqual(cache._rings["ada"].size, 1)
+        self.assertIs(cache.lookup("ada", unit(1, 0, 0)), False)
+
+
+class TestVectorRing(unittest.TestCase):
+
+    def test_grows_then_overwrites_oldest(self):
+        ring = _VectorRing(capacity=20, dim=2)
+        vecs = [unit(np.cos(a), np.sin(a)) for a in np.linspace(0, np.pi / 2, 25)]
+        for i, v in enumerate(vecs):
+            ring.append(v, i % 2 == 0)
+        self.assertEqual(ring.size, 20)
+        self.assertEqual(len(ring.rows), 20)
+        # The first five rows were overwritten by vectors 20..24
+        idx, sim = ring.best(vecs[22])
+        self.assertAlmostEqual(sim, 1.0, places=5)
+        self.assertEqual(idx, 2)
+        self.assertTrue(ring.labels[idx])
+        _, sim_old = ring.best(vecs[0])
+        self.assertLess(sim_old, 0.9999)
+
+    def test_empty_and_zero_capacity(self):
+        self.assertEqual(_VectorRing(4, 3).best(unit(1, 0, 0)), (None, 0.0))
+        ring = _VectorRing(0, 3)
+        ring.append(unit(1, 0, 0), True)
+        self.assertEqual(ring.size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
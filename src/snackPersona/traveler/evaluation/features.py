@@ -20,20 +20,15 @@ def calculate_feature_descriptors(result: ExecutionResult) -> FeatureDescriptors
     
     total_score = 0
     count = 0
-    from urllib.parse import urlparse
     
-    for url in result.retrieved_urls:
-        try:
-            domain = urlparse(url).netloc
-            score = 0.5 # Default
-            for key, val in authority_scores.items():
-                if key in domain:
-                    score = val
-                    break
-            total_score += score
-            count += 1
-        except:
-            pass
+    for domain in result.url_domains():
+        score = 0.5 # Default
+        for key, val in authority_scores.items():
+            if key in domain:
+                score = val
+                break
+        total_score += score
+        count += 1
     
     authority = (total_score / count) if count > 0 else 0.5
 
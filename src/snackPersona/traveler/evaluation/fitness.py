@@ -6,6 +6,7 @@ from snackPersona.traveler.utils.data_models import (
     Fitness,
     EvaluatedTraveler,
 )
+from snackPersona.traveler.evaluation._kernels import jaccard_matrix
 
 def calculate_fitness(result: ExecutionResult) -> Fitness:
     """
@@ -17,13 +18,7 @@ def calculate_fitness(result: ExecutionResult) -> Fitness:
     novelty = 0.5 
 
     # 2. Coverage
-    from urllib.parse import urlparse
-    unique_domains = set()
-    for url in result.retrieved_urls:
-        try:
-            unique_domains.add(urlparse(url).netloc)
-        except:
-            pass
+    unique_domains = set(result.url_domains())
     coverage = min(1.0, len(unique_domains) / 10.0)
 
     # 3. Reliability
@@ -147,31 +142,14 @@ def calculate_population_uniqueness(population: List[EvaluatedTraveler]):
             ind.fitness.uniqueness = 1.0
         return
 
-    # Convert retrieved_domains to sets for faster operations
+    # All-pairs Jaccard of the domain sets in one kernel call
     domain_sets = [set(ind.retrieved_domains) for ind in population]
-    
-    for i, ind in enumerate(population):
-        total_similarity = 0.0
-        comparisons = 0
-        
-        my_domains = domain_sets[i]
+    sims = jaccard_matrix(domain_sets)
+    # Average over the other n - 1 travelers (diagonal is 0)
+    avg_similarity = sims.sum(axis=1) / (len(population) - 1)
+
+    for ind, my_domains, avg in zip(population, domain_sets, avg_similarity):
         if not my_domains:
             ind.fitness.uniqueness = 0.0 # No content = not unique (or irrelevant)
             continue
-            
-        for j, other_domains in enumerate(domain_sets):
-            if i == j:
-                continue
-                
-            if not other_domains:
-                similarity = 0.0
-            else:
-                intersection = len(my_domains.intersection(other_domains))
-                union = len(my_domains.union(other_domains))
-                similarity = intersection / union if union > 0 else 0.0
-            
-            total_similarity += similarity
-            comparisons += 1
-            
-        avg_similarity = total_similarity / comparisons if comparisons > 0 else 0.0
-        ind.fitness.uniqueness = 1.0 - avg_similarity
+        ind.fitness.uniqueness = 1.0 - float(avg)
@@ -3,15 +3,17 @@ from bs4 import BeautifulSoup
 from googlesearch import search
 import time
 import random
-try:
-    from urllib.parse import urlparse
-except ImportError:
-    from urlparse import urlparse
+
+from snackPersona.traveler.utils.urls import netloc
+
 
 class SearchClient:
     """
     Wrapper around Google Search API (or scraping via googlesearch-python).
     """
+
+    __slots__ = ("num_results", "language")
+
     def __init__(self, num_results=5, language="ja"):
         self.num_results = num_results
         self.language = language
@@ -41,6 +43,9 @@ class SerpApiClient:
     Search client using SerpApi (requires API key).
     Falls back to normal SearchClient if key is missing or fails.
     """
+
+    __slots__ = ("api_key",)
+
     def __init__(self, api_key: str = None):
         self.api_key = api_key
         # Check env var if not passed
@@ -80,6 +85,9 @@ class WebCrawler:
     """
     Simple crawler to fetch page content and extract links.
     """
+
+    __slots__ = ("timeout", "headers")
+
     def __init__(self, timeout=10):
         self.timeout = timeout
         self.headers = {
@@ -97,7 +105,7 @@ class WebCrawler:
                 "title": f"Mock Content for {url}",
                 "content": "This is simulated content for testing logic flow when external access is restricted. It contains some keywords like AI, technology, and future.",
                 "links": [f"{url}/subpage_{i}" for i in range(3)],
-                "domain": urlparse(url).netloc
+                "domain": netloc(url)
             }
 
         try:
@@ -117,13 +125,14 @@ class WebCrawler:
             text = soup.get_text(separator=' ', strip=True)
             title = soup.title.string if soup.title else "No Title"
             
-            # Extract links
-            links = []
-            base_domain = urlparse(url).netloc
+            # Extract links, deduplicated in document order as they are
+            # found (dict keys), so the traveler's seeded shuffle is reproducible
+            links = {}
+            base_domain = netloc(url)
             for a in soup.find_all('a', href=True):
                 href = a['href']
                 if href.startswith('http'):
-                    links.append(href)
+                    links[href] = None
                 elif href.startswith('/'):
                      # Handle relative URLs simply? Or ignore for now to focus on external
                      # For hybrid traveler, we might want external links more
@@ -133,7 +142,7 @@ class WebCrawler:
                 "url": url,
                 "title": title,
                 "content": text[:5000], # Limit content size
-                "links": list(set(links)),
+                "links": list(links),
                 "domain": base_domain
             }
         except Exception as e:
@@ -6,12 +6,25 @@ from snackPersona.utils.logger import logger
 from snackPersona.traveler.utils.data_models import TravelerGenome, ExecutionResult
 from snackPersona.traveler.executor.browser import SearchClient, WebCrawler
 from snackPersona.traveler.utils.source_memory import SourceMemory
+from snackPersona.traveler.utils.urls import netloc, url_key
 
 
 class Traveler:
     """
     Real web traveler executor using a hybrid strategy (Search + Crawl).
     """
+
+    # One traveler (plus its search/crawl clients) is built per agent per
+    # generation; no per-instance __dict__
+    __slots__ = (
+        "genome",
+        "global_domain_counts",
+        "serp_client",
+        "search_client",
+        "crawler",
+        "memory",
+    )
+
     def __init__(self, genome: TravelerGenome, memory: SourceMemory = None, global_domain_counts: Dict[str, int] = None):
         self.genome = genome
         self.global_domain_counts = global_domain_counts or {}
@@ -45,11 +58,23 @@ class Traveler:
         # 3. Hybrid Selection & Crawling
         # Initial depth 0
         visited_urls = []
+        # O(1) membership index over visited_urls (which keeps visit order)
+        visited_set = set()
         retrieved_content = []
         
         # Priority queue or simple list to explore
         # Format: (url, depth, score)
-        to_visit = [(url, 0) for url in seed_urls]
+        # Each URL is queued at most once (first occurrence wins), so the
+        # frontier doesn't fill with duplicate links re-scored on every sort.
+        # Keyed on the canonical-URL fingerprint, so tracking parameters,
+        # fragments and query order don't make a page look new.
+        queued = set()
+        to_visit = []
+        for url in seed_urls:
+            key = url_key(url)
+            if key not in queued:
+                queued.add(key)
+                to_visit.append((url, 0))
         
         # Limit total visits to avoid infinite loops
         max_visits = 5 + (self.genome.search_depth * 3)
@@ -63,7 +88,7 @@ class Traveler:
             
             url, depth = to_visit.pop(0)
             
-            if url in visited_urls:
+            if url in visited_set:
                 continue
             
             # Fetch
@@ -72,6 +97,7 @@ class Traveler:
                 continue
             
             visited_urls.append(url)
+            visited_set.add(url)
             visit_count += 1
             retrieved_content.append(page_data)
             
@@ -85,18 +111,21 @@ class Traveler:
                 random.shuffle(new_links) # Shuffle to avoid just following menu links
                 
                 for link in new_links[:5]: # Add top 5 links to avoid explosion
-                    if link not in visited_urls:
+                    key = url_key(link)
+                    if key not in queued:
+                        queued.add(key)
                         to_visit.append((link, depth + 1))
 
         # Record visited domains in source memory
         if self.memory:
-            from urllib.parse import urlparse
+            domains = []
             for page in retrieved_content:
                 try:
-                    domain = urlparse(page["url"]).netloc
-                    self.memory.record_visit(domain)
+                    # fetch_page already parsed the page's domain
+                    domains.append(page.get("domain") or netloc(page["url"]))
                 except:
                     pass
+            self.memory.record_visits(domains)
 
         execution_time = time.time() - start_time
         
@@ -115,8 +144,13 @@ class Traveler:
         )
 
     def _extract_headlines(self, pages: List[Dict]) -> List[str]:
-        """Extracts clean headlines from crawled page data."""
+        """
+        Extracts clean headlines from crawled page data.  Titles that only
+        differ in case or spacing (syndicated copies, mirrors) are kept once,
+        since each headline ends up in a post prompt.
+        """
         headlines = []
+        seen = set()
         for page in pages:
             title = page.get("title", "").strip()
             if not title or title == "No Title":
@@ -129,7 +163,9 @@ class Traveler:
             # Truncate long titles
             if len(title) > 80:
                 title = title[:77] + "..."
-            if title and title not in headlines:
+            key = " ".join(title.casefold().split())
+            if key and key not in seen:
+                seen.add(key)
                 headlines.append(title)
         return headlines
 
@@ -171,18 +207,16 @@ class Traveler:
         
         # Boost from persistent source memory
         if self.memory:
-            from urllib.parse import urlparse
             try:
-                domain = urlparse(url).netloc
+                domain = netloc(url)
                 score += self.memory.get_domain_boost(domain)
             except:
                 pass
         
         # Global diversity penalty (Novelty feedback)
         if self.global_domain_counts:
-            from urllib.parse import urlparse
             try:
-                domain = urlparse(url).netloc
+                domain = netloc(url)
                 global_count = self.global_domain_counts.get(domain, 0)
                 if global_count > 0:
                     # Penalize based on total frequency across all personas.
@@ -107,6 +107,10 @@ def main():
     print(f"Final Elite Map contains {len(elite_map.all_elites)} elites.")
     memory.save()
     print(f"Source Memory saved: {len(memory.domains)} domains tracked.")
+    spread = memory.get_domain_diversity()
+    print(f"Domain spread: entropy={spread['entropy']:.2f} bits, "
+          f"top domain share={spread['max_domain_ratio']:.2f}")
+    print(f"Trusted domains: {', '.join(memory.get_diverse_domains()) or '(none yet)'}")
 
     # --- Bandit-driven Loop (Exploitation) ---
     print("\n--- Starting Bandit Loop (Exploitation Phase) ---")
@@ -29,14 +29,8 @@ def evaluation_and_map_management_handler(
     features = calculate_feature_descriptors(result)
 
     # Extract domains for uniqueness calculation
-    from urllib.parse import urlparse
-    domains = set()
-    for url in result.retrieved_urls:
-        try:
-            domains.add(urlparse(url).netloc)
-        except:
-            pass
-    domain_list = list(domains)
+    # Distinct domains in first-visit order (deterministic, unlike set order)
+    domain_list = list(dict.fromkeys(result.url_domains()))
     
     # Override downstream_value if feedback is provided
     if feedback_reward is not None:
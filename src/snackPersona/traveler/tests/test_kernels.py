@@ -0,0 +1,72 @@
+import itertools
+import random
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from snackPersona.traveler.evaluation import _kernels
+from snackPersona.traveler.evaluation._kernels import (
+    entropy_from_counts,
+    jaccard_matrix,
+    minhash_signatures,
+    minhash_similarity,
+)
+
+
+def brute_force_jaccard(sets):
+    n = len(sets)
+    out = np.zeros((n, n))
+    for i, j in itertools.combinations(range(n), 2):
+        union = len(sets[i] | sets[j])
+        if union:
+            out[i, j] = out[j, i] = len(sets[i] & sets[j]) / union
+    return out
+
+
+def random_sets(n, vocab, max_size, seed=0):
+    rng = random.Random(seed)
+    return [set(rng.sample(range(vocab), rng.randint(0, max_size))) for _ in range(n)]
+
+
+class TestKernels(unittest.TestCase):
+
+    def test_entropy_from_counts(self):
+        self.assertAlmostEqual(entropy_from_counts(np.array([1, 1, 1, 1])), 2.0)
+        self.assertAlmostEqual(entropy_from_counts(np.array([5, 0, 0])), 0.0)
+        self.assertEqual(entropy_from_counts(np.array([0, 0])), 0.0)
+
+    def test_jaccard_matrix_is_exact_below_the_minhash_cap(self):
+        sets = random_sets(30, 40, 12)
+        np.testing.assert_allclose(jaccard_matrix(sets), brute_force_jaccard(sets))
+
+    def test_csr_kernel_stays_exact_past_the_cap(self):
+        """The sparse kernel never builds the dense matrix, so the MinHash cap must not apply to it."""
+        sets = random_sets(30, 40, 12, seed=1)
+        with mock.patch.object(_kernels, "_jaccard_matrix_jit", _kernels._jaccard_matrix_loops), \
+                mock.patch.object(_kernels, "_MINHASH_MIN_CELLS", 1):
+            sims = jaccard_matrix(sets)
+        np.testing.assert_allclose(sims, brute_force_jaccard(sets))
+
+    def test_dense_fallback_estimates_past_the_cap(self):
+        sets = random_sets(40, 60, 30, seed=2)
+        with mock.patch.object(_kernels, "_jaccard_matrix_jit", None), \
+                mock.patch.object(_kernels, "_MINHASH_MIN_CELLS", 1):
+            sims = jaccard_matrix(sets)
+        exact = brute_force_jaccard(sets)
+        self.assertTrue(np.all(np.diag(sims) == 0.0))
+        # Per-row means are what fitness uses; those average the estimate error out
+        np.testing.assert_allclose(sims.mean(axis=1), exact.mean(axis=1), atol=0.05)
+
+    def test_minhash_empty_sets_never_match(self):
+        sigs = minhash_signatures([[], [], [0, 1]])
+        sims = minhash_similarity(sigs, np.array([True, True, False]))
+        self.assertTrue(np.all(sims == 0.0))
+
+    def test_minhash_identical_sets_match_fully(self):
+        sigs = minhash_signatures([[3, 7, 9], [3, 7, 9]])
+        self.assertTrue(np.array_equal(sigs[0], sigs[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
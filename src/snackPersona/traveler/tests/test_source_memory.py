@@ -0,0 +1,97 @@
+import os
+import random
+import tempfile
+import unittest
+
+from snackPersona.traveler.utils.source_memory import (
+    SourceMemory,
+    _domain_similarity_matrix,
+    _host_trigrams,
+)
+
+
+class TestSourceMemory(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "memory.json")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_record_visits_matches_record_visit(self):
+        rng = random.Random(0)
+        domains = [rng.choice(["a.com", "b.org", "c.net"]) for _ in range(30)]
+        one_by_one = SourceMemory(os.path.join(self._tmp.name, "one.json"))
+        batched = SourceMemory(os.path.join(self._tmp.name, "batch.json"))
+        for score in (0.2, 0.9):
+            for d in domains:
+                one_by_one.record_visit(d, score)
+            batched.record_visits(domains, score)
+
+        self.assertEqual(batched.total_visits, one_by_one.total_visits)
+        self.assertEqual(batched.max_domain_visits, one_by_one.max_domain_visits)
+        for d in set(domains):
+            self.assertEqual(batched.domains[d]["visits"], one_by_one.domains[d]["visits"])
+            self.assertAlmostEqual(batched.domains[d]["avg_authority"], one_by_one.domains[d]["avg_authority"])
+            self.assertAlmostEqual(batched.get_domain_boost(d), one_by_one.get_domain_boost(d))
+        # Authorities agree up to rounding, so compare membership, not near-tie order
+        self.assertEqual(set(batched.get_preferred_domains()), set(one_by_one.get_preferred_domains()))
+
+    def test_aggregates_survive_reload(self):
+        memory = SourceMemory(self.path)
+        for domain, score in [("a.com", 0.9), ("a.com", 0.7), ("b.org", 0.4), ("c.net", 0.8)]:
+            memory.record_visit(domain, score)
+        memory.save()
+
+        reloaded = SourceMemory(self.path)
+        self.assertEqual(reloaded.total_visits, 4)
+        self.assertEqual(reloaded.max_domain_visits, 2)
+        self.assertAlmostEqual(reloaded.get_domain_boost("a.com"), memory.get_domain_boost("a.com"))
+        self.assertEqual(reloaded.get_domain_boost("unknown.io"), 0.0)
+        diversity = reloaded.get_domain_diversity()
+        self.assertEqual(diversity["unique_domains"], 3)
+        self.assertAlmostEqual(diversity["max_domain_ratio"], 0.5)
+        self.assertAlmostEqual(diversity["entropy"], 1.5)
+
+    def test_preferred_domains_rank_by_score_then_insertion(self):
+        memory = SourceMemory(self.path)
+        for domain, score in [("low.com", 0.1), ("tie1.com", 0.5), ("high.com", 0.9), ("tie2.com", 0.5)]:
+            memory.record_visit(domain, score)
+        self.assertEqual(memory.get_preferred_domains(top_k=3), ["high.com", "tie1.com", "tie2.com"])
+        self.assertEqual(memory.get_preferred_domains(top_k=0), [])
+        self.assertEqual(SourceMemory(os.path.join(self._tmp.name, "empty.json")).get_domain_diversity()["entropy"], 0.0)
+
+    def test_diverse_domains_spread_over_sibling_hosts(self):
+        memory = SourceMemory(self.path)
+        visits = [
+            ("en.wikipedia.org", 0.9, 10), ("ja.wikipedia.org", 0.9, 10), ("de.wikipedia.org", 0.85, 10),
+            ("nature.com", 0.8, 10), ("arxiv.org", 0.75, 10), ("www.bbc.co.uk", 0.7, 10),
+        ]
+        for domain, score, n in visits:
+            memory.record_visits([domain] * n, score)
+        preferred = memory.get_preferred_domains(top_k=3)
+        self.assertEqual(preferred, ["en.wikipedia.org", "ja.wikipedia.org", "de.wikipedia.org"])
+        diverse = memory.get_diverse_domains(top_k=3)
+        self.assertEqual(diverse[0], "en.wikipedia.org")
+        self.assertEqual(sum("wikipedia" in d for d in diverse), 1)
+        # lam=1 is pure relevance: the plain ranking
+        self.assertEqual(memory.get_diverse_domains(top_k=3, lam=1.0), preferred)
+        self.assertEqual(memory.get_diverse_domains(top_k=0), [])
+
+
+class TestDomainSimilarityMatrix(unittest.TestCase):
+
+    def test_matches_pairwise_trigram_jaccard(self):
+        domains = ["en.wikipedia.org", "www.ja.wikipedia.org", "nature.com", "www.nature.com", "a.b"]
+        sims = _domain_similarity_matrix(domains)
+        for i, a in enumerate(domains):
+            for j, b in enumerate(domains):
+                ga, gb = _host_trigrams(a), _host_trigrams(b)
+                self.assertAlmostEqual(sims[i, j], len(ga & gb) / len(ga | gb))
+        # "www." is dropped, so these are the same host
+        self.assertEqual(sims[2, 3], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from snackPersona.traveler.executor.traveler import Traveler
+from snackPersona.traveler.tests.test_data_models import create_mock_genome
+
+
+class TestExtractHeadlines(unittest.TestCase):
+
+    def setUp(self):
+        self.traveler = Traveler(create_mock_genome())
+
+    def test_near_duplicate_titles_are_kept_once(self):
+        pages = [
+            {"title": "Rocket lands on Mars - CNN"},
+            {"title": "rocket  lands on MARS | Reuters"},
+            {"title": "No Title"},
+            {"title": "   "},
+            {"title": "Markets rally — Bloomberg"},
+        ]
+        self.assertEqual(
+            self.traveler._extract_headlines(pages),
+            ["Rocket lands on Mars", "Markets rally"],
+        )
+
+    def test_long_titles_are_truncated(self):
+        [headline] = self.traveler._extract_headlines([{"title": "x" * 100}])
+        self.assertEqual(len(headline), 80)
+        self.assertTrue(headline.endswith("..."))
+
+
+if __name__ == '__main__':
+    unittest.main()
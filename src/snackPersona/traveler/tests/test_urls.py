@@ -0,0 +1,41 @@
+import unittest
+from urllib.parse import urlparse
+
+from snackPersona.traveler.utils.urls import canonical_url, netloc, url_key
+
+
+class TestNetloc(unittest.TestCase):
+
+    def test_matches_urlparse(self):
+        urls = [
+            "https://example.com/path?q=1",
+            "http://Sub.Example.org",
+            "https://user:pw@host.io:8080/x#frag",
+            "https://example.com?x=1",
+            "https://example.com#top",
+            "https://[::1]:8000/path",
+            "ftp://files.example.com/pub",
+            "https://exa mple.com/path",
+            "not a url",
+            "",
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(netloc(url), urlparse(url).netloc)
+
+
+class TestUrlKey(unittest.TestCase):
+
+    def test_tracking_and_order_do_not_matter(self):
+        base = url_key("https://example.com/a?b=2&a=1")
+        self.assertEqual(base, url_key("HTTPS://EXAMPLE.com/a?a=1&b=2#section"))
+        self.assertEqual(base, url_key("https://example.com/a?a=1&utm_source=x&b=2&gclid=123"))
+        self.assertNotEqual(base, url_key("https://example.com/a?a=1&b=3"))
+        self.assertNotEqual(base, url_key("https://example.com/b?a=1&b=2"))
+
+    def test_canonical_url(self):
+        self.assertEqual(canonical_url("https://Example.com?utm_medium=m"), "https://example.com/")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import uuid
-from typing import List, Dict, Any, Tuple, Set
-from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional, Tuple, Set
+from pydantic import BaseModel, Field, PrivateAttr
+
+from snackPersona.traveler.utils.urls import netloc
 
 # -----------------
 # Genome Definition
@@ -41,6 +43,26 @@ class ExecutionResult(BaseModel):
     api_calls: int
     execution_time: float
 
+    # (len(retrieved_urls) when parsed, netlocs) — rebuilt if the URL list grows
+    _domain_cache: Optional[Tuple[int, List[str]]] = PrivateAttr(default=None)
+
+    def url_domains(self) -> List[str]:
+        """
+        Netloc of each retrieved URL (unparseable URLs skipped), parsed once
+        and shared by the fitness, feature and uniqueness steps.
+        """
+        cached = self._domain_cache
+        if cached is None or cached[0] != len(self.retrieved_urls):
+            domains = []
+            for url in self.retrieved_urls:
+                try:
+                    domains.append(netloc(url))
+                except ValueError:
+                    pass
+            cached = (len(self.retrieved_urls), domains)
+            self._domain_cache = cached
+        return cached[1]
+
 
 class Fitness(BaseModel):
     """
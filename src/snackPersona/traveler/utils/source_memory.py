@@ -1,20 +1,100 @@
 import json
 import os
-from typing import Dict, List
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List
 from datetime import datetime
 
+import numpy as np
+
+from snackPersona.traveler.evaluation._kernels import entropy_from_counts
+
+
+@lru_cache(maxsize=4096)
+def _host_trigrams(domain: str) -> FrozenSet[str]:
+    """Character trigrams of a host name (``www.`` dropped), for cheap similarity."""
+    host = domain.lower().removeprefix("www.")
+    padded = f"^{host}$"
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _domain_similarity_matrix(domains: List[str]) -> np.ndarray:
+    """
+    ``(n, n)`` Jaccard similarity of the hosts' trigram sets (1.0 on the
+    diagonal), from one trigram incidence matrix instead of per-pair set ops.
+    """
+    vocab: Dict[str, int] = {}
+    rows = [[vocab.setdefault(g, len(vocab)) for g in _host_trigrams(d)] for d in domains]
+    incidence = np.zeros((len(domains), len(vocab)), dtype=np.float64)
+    for i, r in enumerate(rows):
+        incidence[i, r] = 1.0
+    inter = incidence @ incidence.T
+    sizes = incidence.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
 
 class SourceMemory:
     """
     Persistent memory of domain quality scores across runs.
     Stores visit counts, average authority, and last-seen timestamps.
     Data is saved as a JSON file.
+
+    ``domains`` (one dict per domain) is what gets persisted; visit counts
+    and authorities are mirrored into parallel NumPy columns indexed by
+    ``_index[domain]``, so ranking and spread statistics are array ops.
     """
     def __init__(self, filepath: str = "source_memory.json"):
         self.filepath = filepath
         self.domains: Dict[str, dict] = {}
+        # Aggregates kept up to date on every write, so reads don't rescan
+        self.total_visits = 0
+        self.max_domain_visits = 0
+        self._boosts: Dict[str, float] = {}
+        # Column store: row i holds domain _names[i]
+        self._index: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._visits = np.zeros(0, dtype=np.int64)
+        self._authority = np.zeros(0, dtype=np.float64)
         self.load()
 
+    def _rebuild_aggregates(self):
+        self._names = list(self.domains)
+        self._index = {d: i for i, d in enumerate(self._names)}
+        n = len(self._names)
+        self._visits = np.zeros(max(n, 64), dtype=np.int64)
+        self._authority = np.zeros(max(n, 64), dtype=np.float64)
+        for i, entry in enumerate(self.domains.values()):
+            self._visits[i] = entry["visits"]
+            self._authority[i] = entry["avg_authority"]
+
+        self.total_visits = int(self._visits[:n].sum())
+        self.max_domain_visits = int(self._visits[:n].max()) if n else 0
+        self._boosts = {d: self._boost(entry) for d, entry in self.domains.items()}
+
+    def _row(self, domain: str) -> int:
+        """Column row of ``domain``, appending one (capacity doubles) if new."""
+        idx = self._index.get(domain)
+        if idx is None:
+            idx = len(self._names)
+            if idx == len(self._visits):
+                self._visits = np.concatenate([self._visits, np.zeros_like(self._visits)])
+                self._authority = np.concatenate([self._authority, np.zeros_like(self._authority)])
+            self._index[domain] = idx
+            self._names.append(domain)
+        return idx
+
+    def _scores(self) -> np.ndarray:
+        """Preference score per row: authority weighted by (capped) visits."""
+        n = len(self._names)
+        return self._authority[:n] * np.minimum(self._visits[:n], 10)
+
+    @staticmethod
+    def _boost(entry: dict) -> float:
+        # Boost scales with both authority and familiarity (capped visits)
+        familiarity = min(entry["visits"] / 20.0, 1.0)  # cap at 20 visits
+        return entry["avg_authority"] * familiarity * 0.3
+
     def load(self):
         """Load memory from disk."""
         if os.path.exists(self.filepath):
@@ -23,6 +103,7 @@ class SourceMemory:
                     self.domains = json.load(f)
             except (json.JSONDecodeError, IOError):
                 self.domains = {}
+        self._rebuild_aggregates()
 
     def save(self):
         """Persist memory to disk."""
@@ -50,24 +131,108 @@ class SourceMemory:
         entry["visits"] = new_count
         entry["last_seen"] = datetime.now().isoformat()
 
+        row = self._row(domain)
+        self._visits[row] = new_count
+        self._authority[row] = entry["avg_authority"]
+
+        self.total_visits += 1
+        if new_count > self.max_domain_visits:
+            self.max_domain_visits = new_count
+        self._boosts[domain] = self._boost(entry)
+
+    def record_visits(self, domains: Iterable[str], authority_score: float = 0.5):
+        """
+        Record a batch of visits (one per item, repeats allowed) in a single
+        pass: each distinct domain is updated once with its visit count, and
+        all of them share one ``last_seen`` timestamp.  Equivalent to calling
+        ``record_visit`` per item.
+        """
+        counts = Counter(domains)
+        if not counts:
+            return
+        now = datetime.now().isoformat()
+        domains_map = self.domains
+        for domain, k in counts.items():
+            entry = domains_map.get(domain)
+            if entry is None:
+                entry = domains_map[domain] = {"visits": 0, "avg_authority": 0.0, "last_seen": ""}
+            old_count = entry["visits"]
+            new_count = old_count + k
+            # k identical samples folded into the running mean at once
+            entry["avg_authority"] += k * (authority_score - entry["avg_authority"]) / new_count
+            entry["visits"] = new_count
+            entry["last_seen"] = now
+
+            row = self._row(domain)
+            self._visits[row] = new_count
+            self._authority[row] = entry["avg_authority"]
+            if new_count > self.max_domain_visits:
+                self.max_domain_visits = new_count
+            self._boosts[domain] = self._boost(entry)
+        self.total_visits += sum(counts.values())
+
     def get_domain_boost(self, domain: str) -> float:
         """
         Returns a reputation boost for a domain based on past visits.
         Range: [0.0, 0.3] — higher for frequently visited, high-authority domains.
         """
-        if domain not in self.domains:
-            return 0.0
+        return self._boosts.get(domain, 0.0)
 
-        entry = self.domains[domain]
-        # Boost scales with both authority and familiarity (capped visits)
-        familiarity = min(entry["visits"] / 20.0, 1.0)  # cap at 20 visits
-        return entry["avg_authority"] * familiarity * 0.3
+    def get_domain_diversity(self) -> dict:
+        """
+        Spread of visits across domains: unique domain count, total visits,
+        share of the most visited domain and Shannon entropy (bits).
+        """
+        total = self.total_visits
+        if total == 0:
+            return {"unique_domains": 0, "total_visits": 0, "max_domain_ratio": 0.0, "entropy": 0.0}
+        entropy = entropy_from_counts(self._visits[:len(self._names)])
+        return {
+            "unique_domains": len(self.domains),
+            "total_visits": total,
+            "max_domain_ratio": self.max_domain_visits / total,
+            "entropy": entropy,
+        }
 
     def get_preferred_domains(self, top_k: int = 10) -> List[str]:
         """Returns the top-k domains by average authority score."""
-        sorted_domains = sorted(
-            self.domains.items(),
-            key=lambda x: x[1]["avg_authority"] * min(x[1]["visits"], 10),
-            reverse=True
-        )
-        return [d[0] for d in sorted_domains[:top_k]]
+        scores = self._scores()
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        # Highest score first; ties keep insertion order
+        top = top[np.lexsort((top, -scores[top]))]
+        return [self._names[i] for i in top]
+
+    def get_diverse_domains(self, top_k: int = 5, pool_size: int = 20, lam: float = 0.5) -> List[str]:
+        """
+        Top-k domains picked by Maximal Marginal Relevance: from the
+        ``pool_size`` best-scoring domains (same score as
+        ``get_preferred_domains``), repeatedly take the one maximising
+        ``lam * relevance - (1 - lam) * max similarity to those already
+        picked``.  Similarity is host-name trigram overlap, so mirrors and
+        sibling subdomains (``en.``/``ja.wikipedia.org``) don't crowd the list.
+        """
+        pool = self.get_preferred_domains(top_k=pool_size)
+        if len(pool) <= 1 or top_k <= 0:
+            return pool[:max(top_k, 0)]
+
+        scores = self._scores()[[self._index[d] for d in pool]]
+        best = float(scores.max()) or 1.0
+        relevance = scores / best
+        sims = _domain_similarity_matrix(pool)
+
+        selected: List[int] = []
+        # Max similarity of each candidate to the selected set, updated per pick
+        max_sim = np.zeros(len(pool), dtype=np.float64)
+        taken = np.zeros(len(pool), dtype=bool)
+        for _ in range(min(top_k, len(pool))):
+            mmr = lam * relevance - (1 - lam) * max_sim
+            mmr[taken] = -np.inf
+            # argmax returns the first maximum, so ties keep pool order
+            pick = int(np.argmax(mmr))
+            taken[pick] = True
+            selected.append(pick)
+            np.maximum(max_sim, sims[pick], out=max_sim)
+        return [pool[i] for i in selected]
@@ -0,0 +1,56 @@
+import hashlib
+import re
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# Host part of a plain http(s) URL.  It must run up to a path/query/fragment
+# delimiter or the end: brackets (IPv6), whitespace or control characters
+# anywhere in it make the match fail, leaving those URLs to urlparse.
+_NETLOC_RE = re.compile(r"https?://([^/?#\[\]\x00-\x20]*)(?=[/?#]|\Z)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=65536)
+def netloc(url: str) -> str:
+    """
+    ``urlparse(url).netloc``, memoised per process.
+
+    Plain ``http(s)://host/...`` URLs are handled by one precompiled regex
+    match; anything unusual (IPv6 brackets, whitespace/control characters
+    around the host, other schemes) goes through ``urlparse``, which may
+    raise ``ValueError`` as before.
+    """
+    m = _NETLOC_RE.match(url)
+    if m is not None:
+        return m.group(1)
+    return urlparse(url).netloc
+
+
+# Query parameters that only track the visit and never change the page
+_TRACKING_PARAMS = frozenset({"gclid", "fbclid", "yclid", "mc_cid", "mc_eid"})
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalised form of ``url`` for duplicate detection: lower-case scheme
+    and host, no fragment, tracking parameters (``utm_*``, click ids)
+    removed and the remaining query parameters sorted.
+    """
+    parts = urlparse(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    return urlunparse((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path or "/",
+        parts.params, urlencode(query), "",
+    ))
+
+
+@lru_cache(maxsize=65536)
+def url_key(url: str) -> bytes:
+    """16-byte fingerprint of ``canonical_url(url)``; equal for near-duplicate URLs."""
+    try:
+        canon = canonical_url(url)
+    except ValueError:
+        canon = url
+    return hashlib.blake2b(canon.encode("utf-8"), digest_size=16).digest()
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+import sys
+
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Dict, Any, Optional
 
 # ==============================================================================
@@ -22,6 +24,14 @@ class PersonaGenotype(BaseModel):
                                 "This should include age, occupation, backstory, personality, "
                                 "goals, and any other relevant details in natural language.")
 
+    @field_validator("name")
+    @classmethod
+    def _intern_name(cls, v: str) -> str:
+        # Names key every feed event, decision cache and per-author table;
+        # interning makes the copies share one str object instead of each
+        # holding its own.  Equality still compares values; it only skips
+        # the character scan when both sides are that same object.
+        return sys.intern(v)
 
 
 class PersonaPhenotype(BaseModel):
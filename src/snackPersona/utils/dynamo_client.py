@@ -1,12 +1,50 @@
+import functools
 import os
+import random
+import time
+from functools import lru_cache
+
 import boto3
 from botocore.config import Config
+from botocore.exceptions import ClientError
+
+# Error codes worth retrying with backoff (throttling / transient server errors)
+_RETRYABLE_CODES = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "InternalServerError",
+    "ServiceUnavailable",
+}
+
+
+def with_retries(fn, attempts: int = 5, initial: float = 0.1, max_wait: float = 2.0):
+    """
+    Wrap ``fn`` so throttling ``ClientError``s are retried with exponential
+    backoff and full jitter; other errors are raised immediately.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(attempts):
+            try:
+                return fn(*args, **kwargs)
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code not in _RETRYABLE_CODES or attempt == attempts - 1:
+                    raise
+                time.sleep(random.uniform(0, min(max_wait, initial * 2 ** attempt)))
+    return wrapper
 
-def get_dynamodb_resource():
+
+def get_dynamodb_resource(session=None):
     """
     Returns a configured DynamoDB resource.
     Supports LocalStack via AWS_ENDPOINT_URL.
+
+    Pass a dedicated ``boto3.session.Session`` when calling from worker
+    threads (the default session isn't thread-safe).
     """
+    factory = session or boto3
     endpoint_url = os.getenv("AWS_ENDPOINT_URL")
     
     config = Config(
@@ -14,7 +52,7 @@ def get_dynamodb_resource():
     )
 
     if endpoint_url:
-        return boto3.resource(
+        return factory.resource(
             'dynamodb',
             endpoint_url=endpoint_url,
             config=config,
@@ -24,9 +62,40 @@ def get_dynamodb_resource():
             region_name='us-east-1'
         )
     else:
-        return boto3.resource('dynamodb', config=config)
+        return factory.resource('dynamodb', config=config)
+
+def get_s3_client():
+    """
+    Returns a configured S3 client (used for large generation archives).
+    Supports LocalStack via AWS_ENDPOINT_URL.
+    """
+    endpoint_url = os.getenv("AWS_ENDPOINT_URL")
+
+    config = Config(
+        retries = {'max_attempts': 3, 'mode': 'standard'}
+    )
+
+    if endpoint_url:
+        return boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            config=config,
+            # Dummy credentials for LocalStack
+            aws_access_key_id='test',
+            aws_secret_access_key='test',
+            region_name='us-east-1'
+        )
+    else:
+        return boto3.client('s3', config=config)
+
+def get_table(table_name=None):
+    """
+    Returns the DynamoDB table (``DYNAMODB_TABLE`` env var by default).
+    Handles are cached per table name, so stores share one resource.
+    """
+    return _get_table_cached(table_name or os.getenv("DYNAMODB_TABLE", "SnackTable"))
+
 
-def get_table():
-    dynamodb = get_dynamodb_resource()
-    table_name = os.getenv("DYNAMODB_TABLE", "SnackTable")
-    return dynamodb.Table(table_name)
+@lru_cache(maxsize=4)
+def _get_table_cached(table_name):
+    return get_dynamodb_resource().Table(table_name)
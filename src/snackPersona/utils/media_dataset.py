@@ -1,6 +1,6 @@
 import json
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional
 from snackPersona.utils.data_models import MediaItem
 
 
@@ -17,25 +17,45 @@ class MediaDataset:
             dataset_path: Optional path to a JSON file containing media items.
                          If None, starts with an empty dataset.
         """
-        self.media_items: List[MediaItem] = []
+        self._media_items: List[MediaItem] = []
+        # id -> first item with that id; kept in step by the add_* methods
+        # and rebuilt whenever media_items is assigned
+        self._by_id: Dict[str, MediaItem] = {}
         
         if dataset_path and os.path.exists(dataset_path):
             self.load_from_file(dataset_path)
     
+    @property
+    def media_items(self) -> List[MediaItem]:
+        """
+        The items in insertion order.  Change them through the add_* methods
+        or by assigning a new list; editing this list in place bypasses the
+        id index used by ``get_media_item``.
+        """
+        return self._media_items
+
+    @media_items.setter
+    def media_items(self, items: List[MediaItem]):
+        self._media_items = list(items)
+        by_id: Dict[str, MediaItem] = {}
+        for item in self._media_items:
+            by_id.setdefault(item.id, item)
+        self._by_id = by_id
+
     def add_media_item(self, media_item: MediaItem):
         """Add a single media item to the dataset."""
-        self.media_items.append(media_item)
+        self._media_items.append(media_item)
+        self._by_id.setdefault(media_item.id, media_item)
     
     def add_media_items(self, media_items: List[MediaItem]):
         """Add multiple media items to the dataset."""
-        self.media_items.extend(media_items)
+        self._media_items.extend(media_items)
+        for item in media_items:
+            self._by_id.setdefault(item.id, item)
     
     def get_media_item(self, media_id: str) -> Optional[MediaItem]:
         """Get a media item by its ID."""
-        for item in self.media_items:
-            if item.id == media_id:
-                return item
-        return None
+        return self._by_id.get(media_id)
     
     def get_all_media_items(self) -> List[MediaItem]:
         """Get all media items in the dataset."""
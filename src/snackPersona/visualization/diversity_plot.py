@@ -11,15 +11,13 @@ import json
 import os
 from typing import List, Optional
 
-import numpy as np
-
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import matplotlib.cm as cm
 
 from snackPersona.utils.data_models import PersonaGenotype
-from snackPersona.evaluation.diversity.genotype import calculate_genotype_distance
+from snackPersona.evaluation.diversity.genotype import calculate_genotype_distance_matrix
 from snackPersona.utils.logger import logger
 
 
@@ -57,12 +55,7 @@ def plot_diversity_heatmap(store_dir: str, output_dir: Optional[str] = None) ->
         return ""
 
     n = len(personas)
-    dist_matrix = np.zeros((n, n))
-    for i in range(n):
-        for j in range(i + 1, n):
-            d = calculate_genotype_distance(personas[i], personas[j])
-            dist_matrix[i, j] = d
-            dist_matrix[j, i] = d
+    dist_matrix = calculate_genotype_distance_matrix(personas)
 
     names = [p.name for p in personas]
 